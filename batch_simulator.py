@@ -0,0 +1,226 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from board import BoardPresetDataclass
+from checkers_enums import GameStatusEnum, TeamEnum
+from checkers_game import CheckersGame
+
+STATUS_BY_CODE = list(GameStatusEnum)
+STATUS_CODES = {status: code for code, status in enumerate(STATUS_BY_CODE)}
+OFF_BOARD = 2
+PADDING = 2
+# Move directions used by legal_move_mask, in BoardGeometry order: (column step, distance in rows)
+DIRECTIONS = ((1, 1), (-1, 1), (2, 2), (-2, 2))
+
+
+class BatchCheckersSimulator:
+    '''
+    Plays many independent games at once, with the boards stored as one int8 array of shape
+    (games, length, height) holding TeamEnum values (0 for an empty tile), indexed [game, column, row].
+    Moves are validated and applied for the whole batch with array operations. The results are the same as
+    CheckersGame.make_move and CheckersGame.end_game would give for the same moves:
+    a move is rejected (and its game ends with GameStatusEnum.illegal_move) exactly when make_move would raise,
+    captures are mandatory, and a team whose capturing piece can capture again keeps the turn and must capture
+    with that piece.
+    '''
+    def __init__(self, preset: BoardPresetDataclass, batch_size: int):
+        self.length = preset.length
+        self.height = preset.height
+        board = np.zeros((preset.length, preset.height), dtype=np.int8)
+        for column, row in preset.white_coordinates:
+            board[column, row] = TeamEnum.white.value
+        for column, row in preset.black_coordinates:
+            board[column, row] = TeamEnum.black.value
+        self.boards = np.repeat(board[np.newaxis], batch_size, axis=0)
+        self.current_team = np.full(batch_size, CheckersGame.FIRST_TURN.value, dtype=np.int8)
+        self.continuation = np.full((batch_size, 2), -1, dtype=np.int64)
+        self.status = np.full(batch_size, STATUS_CODES[GameStatusEnum.game_continues], dtype=np.int8)
+        self.moves_made = np.zeros(batch_size, dtype=np.int64)
+
+    @property
+    def batch_size(self) -> int:
+        return self.boards.shape[0]
+
+    def _move_masks(self, games: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        '''
+        Black's boards are flipped upside down and negated, so that in every game the team to move has the value 1 and
+        moves towards higher rows, and the masks can be computed with plain slices.
+        :return: boolean arrays of shape (len(games), 2, length, height) marking the regular moves and the captures
+        that pass CheckersGame.verify_move_is_valid for the team to move, by side (+1 column, -1 column) and source.
+        '''
+        padded = np.pad(self.boards[games], ((0, 0), (PADDING, PADDING), (PADDING, PADDING)),
+                        constant_values=OFF_BOARD)
+        black_games = np.flatnonzero(self.current_team[games] == TeamEnum.black.value)
+        padded[black_games] = -padded[black_games, :, ::-1]
+        own = padded[:, PADDING:PADDING + self.length, PADDING:PADDING + self.height] == 1
+        steps = np.empty((games.size, 2, self.length, self.height), dtype=bool)
+        jumps = np.empty((games.size, 2, self.length, self.height), dtype=bool)
+        for index, side in enumerate((1, -1)):
+            step_target = padded[:, PADDING + side:PADDING + side + self.length, PADDING + 1:PADDING + 1 + self.height]
+            jump_target = padded[:, PADDING + 2 * side:PADDING + 2 * side + self.length,
+                                 PADDING + 2:PADDING + 2 + self.height]
+            np.logical_and(own, step_target == 0, out=steps[:, index])
+            np.logical_and(own, step_target == -1, out=jumps[:, index])
+            jumps[:, index] &= jump_target == 0
+        steps[black_games] = steps[black_games, :, :, ::-1]
+        jumps[black_games] = jumps[black_games, :, :, ::-1]
+        return steps, jumps
+
+    def _playing_games(self) -> np.ndarray:
+        return np.flatnonzero(self.status == STATUS_CODES[GameStatusEnum.game_continues])
+
+    def legal_move_mask(self) -> np.ndarray:
+        '''
+        The moves CheckersGame.legal_moves would list for every game, as a boolean array of shape
+        (games, 4, length, height) indexed by DIRECTIONS and source tile. Finished games have no legal moves.
+        '''
+        mask = np.zeros((self.batch_size, len(DIRECTIONS), self.length, self.height), dtype=bool)
+        games = self._playing_games()
+        mask[games] = self._legal_move_mask(games)
+        return mask
+
+    def _legal_move_mask(self, games: np.ndarray) -> np.ndarray:
+        steps, jumps = self._move_masks(games)
+        can_capture = jumps.any(axis=(1, 2, 3))
+        steps &= ~can_capture[:, np.newaxis, np.newaxis, np.newaxis]
+        continuation = self.continuation[games]
+        continuing = np.flatnonzero(continuation[:, 0] >= 0)
+        if continuing.size:
+            continuation_jumps = jumps[continuing, :, continuation[continuing, 0], continuation[continuing, 1]]
+            jumps[continuing] = False
+            jumps[continuing, :, continuation[continuing, 0], continuation[continuing, 1]] = continuation_jumps
+        return np.concatenate((steps, jumps), axis=1)
+
+    def moves_from_mask_indices(self, games: np.ndarray, flat_indices: np.ndarray) -> np.ndarray:
+        '''
+        Turns flat indices into legal_move_mask()[games] back into (source column, source row, target column,
+        target row) moves.
+        '''
+        directions, columns, rows = np.unravel_index(flat_indices, (len(DIRECTIONS), self.length, self.height))
+        column_steps = np.array([step for step, _ in DIRECTIONS])[directions]
+        row_steps = np.array([distance for _, distance in DIRECTIONS])[directions] * self.current_team[games]
+        return np.stack((columns, rows, columns + column_steps, rows + row_steps), axis=1).astype(np.int64)
+
+    def apply_moves(self, moves: np.ndarray, active: Optional[np.ndarray] = None) -> np.ndarray:
+        '''
+        Plays one move in every active game that hasn't finished.
+        :param moves: int array of shape (games, 4): source column, source row, target column, target row
+        :param active: optional boolean mask of the games that get a move, defaults to every game
+        :return: boolean mask of the games whose move was accepted. Rejected games end with an illegal move status.
+        '''
+        moves = np.asarray(moves, dtype=np.int64)
+        games = np.arange(self.batch_size)
+        playing = self.status == STATUS_CODES[GameStatusEnum.game_continues]
+        if active is not None:
+            playing &= active
+        source_column, source_row, target_column, target_row = moves.T
+        team = self.current_team.astype(np.int64)
+        inside = (0 <= source_column) & (source_column < self.length) & (0 <= source_row) & \
+            (source_row < self.height) & (0 <= target_column) & (target_column < self.length) & \
+            (0 <= target_row) & (target_row < self.height)
+        source_value = self._values_at(games, source_column, source_row)
+        target_value = self._values_at(games, target_column, target_row)
+        row_distance = target_row - source_row
+        column_distance = target_column - source_column
+        is_capture = (np.abs(row_distance) == 2) & (np.abs(column_distance) == 2)
+        captured_column = (source_column + target_column) // 2
+        captured_row = source_row + team
+        captured_value = self._values_at(games, captured_column, captured_row)
+        valid = inside & (target_value == 0) & (source_value == team) & \
+            (np.abs(row_distance) == np.abs(column_distance)) & (row_distance * team > 0) & \
+            (np.abs(row_distance) <= 2) & (~is_capture | ((captured_value != 0) & (captured_value != team)))
+        continuing = self.continuation[:, 0] >= 0
+        can_capture = np.zeros(self.batch_size, dtype=bool)
+        playing_games = self._playing_games()
+        can_capture[playing_games] = self._move_masks(playing_games)[1].any(axis=(1, 2, 3))
+        follows_capture_rules = np.where(continuing,
+                                         is_capture & (source_column == self.continuation[:, 0]) &
+                                         (source_row == self.continuation[:, 1]),
+                                         ~can_capture | is_capture)
+        accepted = playing & valid & follows_capture_rules
+        self.status[playing & ~accepted] = STATUS_CODES[GameStatusEnum.illegal_move]
+        self._play_accepted_moves(moves, accepted)
+        return accepted
+
+    def _play_accepted_moves(self, moves: np.ndarray, accepted: np.ndarray):
+        source_column, source_row, target_column, target_row = moves.T
+        team = self.current_team.astype(np.int64)
+        is_capture = np.abs(target_row - source_row) == 2
+        captured_column = (source_column + target_column) // 2
+        captured_row = source_row + team
+        moved = np.flatnonzero(accepted)
+        self.boards[moved, source_column[moved], source_row[moved]] = 0
+        self.boards[moved, target_column[moved], target_row[moved]] = team[moved]
+        captured = np.flatnonzero(accepted & is_capture)
+        self.boards[captured, captured_column[captured], captured_row[captured]] = 0
+        self.moves_made[moved] += 1
+
+        can_continue = np.zeros(self.batch_size, dtype=bool)
+        for side in (1, -1):
+            over = self._values_at(captured, target_column[captured] + side, target_row[captured] + team[captured])
+            landing = self._values_at(captured, target_column[captured] + 2 * side,
+                                      target_row[captured] + 2 * team[captured])
+            can_continue[captured] |= (over == -team[captured]) & (landing == 0)
+        self.continuation[moved] = -1
+        self.continuation[can_continue] = np.stack((target_column, target_row), axis=1)[can_continue]
+        switching = accepted & ~can_continue
+        self.current_team[switching] = -self.current_team[switching]
+
+    def _values_at(self, games: np.ndarray, columns: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        '''
+        Tile values for each (game, column, row), with OFF_BOARD for coordinates outside the board.
+        '''
+        inside = (0 <= columns) & (columns < self.length) & (0 <= rows) & (rows < self.height)
+        values = self.boards[games, np.clip(columns, 0, self.length - 1), np.clip(rows, 0, self.height - 1)]
+        return np.where(inside, values, OFF_BOARD)
+
+    def end_games(self) -> List[GameStatusEnum]:
+        '''
+        CheckersGame.end_game for every game still in progress: incomplete if the team to move has a piece that
+        can move, otherwise decided by the number of pieces left.
+        '''
+        games = self._playing_games()
+        steps, jumps = self._move_masks(games)
+        can_move = (steps | jumps).any(axis=(1, 2, 3))
+        white_pieces = (self.boards[games] == TeamEnum.white.value).sum(axis=(1, 2))
+        black_pieces = (self.boards[games] == TeamEnum.black.value).sum(axis=(1, 2))
+        self.status[games] = np.select([can_move, white_pieces > black_pieces, white_pieces < black_pieces],
+                                       [STATUS_CODES[GameStatusEnum.incomplete_game],
+                                        STATUS_CODES[GameStatusEnum.white_wins],
+                                        STATUS_CODES[GameStatusEnum.black_wins]],
+                                       STATUS_CODES[GameStatusEnum.tie_game])
+        return self.statuses()
+
+    def statuses(self) -> List[GameStatusEnum]:
+        return [STATUS_BY_CODE[code] for code in self.status]
+
+    def active_pieces(self, game: int) -> Dict[Tuple[int, int], TeamEnum]:
+        columns, rows = np.nonzero(self.boards[game])
+        return {(int(column), int(row)): TeamEnum(int(self.boards[game, column, row]))
+                for column, row in zip(columns, rows)}
+
+    def play_random_moves(self, rng: np.random.Generator, max_moves: int) -> np.ndarray:
+        '''
+        Plays uniformly random legal moves in every game until no game has a legal move left or max_moves moves
+        were played, then ends the games. Moves are drawn from the legal move mask, so they skip validation.
+        :return: the moves played, shape (games, max_moves, 4), padded with -1 after a game's last move
+        '''
+        history = np.full((self.batch_size, max_moves, 4), -1, dtype=np.int64)
+        for move_number in range(max_moves):
+            games = self._playing_games()
+            mask = self._legal_move_mask(games).reshape(games.size, -1)
+            has_moves = mask.any(axis=1)
+            games, mask = games[has_moves], mask[has_moves]
+            if not games.size:
+                break
+            # Illegal moves score below every legal one, even a legal move that drew 0.0
+            scores = np.where(mask, rng.random(mask.shape, dtype=np.float32), np.float32(-1.0))
+            moves = np.zeros((self.batch_size, 4), dtype=np.int64)
+            moves[games] = self.moves_from_mask_indices(games, scores.argmax(axis=1))
+            accepted = np.zeros(self.batch_size, dtype=bool)
+            accepted[games] = True
+            self._play_accepted_moves(moves, accepted)
+            history[games, move_number] = moves[games]
+        self.end_games()
+        return history
@@ -0,0 +1,53 @@
+'''
+Compares random rollouts played one CheckersGame at a time with the same number of rollouts played by the
+BatchCheckersSimulator.
+Run from the repository root: python -m benchmarks.bench_batch_simulator
+'''
+import argparse
+import random
+import time
+
+import numpy as np
+
+from batch_simulator import BatchCheckersSimulator
+from board import CheckerBoardFactory, CheckerBoardPresets
+from checkers_game import CheckersGame
+
+
+def play_sequential_rollouts(games: int, max_moves: int, seed: int) -> int:
+    rng = random.Random(seed)
+    moves_played = 0
+    for _ in range(games):
+        game = CheckersGame(CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8))
+        for _ in range(max_moves):
+            legal_moves = game.legal_moves()
+            if not legal_moves:
+                break
+            game.make_move(rng.choice(legal_moves))
+            moves_played += 1
+        game.end_game()
+    return moves_played
+
+
+def play_batched_rollouts(games: int, max_moves: int, seed: int) -> int:
+    simulator = BatchCheckersSimulator(CheckerBoardPresets.standard_8_by_8, games)
+    simulator.play_random_moves(np.random.default_rng(seed), max_moves)
+    return int(simulator.moves_made.sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark sequential against batched random rollouts')
+    parser.add_argument('--games', type=int, default=2000)
+    parser.add_argument('--max-moves', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    for name, play in (('sequential', play_sequential_rollouts), ('batched', play_batched_rollouts)):
+        start_time = time.perf_counter()
+        moves_played = play(args.games, args.max_moves, args.seed)
+        elapsed = time.perf_counter() - start_time
+        print(f'{name:12}{args.games} games, {moves_played} moves in {elapsed:.2f}s '
+              f'({args.games / elapsed:.0f} games/s, {moves_played / elapsed:.0f} moves/s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+'''
+Compares the per-move cost of the list, bitboard and sparse boards on the standard 8x8 board: the board mutations of
+a recorded game (its moves and captures played forward, then undone as CheckersGame.unmake_move does), tile reads,
+and whole games replayed with run_game.
+Run from the repository root: python -m benchmarks.bench_bitboard
+'''
+import argparse
+import os
+import timeit
+from typing import List, Optional, Tuple
+
+from board import BitboardCheckerBoard, CheckerBoard, CheckerBoardFactory, CheckerBoardPresets, SparseCheckerBoard
+from checkers_enums import TeamEnum
+from checkers_game import CheckersGame
+from checkersmove import CheckersMove, get_move_intern_table
+from move_iterators import create_move_iterator_from_move_file
+
+BOARD_CLASSES = {'list': CheckerBoard, 'bitboard': BitboardCheckerBoard, 'sparse': SparseCheckerBoard}
+GAME_PATH = os.path.join('tests', 'games', 'white.txt')
+
+# A board mutation: source, target, captured coordinates (None for a regular move) and the team that moved
+BoardMutation = Tuple[Tuple[int, int], Tuple[int, int], Optional[Tuple[int, int]], TeamEnum]
+
+
+def record_mutations(moves: List[CheckersMove]) -> List[BoardMutation]:
+    game = CheckersGame(CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8))
+    for move in moves:
+        game.make_move(move)
+    return [(record.move.source, record.move.target, record.captured_coordinates, record.team)
+            for record in game.undo_stack]
+
+
+def mutate(board: CheckerBoard, mutations: List[BoardMutation]):
+    for source, target, captured_coordinates, _ in mutations:
+        if captured_coordinates is None:
+            board.move_piece(source, target)
+        else:
+            board.capture_piece(source, target, captured_coordinates)
+    for source, target, captured_coordinates, team in reversed(mutations):
+        board.move_piece(target, source)
+        if captured_coordinates is not None:
+            if team is TeamEnum.white:
+                board.set_up_pieces([], [captured_coordinates])
+            else:
+                board.set_up_pieces([captured_coordinates], [])
+
+
+def measure(board_class, preset, moves: List[CheckersMove], mutations: List[BoardMutation],
+            tiles: List[Tuple[int, int]], number: int) -> Tuple[float, float, float]:
+    board = CheckerBoardFactory.build_board_from_preset(preset, board_class)
+    return (timeit.timeit(lambda: mutate(board, mutations), number=number) / (number * 2 * len(moves)),
+            timeit.timeit(lambda: [board[tile] for tile in tiles], number=number) / (number * len(tiles)),
+            timeit.timeit(lambda: CheckersGame(CheckerBoardFactory.build_board_from_preset(
+                preset, board_class)).run_game(iter(moves)), number=number) / (number * len(moves)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the per-move cost of the board implementations')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--number', type=int, default=100, help='games per measurement')
+    args = parser.parse_args()
+    preset = CheckerBoardPresets.standard_8_by_8
+    moves = list(create_move_iterator_from_move_file(GAME_PATH, get_move_intern_table(preset.length, preset.height)))
+    mutations = record_mutations(moves)
+    tiles = [(column, row) for column in range(preset.length) for row in range(preset.height)]
+    best_times = {name: (float('inf'),) * 3 for name in BOARD_CLASSES}
+    # The boards take turns, so a slow spell of the machine doesn't favour one of them
+    for _ in range(args.repeat):
+        for name, board_class in BOARD_CLASSES.items():
+            times = measure(board_class, preset, moves, mutations, tiles, args.number)
+            best_times[name] = tuple(map(min, best_times[name], times))
+    print(f'{GAME_PATH}: {len(moves)} moves, best of {args.repeat}')
+    print(f'{"":10}{"mutation (ns/move)":>20}{"tile read (ns)":>16}{"run_game (us/move)":>20}{"vs list":>9}')
+    for name, (mutation_time, read_time, replay_time) in best_times.items():
+        print(f'{name:10}{mutation_time * 1e9:20.0f}{read_time * 1e9:16.1f}{replay_time * 1e6:20.2f}'
+              f'{best_times["list"][2] / replay_time:8.2f}x')
+
+
+if __name__ == '__main__':
+    main()
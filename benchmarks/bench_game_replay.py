@@ -0,0 +1,87 @@
+'''
+Plays a long random game on a large board, then compares replaying it from the start to reach a move with seeking
+through a GameReplay snapshot index, for random positions and for stepping backwards through the whole game.
+Run from the repository root: python -m benchmarks.bench_game_replay
+'''
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from board import BoardPresetDataclass, CheckerBoardFactory
+from checkers_game import CheckersGame
+from game_replay import GameReplay
+
+
+def play_random_game(preset: BoardPresetDataclass, rng: random.Random) -> list:
+    game = CheckersGame(CheckerBoardFactory.build_board_from_preset(preset))
+    moves = []
+    while True:
+        legal_moves = game.legal_moves()
+        if not legal_moves:
+            return moves
+        moves.append(rng.choice(legal_moves))
+        game.make_move(moves[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark seeking in a long game')
+    parser.add_argument('--size', type=int, default=24, help='board size')
+    parser.add_argument('--rows', type=int, default=8, help='rows of pieces per team')
+    parser.add_argument('--interval', type=int, default=32)
+    parser.add_argument('--seeks', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    preset = BoardPresetDataclass(
+        args.size, args.size,
+        [(column, row) for column in range(args.size) for row in range(args.rows) if (column + row) % 2],
+        [(column, row) for column in range(args.size) for row in range(args.size - args.rows, args.size)
+         if (column + row) % 2])
+    moves = play_random_game(preset, rng)
+    positions = [rng.randrange(len(moves) + 1) for _ in range(args.seeks)]
+    print(f'{args.size}x{args.size} game of {len(moves)} moves, snapshot every {args.interval} moves')
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'game.txt')
+        with open(path, 'w') as file:
+            file.writelines(f'{move.source[0]},{move.source[1]},{move.target[0]},{move.target[1]}\n' for move in moves)
+
+        start_time = time.perf_counter()
+        for position in positions:
+            game = CheckersGame(CheckerBoardFactory.build_board_from_preset(preset))
+            for move in moves[:position]:
+                game.make_move(move)
+        elapsed = time.perf_counter() - start_time
+        print(f'replay from the start  {elapsed / len(positions) * 1000:>8.2f}ms per position')
+
+        start_time = time.perf_counter()
+        len(GameReplay(path, preset, args.interval))
+        print(f'index build            {(time.perf_counter() - start_time) * 1000:>8.2f}ms, '
+              f'{os.path.getsize(path + ".replay-index")} bytes')
+
+        replay = GameReplay(path, preset, args.interval)
+        start_time = time.perf_counter()
+        len(replay)
+        print(f'index load             {(time.perf_counter() - start_time) * 1000:>8.2f}ms')
+        start_time = time.perf_counter()
+        for position in positions:
+            replay.seek(position)
+        elapsed = time.perf_counter() - start_time
+        print(f'seek                   {elapsed / len(positions) * 1000:>8.2f}ms per position')
+
+        replay.seek(len(moves))
+        start_time = time.perf_counter()
+        while replay.position:
+            replay.step_back()
+        elapsed = time.perf_counter() - start_time
+        print(f'step back              {elapsed / len(moves) * 1000:>8.2f}ms per move')
+        start_time = time.perf_counter()
+        while replay.position < len(moves):
+            replay.step_forward()
+        elapsed = time.perf_counter() - start_time
+        print(f'step forward           {elapsed / len(moves) * 1000:>8.2f}ms per move')
+
+
+if __name__ == '__main__':
+    main()
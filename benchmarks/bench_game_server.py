@@ -0,0 +1,94 @@
+'''
+Load generator for the game server: many concurrent clients each play random games (NEW, then LEGAL and MOVE until
+the game is over, then RESIGN to close the session) and the latency of every request is recorded.
+Starts a server in-process unless --port or --unix points at a running one.
+Run from the repository root: python -m benchmarks.bench_game_server
+'''
+import argparse
+import asyncio
+import random
+import time
+from typing import List, Optional
+
+from game_server import GameServer
+
+
+class ProtocolError(Exception):
+    pass
+
+
+async def request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, line: str,
+                  latencies: List[float]) -> List[str]:
+    start_time = time.perf_counter()
+    writer.write(line.encode() + b'\n')
+    await writer.drain()
+    response = (await reader.readline()).decode().split()
+    latencies.append(time.perf_counter() - start_time)
+    if not response or response[0] != 'OK':
+        raise ProtocolError(f'{line} -> {" ".join(response)}')
+    return response[1:]
+
+
+async def play_games(host: str, port: Optional[int], unix_path: Optional[str], games: int, seed: int,
+                     latencies: List[float]) -> int:
+    rng = random.Random(seed)
+    if unix_path is not None:
+        reader, writer = await asyncio.open_unix_connection(unix_path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    moves = 0
+    for _ in range(games):
+        session_id, = await request(reader, writer, 'NEW', latencies)
+        while True:
+            legal_moves = await request(reader, writer, f'LEGAL {session_id}', latencies)
+            if not legal_moves:
+                break
+            await request(reader, writer, f'MOVE {session_id} {rng.choice(legal_moves)}', latencies)
+            moves += 1
+        await request(reader, writer, f'RESIGN {session_id}', latencies)
+    await request(reader, writer, 'QUIT', latencies)
+    writer.close()
+    await writer.wait_closed()
+    return moves
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def run(args: argparse.Namespace):
+    server = None
+    host, port, unix_path = args.host, args.port, args.unix
+    if port is None and unix_path is None:
+        server = GameServer(max_sessions=args.clients * 2)
+        listener = await server.start_tcp(host, 0)
+        port = listener.sockets[0].getsockname()[1]
+    latencies: List[float] = []
+    start_time = time.perf_counter()
+    moves = await asyncio.gather(*(play_games(host, port, unix_path, args.games_per_client, args.seed + client,
+                                              latencies) for client in range(args.clients)))
+    elapsed = time.perf_counter() - start_time
+    if server is not None:
+        await server.close()
+    latencies.sort()
+    print(f'{args.clients} clients, {args.clients * args.games_per_client} games, {sum(moves)} moves, '
+          f'{len(latencies)} requests in {elapsed:.2f}s')
+    print(f'{sum(moves) / elapsed:.0f} moves/s, {len(latencies) / elapsed:.0f} requests/s')
+    print('latency ' + ', '.join(f'p{int(fraction * 100)} {percentile(latencies, fraction) * 1000:.2f}ms'
+                                 for fraction in (0.5, 0.9, 0.99)) + f', max {latencies[-1] * 1000:.2f}ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate load on the game server')
+    parser.add_argument('--clients', type=int, default=200, help='concurrent connections')
+    parser.add_argument('--games-per-client', type=int, default=2)
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=None, help='port of a running server')
+    parser.add_argument('--unix', type=str, default=None, help='Unix socket of a running server')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
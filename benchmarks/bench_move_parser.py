@@ -0,0 +1,77 @@
+'''
+Compares the previous line-by-line move file reader with the block reader in move_iterators on generated
+multi-megabyte move files.
+Run from the repository root: python -m benchmarks.bench_move_parser
+'''
+import argparse
+import os
+import random
+import tempfile
+import time
+from typing import Callable, Iterator, Optional, Tuple
+
+from checkersmove import CheckersMove, IllegalMoveException, MoveInternTable, get_move_intern_table
+from move_iterators import create_move_iterator_from_move_file
+
+
+def create_legacy_move_iterator_from_move_file(path: str,
+                                               intern_table: Optional[MoveInternTable] = None) -> Iterator[CheckersMove]:
+    '''
+    create_move_iterator_from_move_file as it was before it read in blocks: kept here only as the benchmark baseline.
+    '''
+    build_move = CheckersMove if intern_table is None else intern_table.get
+    with open(path, 'r') as file:
+        for line in file:
+            try:
+                move = build_move([int(coord) for coord in line.split(',')])
+            except ValueError as e:
+                raise IllegalMoveException(str(e))
+            yield move
+
+
+def write_move_file(path: str, size: int, seed: int = 0):
+    '''
+    Writes random moves between tiles of an 8x8 board until the file holds at least size bytes.
+    '''
+    rng = random.Random(seed)
+    lines = []
+    written = 0
+    while written < size:
+        column, row = rng.randrange(8), rng.randrange(8)
+        distance = rng.choice((1, 2))
+        line = f'{column},{row},{column + rng.choice((-distance, distance))},{row + rng.choice((-distance, distance))}\n'
+        lines.append(line)
+        written += len(line)
+    with open(path, 'w') as file:
+        file.writelines(lines)
+
+
+def time_reader(read_moves: Callable[[], Iterator[CheckersMove]]) -> Tuple[int, float]:
+    start_time = time.perf_counter()
+    move_count = sum(1 for _ in read_moves())
+    return move_count, time.perf_counter() - start_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the line-by-line and block move file readers')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 8, 32], help='file sizes in megabytes')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    intern_table = get_move_intern_table(8, 8)
+    readers = {'line by line': create_legacy_move_iterator_from_move_file,
+               'block': create_move_iterator_from_move_file}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            path = os.path.join(directory, f'moves_{size}mb.txt')
+            write_move_file(path, size << 20)
+            print(f'{size} MB:')
+            for table_name, table in (('fresh moves', None), ('interned', intern_table)):
+                for reader_name, reader in readers.items():
+                    move_count, elapsed = min((time_reader(lambda: reader(path, table)) for _ in range(args.repeat)),
+                                              key=lambda timing: timing[1])
+                    print(f'    {reader_name:14}{table_name:13}{move_count} moves in {elapsed:.3f}s '
+                          f'({move_count / elapsed:.0f} moves/s, {size / elapsed:.1f} MB/s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+'''
+Compares the cost of creating, hashing and comparing moves for the previous CheckersMove implementation, the slotted
+CheckersMove and moves handed out by a MoveInternTable.
+Run from the repository root: python -m benchmarks.bench_moves
+'''
+import argparse
+import random
+import timeit
+import tracemalloc
+from typing import Callable, List
+
+from checkersmove import CheckersMove, MoveInternTable
+
+
+class LegacyCheckersMove:
+    '''
+    CheckersMove as it was before it was slotted: kept here only as the benchmark baseline.
+    '''
+    def __init__(self, move: List[int]):
+        for coordinate in move:
+            int(coordinate)
+        self.source = (move[0], move[1])
+        self.target = (move[2], move[3])
+
+    def __eq__(self, other):
+        return (self.source, self.target) == other
+
+    def __hash__(self):
+        return hash(f"source {self.source} target {self.target}")
+
+
+def build_raw_moves(count: int, seed: int = 0) -> List[List[int]]:
+    rng = random.Random(seed)
+    raw_moves = []
+    for _ in range(count):
+        column, row = rng.randrange(8), rng.randrange(8)
+        distance = rng.choice((1, 2))
+        raw_moves.append([column, row, column + rng.choice((-distance, distance)), row + rng.choice((-distance, distance))])
+    return raw_moves
+
+
+def measure_allocations(build_move: Callable, raw_moves: List[List[int]]) -> int:
+    tracemalloc.start()
+    moves = [build_move(raw_move) for raw_move in raw_moves]
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del moves
+    return peak
+
+
+def run_benchmark(count: int, repeat: int):
+    raw_moves = build_raw_moves(count)
+    intern_table = MoveInternTable(8, 8)
+    builders = {'legacy': LegacyCheckersMove, 'slotted': CheckersMove, 'interned': intern_table.get}
+    print(f'{count} moves, best of {repeat}')
+    print(f'{"":10}{"create (s)":>12}{"hash (s)":>12}{"lookup (s)":>12}{"peak memory (KiB)":>20}')
+    for name, build_move in builders.items():
+        create_time = min(timeit.repeat(lambda: [build_move(raw_move) for raw_move in raw_moves],
+                                        number=1, repeat=repeat))
+        moves = [build_move(raw_move) for raw_move in raw_moves]
+        hash_time = min(timeit.repeat(lambda: [hash(move) for move in moves], number=1, repeat=repeat))
+        move_set = set(moves)
+        lookup_time = min(timeit.repeat(lambda: [move in move_set for move in moves], number=1, repeat=repeat))
+        peak = measure_allocations(build_move, raw_moves)
+        print(f'{name:10}{create_time:12.4f}{hash_time:12.4f}{lookup_time:12.4f}{peak / 1024:20.1f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark move creation and hashing')
+    parser.add_argument('--count', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    run_benchmark(args.count, args.repeat)
@@ -0,0 +1,55 @@
+'''
+Builds an opening book from a generated self-play corpus, then times lookups of random move prefixes of its games.
+Run from the repository root: python -m benchmarks.bench_opening_book
+'''
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from board import CheckerBoardPresets
+from corpus_generator import CorpusSettings, generate_corpus
+from move_iterators import create_move_iterator_from_move_file
+from opening_book import OpeningBook
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark building and querying an opening book')
+    parser.add_argument('--games', type=int, default=2000)
+    parser.add_argument('--lookups', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        settings = CorpusSettings(CheckerBoardPresets.standard_8_by_8, os.path.join(directory, 'games'), args.seed)
+        paths = [game.path for game in generate_corpus(settings, args.games, args.workers)]
+        with OpeningBook(os.path.join(directory, 'book.sqlite')) as book:
+            start_time = time.perf_counter()
+            book.add_game_files(paths, args.workers)
+            elapsed = time.perf_counter() - start_time
+            positions = book.connection.execute('SELECT COUNT(*) FROM positions').fetchone()[0]
+            print(f'build   {args.games} games, {positions} positions in {elapsed:.2f}s '
+                  f'({args.games / elapsed:.0f} games/s)')
+            prefixes = []
+            for _ in range(args.lookups):
+                moves = list(create_move_iterator_from_move_file(rng.choice(paths)))
+                prefixes.append(moves[:rng.randrange(len(moves) + 1)])
+            start_time = time.perf_counter()
+            for prefix in prefixes:
+                book.lookup(prefix)
+            elapsed = time.perf_counter() - start_time
+            average_length = sum(map(len, prefixes)) / len(prefixes)
+            print(f'lookup  {args.lookups} prefixes of {average_length:.1f} moves on average in {elapsed:.2f}s '
+                  f'({elapsed / args.lookups * 1000:.3f}ms per lookup)')
+            keys = [key for key, in book.connection.execute('SELECT key FROM positions LIMIT ?', (args.lookups,))]
+            start_time = time.perf_counter()
+            for key in keys:
+                book.position_statistics(key)
+            elapsed = time.perf_counter() - start_time
+            print(f'by key  {len(keys)} positions in {elapsed:.3f}s ({elapsed / len(keys) * 1000:.3f}ms per lookup)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+'''
+Measures how perft and the fixed-depth search of ParallelTreeWalker scale with the number of worker processes:
+time, speedup over one worker and efficiency (speedup / workers). Pool start-up is not timed.
+Scaling is bounded by the CPUs available: os.cpu_count() is printed with the results.
+Run from the repository root: python -m benchmarks.bench_parallel_search
+'''
+import argparse
+import os
+import time
+
+from board import CheckerBoardFactory, CheckerBoardPresets
+from checkers_game import CheckersGame
+from parallel_search import ParallelTreeWalker
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark parallel perft and search')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--perft-depth', type=int, default=7)
+    parser.add_argument('--search-depth', type=int, default=8)
+    parser.add_argument('--split-depth', type=int, default=2)
+    args = parser.parse_args()
+    print(f'{os.cpu_count()} CPUs')
+    base_times = {}
+    for workers in args.workers:
+        with ParallelTreeWalker(workers, args.split_depth) as walker:
+            for name, run in (('perft', lambda game: walker.perft(game, args.perft_depth)),
+                              ('search', lambda game: walker.search(game, args.search_depth).nodes)):
+                game = CheckersGame(CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8))
+                start_time = time.perf_counter()
+                nodes = run(game)
+                elapsed = time.perf_counter() - start_time
+                base_time = base_times.setdefault(name, elapsed)
+                speedup = base_time / elapsed
+                print(f'{name:>6} {workers} workers: {nodes:>9} nodes {elapsed:>7.2f}s  speedup {speedup:>5.2f}  '
+                      f'efficiency {speedup / workers:>5.0%}', flush=True)
+
+
+if __name__ == '__main__':
+    main()
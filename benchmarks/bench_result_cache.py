@@ -0,0 +1,68 @@
+'''
+Validates a generated corpus without a cache, with a cold cache and with a warm one, then simulates live games:
+every game file grows a few lines at a time and is validated after each append, from the start or through the
+cache's checkpoints.
+Run from the repository root: python -m benchmarks.bench_result_cache
+'''
+import argparse
+import os
+import tempfile
+import time
+
+from board import CheckerBoardPresets
+from corpus_generator import CorpusSettings, generate_corpus
+from main import validate_game_files
+from result_cache import ResultCache
+
+
+def timed_validation(paths, cache=None) -> float:
+    start_time = time.perf_counter()
+    for _ in validate_game_files(paths, cache=cache):
+        pass
+    return time.perf_counter() - start_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the validation result cache')
+    parser.add_argument('--games', type=int, default=500)
+    parser.add_argument('--live-games', type=int, default=50)
+    parser.add_argument('--lines-per-append', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        settings = CorpusSettings(CheckerBoardPresets.standard_8_by_8, os.path.join(directory, 'games'), args.seed)
+        paths = sorted(game.path for game in generate_corpus(settings, args.games))
+        print(f'{len(paths)} games')
+        print(f'no cache     {timed_validation(paths):.2f}s')
+        with ResultCache(os.path.join(directory, 'cache.sqlite')) as cache:
+            print(f'cold cache   {timed_validation(paths, cache):.2f}s')
+            print(f'warm cache   {timed_validation(paths, cache):.2f}s')
+            print(f'counters     {cache.counters}')
+
+        live_directory = os.path.join(directory, 'live')
+        os.makedirs(live_directory)
+        games = {}
+        for path in paths[:args.live_games]:
+            with open(path, 'rb') as file:
+                games[os.path.join(live_directory, os.path.basename(path))] = file.read().splitlines(keepends=True)
+        for name, cache_path in (('from start ', None), ('checkpoints', os.path.join(directory, 'live.sqlite'))):
+            cache = None if cache_path is None else ResultCache(cache_path)
+            elapsed = 0.0
+            validations = 0
+            for line_count in range(args.lines_per_append, max(map(len, games.values())) + args.lines_per_append,
+                                    args.lines_per_append):
+                grown_paths = [path for path, lines in games.items() if line_count - args.lines_per_append < len(lines)]
+                for path in grown_paths:
+                    with open(path, 'wb') as file:
+                        file.write(b''.join(games[path][:line_count]))
+                elapsed += timed_validation(grown_paths, cache)
+                validations += len(grown_paths)
+            print(f'live games, {name}  {validations} validations in {elapsed:.2f}s '
+                  f'({elapsed / validations * 1000:.2f}ms each)')
+            if cache is not None:
+                print(f'counters     {cache.counters}')
+                cache.close()
+
+
+if __name__ == '__main__':
+    main()
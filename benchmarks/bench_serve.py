@@ -0,0 +1,40 @@
+'''
+Compares validating game files with one main.py process per file against a single warm main.py --serve process
+fed the same paths on stdin, one at a time, waiting for every result line as a pipeline would.
+Run from the repository root: python -m benchmarks.bench_serve
+'''
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+GAMES_DIRECTORY = os.path.join('tests', 'games')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark a process per game file against a warm validator')
+    parser.add_argument('--files', type=int, default=50)
+    args = parser.parse_args()
+    names = sorted(os.listdir(GAMES_DIRECTORY))
+    paths = [os.path.join(GAMES_DIRECTORY, names[index % len(names)]) for index in range(args.files)]
+    start_time = time.perf_counter()
+    for path in paths:
+        subprocess.run([sys.executable, 'main.py', '--workers', '1', path], stdout=subprocess.DEVNULL, check=True)
+    spawn_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    with subprocess.Popen([sys.executable, 'main.py', '--serve'], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                          text=True) as process:
+        for path in paths:
+            process.stdin.write(path + '\n')
+            process.stdin.flush()
+            process.stdout.readline()
+        process.stdin.close()
+    serve_time = time.perf_counter() - start_time
+    for name, elapsed in (('process per file', spawn_time), ('warm --serve', serve_time)):
+        print(f'{name:>16}: {elapsed:>6.2f}s  {elapsed / len(paths) * 1000:>7.2f}ms per file  '
+              f'{len(paths) / elapsed:>7.1f} files/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+'''
+Compares pickle with CheckerBoard.to_bytes/from_bytes and CheckersGame.to_bytes/from_bytes, in size and speed, on
+positions from random games.
+Run from the repository root: python -m benchmarks.bench_snapshot
+'''
+import argparse
+import pickle
+import random
+import time
+from typing import Callable, List
+
+from board import BitboardCheckerBoard, CheckerBoard, CheckerBoardFactory, CheckerBoardPresets
+from checkers_game import CheckersGame
+
+
+def random_positions(count: int, rng: random.Random) -> List[CheckersGame]:
+    positions = []
+    while len(positions) < count:
+        game = CheckersGame(CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8))
+        for _ in range(rng.randrange(40)):
+            legal_moves = game.legal_moves()
+            if not legal_moves:
+                break
+            game.make_move(rng.choice(legal_moves))
+        game.undo_stack.clear()
+        positions.append(game)
+    return positions
+
+
+def time_per_call(function: Callable, values: list) -> float:
+    start_time = time.perf_counter()
+    for value in values:
+        function(value)
+    return (time.perf_counter() - start_time) / len(values)
+
+
+def report(name: str, values: list, dumps: Callable, loads: Callable):
+    encoded = [dumps(value) for value in values]
+    print(f'{name:<28} {sum(map(len, encoded)) / len(encoded):>8.0f} bytes  '
+          f'dump {time_per_call(dumps, values) * 1e6:>8.1f}us  load {time_per_call(loads, encoded) * 1e6:>8.1f}us')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark board and game snapshots against pickle')
+    parser.add_argument('--positions', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    games = random_positions(args.positions, random.Random(args.seed))
+    boards = [game.board for game in games]
+    bitboards = [BitboardCheckerBoard.from_bytes(board.to_bytes()) for board in boards]
+    report('board pickle', boards, pickle.dumps, pickle.loads)
+    report('board to_bytes', boards, CheckerBoard.to_bytes, CheckerBoard.from_bytes)
+    report('bitboard pickle', bitboards, pickle.dumps, pickle.loads)
+    report('bitboard to_bytes', bitboards, BitboardCheckerBoard.to_bytes, BitboardCheckerBoard.from_bytes)
+    report('game pickle', games, pickle.dumps, pickle.loads)
+    report('game to_bytes', games, CheckersGame.to_bytes, CheckersGame.from_bytes)
+    report('game to_bytes (bitboard)', games, CheckersGame.to_bytes,
+           lambda data: CheckersGame.from_bytes(data, BitboardCheckerBoard))
+
+
+if __name__ == '__main__':
+    main()
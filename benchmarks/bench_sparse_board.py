@@ -0,0 +1,77 @@
+'''
+Compares the list, bitboard and sparse boards on boards from 8x8 up to 1000x1000 holding up to a few hundred pieces:
+memory, board setup, the capture scan of a new CheckersGame, random play and __str__.
+Run from the repository root: python -m benchmarks.bench_sparse_board
+'''
+import argparse
+import random
+import time
+import tracemalloc
+
+from board import BitboardCheckerBoard, BoardPresetDataclass, CheckerBoard, CheckerBoardFactory, SparseCheckerBoard
+from checkers_game import CheckersGame
+
+BOARD_CLASSES = {'list': CheckerBoard, 'bitboard': BitboardCheckerBoard, 'sparse': SparseCheckerBoard}
+
+
+def build_preset(size: int, pieces_per_team: int) -> BoardPresetDataclass:
+    '''
+    Two facing armies of three rows around the middle of a size x size board, as wide as pieces_per_team allows.
+    '''
+    columns = range((size - min(size, 2 * -(-pieces_per_team // 3))) // 2, size)[:2 * -(-pieces_per_team // 3)]
+    middle = size // 2
+    white = [(column, row) for row in range(middle - 4, middle - 1) for column in columns if (column + row) % 2]
+    black = [(column, row) for row in range(middle + 1, middle + 4) for column in columns if (column + row) % 2]
+    return BoardPresetDataclass(size, size, white[:pieces_per_team], black[:pieces_per_team])
+
+
+def benchmark(preset: BoardPresetDataclass, board_class, moves: int, seed: int) -> str:
+    tracemalloc.start()
+    board = CheckerBoardFactory.build_board_from_preset(preset, board_class)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del board
+    start_time = time.perf_counter()
+    board = CheckerBoardFactory.build_board_from_preset(preset, board_class)
+    setup_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    game = CheckersGame(board)
+    scan_time = time.perf_counter() - start_time
+    rng = random.Random(seed)
+    played = 0
+    start_time = time.perf_counter()
+    while played < moves:
+        legal_moves = game.legal_moves()
+        if not legal_moves:
+            break
+        game.make_move(rng.choice(legal_moves))
+        played += 1
+    play_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    str(board)
+    str_time = time.perf_counter() - start_time
+    return f'{memory / 1024:>10.0f}KB  setup {setup_time * 1000:>8.2f}ms  scan {scan_time * 1000:>7.2f}ms  ' \
+           f'play {played / play_time:>7.0f} moves/s  str {str_time * 1000:>8.2f}ms'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark board representations on large boards')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[8, 100, 300, 1000])
+    parser.add_argument('--pieces', type=int, default=150, help='pieces per team on boards larger than 8x8')
+    parser.add_argument('--moves', type=int, default=300, help='random moves played per game')
+    parser.add_argument('--bitboard-max-size', type=int, default=300,
+                        help='skip the bitboard above this size: its __str__ takes minutes on 1000x1000')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    for size in args.sizes:
+        preset = build_preset(size, args.pieces)
+        print(f'{size}x{size}, {len(preset.white_coordinates) + len(preset.black_coordinates)} pieces')
+        benchmark(preset, SparseCheckerBoard, args.moves, args.seed)  # fills the geometry and Zobrist caches
+        for name, board_class in BOARD_CLASSES.items():
+            if board_class is BitboardCheckerBoard and size > args.bitboard_max_size:
+                continue
+            print(f'    {name:<9} {benchmark(preset, board_class, args.moves, args.seed)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from checkersmove import CheckersMove, IllegalMoveException, get_move_intern_table
+from move_iterators import create_move_iterator_from_move_file
+
+# Binary move log layout, little endian:
+#     header: magic b'CKML', format version (uint8), bytes per coordinate (uint8: 1, 2 or 4),
+#             board length (uint16), board height (uint16), move count (uint32), flags (uint32)
+#     moves:  move count x 4 signed coordinates: source column, source row, target column, target row
+#     malformed line: with FLAG_MALFORMED_LINE, the rest of the file is the UTF-8 text of the malformed line
+# A text file whose parsing stopped at a malformed line is stored with FLAG_MALFORMED_LINE: the moves before that line
+# are kept and the reader raises IllegalMoveException with the line's text after yielding them, like
+# create_move_iterator_from_move_file.
+MAGIC = b'CKML'
+FORMAT_VERSION = 2
+HEADER = struct.Struct('<4sBBHHII')
+FLAG_MALFORMED_LINE = 1
+COORDINATE_FORMATS = {1: 'b', 2: 'h', 4: 'i'}
+# Format of a whole packed move read as one unsigned integer, per coordinate width
+PACKED_MOVE_FORMATS = {1: 'I', 2: 'Q'}
+MOVES_PER_BLOCK = 1 << 16
+
+
+class MoveLogFormatException(Exception):
+    pass
+
+
+def get_coordinate_width(moves: List[CheckersMove]) -> int:
+    largest = max((abs(coordinate) for move in moves for coordinate in (*move.source, *move.target)), default=0)
+    for width in COORDINATE_FORMATS:
+        if largest < 1 << (8 * width - 1):
+            return width
+    raise MoveLogFormatException(f'Coordinate {largest} does not fit in a binary move log')
+
+
+def write_binary_move_log(path: str, moves: List[CheckersMove], board_length: int = 8, board_height: int = 8,
+                          malformed_line: Optional[str] = None):
+    '''
+    :param malformed_line: the text of the malformed line that followed the moves, if any
+    '''
+    width = get_coordinate_width(moves)
+    move_format = struct.Struct(f'<4{COORDINATE_FORMATS[width]}')
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION, width, board_length, board_height, len(moves),
+                               0 if malformed_line is None else FLAG_MALFORMED_LINE))
+        file.write(b''.join(move_format.pack(*move.source, *move.target) for move in moves))
+        if malformed_line is not None:
+            file.write(malformed_line.encode())
+
+
+def convert_move_file_to_binary_log(text_path: str, binary_path: str, board_length: int = 8,
+                                    board_height: int = 8) -> int:
+    '''
+    Converts a comma separated move file into a binary move log.
+    :return: the number of moves written
+    '''
+    moves = []
+    malformed_line = None
+    try:
+        for move in create_move_iterator_from_move_file(text_path):
+            moves.append(move)
+    except IllegalMoveException as e:
+        malformed_line = str(e)
+    write_binary_move_log(binary_path, moves, board_length, board_height, malformed_line)
+    return len(moves)
+
+
+def is_binary_move_log(path: str) -> bool:
+    with open(path, 'rb') as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+def create_move_iterator_from_binary_log(path: str) -> Iterator[CheckersMove]:
+    '''
+    Memory maps a binary move log and yields its moves. With one or two bytes per coordinate, each move is read as
+    a single integer and looked up in a table of moves already seen, so a move is only decoded the first time it
+    occurs. Moves are interned in the MoveInternTable of the log's board size.
+    '''
+    with open(path, 'rb') as file:
+        width, board_length, board_height, move_count, flags = _read_header(file.read(HEADER.size),
+                                                                            os.fstat(file.fileno()).st_size, path)
+        if move_count:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+                yield from _read_moves(mapped_file, width, move_count, board_length, board_height)
+        if flags & FLAG_MALFORMED_LINE:
+            file.seek(HEADER.size + 4 * width * move_count)
+            raise IllegalMoveException(file.read().decode(errors='replace'), move_count + 1)
+
+
+def create_move_iterator_from_binary_data(data: bytes, name: str) -> Iterator[CheckersMove]:
+    '''
+    Yields the moves of a binary move log already read into memory, as create_move_iterator_from_binary_log does.
+    :param name: what to call the log in a MoveLogFormatException, such as the path it was read from
+    '''
+    width, board_length, board_height, move_count, flags = _read_header(data[:HEADER.size], len(data), name)
+    if move_count:
+        yield from _read_moves(data, width, move_count, board_length, board_height)
+    if flags & FLAG_MALFORMED_LINE:
+        raise IllegalMoveException(data[HEADER.size + 4 * width * move_count:].decode(errors='replace'),
+                                   move_count + 1)
+
+
+def _read_header(header: bytes, size: int, name: str) -> Tuple[int, int, int, int, int]:
+    '''
+    :param size: the size of the whole log
+    :return: the bytes per coordinate, board length, board height, move count and flags
+    '''
+    if len(header) < HEADER.size:
+        raise MoveLogFormatException(f'{name} is too short to be a binary move log')
+    magic, version, width, board_length, board_height, move_count, flags = HEADER.unpack(header)
+    if magic != MAGIC or version != FORMAT_VERSION or width not in COORDINATE_FORMATS:
+        raise MoveLogFormatException(f'{name} is not a version {FORMAT_VERSION} binary move log')
+    if size < HEADER.size + 4 * width * move_count:
+        raise MoveLogFormatException(f'{name} is truncated')
+    return width, board_length, board_height, move_count, flags
+
+
+def _read_moves(log_data: Union[mmap.mmap, bytes], width: int, move_count: int, board_length: int,
+                board_height: int) -> Iterator[CheckersMove]:
+    intern_table = get_move_intern_table(board_length, board_height)
+    move_format = struct.Struct(f'<4{COORDINATE_FORMATS[width]}')
+    end = HEADER.size + 4 * width * move_count
+    if width not in PACKED_MOVE_FORMATS or sys.byteorder != 'little':
+        for coordinates in move_format.iter_unpack(log_data[HEADER.size:end]):
+            yield intern_table.get(coordinates)
+        return
+    moves_by_code: Dict[int, CheckersMove] = {}
+    block_size = 4 * width * MOVES_PER_BLOCK
+    for block_start in range(HEADER.size, end, block_size):
+        with memoryview(log_data)[block_start:min(block_start + block_size, end)] as block:
+            codes = block.cast(PACKED_MOVE_FORMATS[width]).tolist()
+        for code in codes:
+            move = moves_by_code.get(code)
+            if move is None:
+                move = intern_table.get(move_format.unpack(code.to_bytes(4 * width, 'little')))
+                moves_by_code[code] = move
+            yield move
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert comma separated move files into binary move logs')
+    parser.add_argument('paths', type=str, nargs='+')
+    parser.add_argument('--output-dir', type=str, default=None,
+                        help='directory for the logs, defaults to next to each move file')
+    parser.add_argument('--length', type=int, default=8, help='board length')
+    parser.add_argument('--height', type=int, default=8, help='board height')
+    args = parser.parse_args()
+    for path in args.paths:
+        output_dir = args.output_dir or os.path.dirname(path)
+        binary_path = os.path.join(output_dir, os.path.splitext(os.path.basename(path))[0] + '.ckml')
+        move_count = convert_move_file_to_binary_log(path, binary_path, args.length, args.height)
+        print(f'{path} -> {binary_path}: {move_count} moves')
+
+
+if __name__ == '__main__':
+    main()
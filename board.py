@@ -1,8 +1,11 @@
+import struct
 from dataclasses import dataclass
-from typing import List, Optional, Tuple, Dict
+from functools import lru_cache
+from typing import List, Optional, Tuple, Dict, Type
 
 from game_pieces import CheckersGamePiece
 from checkers_enums import TeamEnum, ROW_INDEX, COLUMN_INDEX
+from zobrist import get_zobrist_table
 
 
 class BoardException(Exception):
@@ -21,6 +24,17 @@ class MissingGamePieceException(BoardException):
     pass
 
 
+class SnapshotFormatException(Exception):
+    pass
+
+
+# Snapshot header: format version, flags, length, height. Followed by the white and the black piece masks, each
+# (length * height + 7) // 8 bytes, little-endian, with tile (column, row) at bit column * height + row.
+BOARD_SNAPSHOT_VERSION = 1
+BOARD_SNAPSHOT_HEADER = struct.Struct('<BBHH')
+BLACK_TO_MOVE_FLAG = 1
+
+
 class Board:
     def __init__(self, board_length: int, board_height: int):
         self.length = board_length
@@ -40,10 +54,27 @@ class CheckerBoard(Board):
     def __init__(self, board_length, board_height):
         super().__init__(board_length, board_height)
         self.active_pieces = {}
+        self.piece_counts = {TeamEnum.white: 0, TeamEnum.black: 0}
+        self.zobrist_table = get_zobrist_table(board_length, board_height)
+        self._zobrist_key = 0
+        self._black_to_move = False
+
+    @property
+    def zobrist_key(self) -> int:
+        '''
+        64-bit Zobrist key of the position, including the side to move, kept up to date by every board change.
+        '''
+        return self._zobrist_key
+
+    def toggle_side_to_move(self):
+        self._zobrist_key ^= self.zobrist_table.side_to_move_key
+        self._black_to_move = not self._black_to_move
 
     def remove_piece(self, coordinates: Tuple[int, int]):
         self.board[coordinates[COLUMN_INDEX]][coordinates[ROW_INDEX]] = None
-        self.active_pieces.pop((coordinates[COLUMN_INDEX], coordinates[ROW_INDEX]))
+        team = self.active_pieces.pop((coordinates[COLUMN_INDEX], coordinates[ROW_INDEX]))
+        self.piece_counts[team] -= 1
+        self._zobrist_key ^= self.zobrist_table.piece_key((coordinates[COLUMN_INDEX], coordinates[ROW_INDEX]), team)
 
     def verify_game_piece_can_be_moved(self, source: Tuple[int, int], target: Tuple[int, int]):
         self.check_if_coordinates_are_on_board(source)
@@ -61,6 +92,9 @@ class CheckerBoard(Board):
         self.verify_game_piece_can_be_moved(source, target)
         self.board[target[COLUMN_INDEX]][target[ROW_INDEX]] = self.board[source[COLUMN_INDEX]][source[ROW_INDEX]]
         self.active_pieces[(target[COLUMN_INDEX], target[ROW_INDEX])] = self.board[source[COLUMN_INDEX]][source[ROW_INDEX]].team
+        self._zobrist_key ^= self.zobrist_table.piece_key((target[COLUMN_INDEX], target[ROW_INDEX]),
+                                                          self.board[source[COLUMN_INDEX]][source[ROW_INDEX]].team)
+        self.piece_counts[self.board[source[COLUMN_INDEX]][source[ROW_INDEX]].team] += 1
         self.remove_piece(source)
 
     def capture_piece(self, source: Tuple[int, int], target: Tuple[int, int],
@@ -72,8 +106,12 @@ class CheckerBoard(Board):
 
     def _create_piece(self, coordinates: Tuple[int, int], team: TeamEnum):
         self.check_if_coordinates_are_on_board(coordinates)
+        if self.board[coordinates[COLUMN_INDEX]][coordinates[ROW_INDEX]] is not None:
+            self.remove_piece(coordinates)
         self.board[coordinates[COLUMN_INDEX]][coordinates[ROW_INDEX]] = CheckersGamePiece(team)
         self.active_pieces[(coordinates[COLUMN_INDEX], coordinates[ROW_INDEX])] = team
+        self.piece_counts[team] += 1
+        self._zobrist_key ^= self.zobrist_table.piece_key((coordinates[COLUMN_INDEX], coordinates[ROW_INDEX]), team)
 
     def set_up_pieces(self, white_coordinates: List[tuple], black_coordinates: List[Tuple]):
         for coordinates in white_coordinates:
@@ -81,6 +119,60 @@ class CheckerBoard(Board):
         for coordinates in black_coordinates:
             self._create_piece(coordinates, TeamEnum.black)
 
+    def _iterate_mask(self, mask: int):
+        while mask:
+            lowest_bit = mask & -mask
+            yield divmod(lowest_bit.bit_length() - 1, self.height)
+            mask ^= lowest_bit
+
+    def piece_masks(self) -> Tuple[int, int]:
+        '''
+        :return: the white and black pieces as bitmasks, with tile (column, row) at bit column * height + row
+        '''
+        masks = {TeamEnum.white: 0, TeamEnum.black: 0}
+        for (column, row), team in self.active_pieces.items():
+            masks[team] |= 1 << (column * self.height + row)
+        return masks[TeamEnum.white], masks[TeamEnum.black]
+
+    def _set_up_piece_masks(self, white_mask: int, black_mask: int):
+        self.set_up_pieces(list(self._iterate_mask(white_mask)), list(self._iterate_mask(black_mask)))
+
+    def to_bytes(self) -> bytes:
+        '''
+        Encodes the pieces and whether the Zobrist key has black to move, in BOARD_SNAPSHOT_HEADER plus one bit per
+        tile and team.
+        '''
+        white_mask, black_mask = self.piece_masks()
+        mask_size = (self.length * self.height + 7) // 8
+        return BOARD_SNAPSHOT_HEADER.pack(BOARD_SNAPSHOT_VERSION, BLACK_TO_MOVE_FLAG if self._black_to_move else 0,
+                                          self.length, self.height) + \
+            white_mask.to_bytes(mask_size, 'little') + black_mask.to_bytes(mask_size, 'little')
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'CheckerBoard':
+        '''
+        Rebuilds a board encoded by to_bytes, as an instance of the class it is called on.
+        :raises SnapshotFormatException: if data isn't a board snapshot of this version
+        '''
+        if len(data) < BOARD_SNAPSHOT_HEADER.size:
+            raise SnapshotFormatException('board snapshot is truncated')
+        version, flags, length, height = BOARD_SNAPSHOT_HEADER.unpack_from(data)
+        if version != BOARD_SNAPSHOT_VERSION:
+            raise SnapshotFormatException(f'unsupported board snapshot version {version}')
+        mask_size = (length * height + 7) // 8
+        if len(data) != BOARD_SNAPSHOT_HEADER.size + 2 * mask_size:
+            raise SnapshotFormatException(f'board snapshot of a {length}x{height} board has the wrong size')
+        masks_start = BOARD_SNAPSHOT_HEADER.size
+        white_mask = int.from_bytes(data[masks_start:masks_start + mask_size], 'little')
+        black_mask = int.from_bytes(data[masks_start + mask_size:], 'little')
+        if white_mask & black_mask:
+            raise SnapshotFormatException('board snapshot has a tile with pieces of both teams')
+        board = cls(length, height)
+        board._set_up_piece_masks(white_mask, black_mask)
+        if flags & BLACK_TO_MOVE_FLAG:
+            board.toggle_side_to_move()
+        return board
+
     def __str__(self):
         board_rep = ''
         for i in range(self.length-1,-1,-1):
@@ -94,10 +186,217 @@ class CheckerBoard(Board):
 
     @property
     def score(self)-> Dict:
-        scores = {TeamEnum.white: 0, TeamEnum.black: 0}
-        for team in self.active_pieces.values():
-            scores[team] += 1
-        return scores
+        return dict(self.piece_counts)
+
+
+class BitboardTiles(dict):
+    '''
+    The bit and the white and black Zobrist keys of the tiles of a length x height bitboard, keyed by coordinates.
+    A tile's entry is built the first time it is looked up and then shared by every board of the same size (see
+    get_bitboard_tiles), so a move costs one dict lookup per tile instead of recomputing bits and keys. Looking up
+    a tile that isn't on the board raises OutOfBoardException, so the lookup is also the bounds check.
+    '''
+    def __init__(self, length: int, height: int):
+        super().__init__()
+        self.length = length
+        self.height = height
+        self.zobrist_table = get_zobrist_table(length, height)
+
+    def __missing__(self, coordinates: Tuple[int, int]) -> Tuple[int, int, int]:
+        if not (0 <= coordinates[ROW_INDEX] < self.height and 0 <= coordinates[COLUMN_INDEX] < self.length):
+            raise OutOfBoardException()
+        coordinates = (coordinates[COLUMN_INDEX], coordinates[ROW_INDEX])
+        entry = (1 << (coordinates[COLUMN_INDEX] * self.height + coordinates[ROW_INDEX]),
+                 self.zobrist_table.piece_key(coordinates, TeamEnum.white),
+                 self.zobrist_table.piece_key(coordinates, TeamEnum.black))
+        self[coordinates] = entry
+        return entry
+
+
+@lru_cache(maxsize=None)
+def get_bitboard_tiles(length: int, height: int) -> BitboardTiles:
+    return BitboardTiles(length, height)
+
+
+class BitboardCheckerBoard(CheckerBoard):
+    """
+    CheckerBoard that stores each team's pieces as an integer bitmask instead of a grid of game pieces.
+    Tile (column, row) is mapped to bit column * height + row. Every tile gets a bit, since presets are free to
+    place pieces on either tile colour, and pieces never change tile colour when moving diagonally.
+    active_pieces, a dict of the shared CheckersGamePiece of each team by tile, and the piece counts are kept in step
+    with the masks, so reading a tile is a single dict lookup and the masks are handed out as they are by piece_masks.
+    Coordinates are (column, row) tuples, as CheckersMove and CheckersGame hand them out.
+    """
+    PIECES = {TeamEnum.white: CheckersGamePiece(TeamEnum.white), TeamEnum.black: CheckersGamePiece(TeamEnum.black)}
+
+    def __init__(self, board_length, board_height):
+        self.length = board_length
+        self.height = board_height
+        self.white_mask = 0
+        self.black_mask = 0
+        self.white_count = 0
+        self.black_count = 0
+        self.active_pieces: Dict[Tuple[int, int], TeamEnum] = {}
+        self._pieces: Dict[Tuple[int, int], CheckersGamePiece] = {}
+        self.zobrist_table = get_zobrist_table(board_length, board_height)
+        self._tiles = get_bitboard_tiles(board_length, board_height)
+        self._zobrist_key = 0
+        self._black_to_move = False
+
+    def check_if_coordinates_are_on_board(self, coordinates: Tuple[int, int]):
+        self._tiles[coordinates]
+
+    def __getitem__(self, item: tuple):
+        return self._pieces.get(item)
+
+    def remove_piece(self, coordinates: Tuple[int, int]):
+        bit, white_key, black_key = self._tiles[coordinates]
+        team = self.active_pieces.pop(coordinates, None)
+        if team is None:
+            raise MissingGamePieceException()
+        del self._pieces[coordinates]
+        if team is TeamEnum.white:
+            self.white_mask ^= bit
+            self.white_count -= 1
+            self._zobrist_key ^= white_key
+        else:
+            self.black_mask ^= bit
+            self.black_count -= 1
+            self._zobrist_key ^= black_key
+
+    def verify_game_piece_can_be_moved(self, source: Tuple[int, int], target: Tuple[int, int]):
+        self.check_if_coordinates_are_on_board(source)
+        self.check_if_coordinates_are_on_board(target)
+        if source not in self.active_pieces:
+            raise MissingGamePieceException()
+        if target in self.active_pieces:
+            raise BoardTileOccupiedException()
+
+    def verify_game_piece_can_be_captured(self, coordinates: Tuple[int, int]):
+        if coordinates not in self.active_pieces:
+            raise MissingGamePieceException()
+
+    def move_piece(self, source: Tuple[int, int], target: Tuple[int, int]):
+        source_bit, source_white_key, source_black_key = self._tiles[source]
+        target_bit, target_white_key, target_black_key = self._tiles[target]
+        active_pieces = self.active_pieces
+        if source not in active_pieces:
+            raise MissingGamePieceException()
+        if target in active_pieces:
+            raise BoardTileOccupiedException()
+        team = active_pieces.pop(source)
+        active_pieces[target] = team
+        self._pieces[target] = self._pieces.pop(source)
+        if team is TeamEnum.white:
+            self.white_mask ^= source_bit | target_bit
+            self._zobrist_key ^= source_white_key ^ target_white_key
+        else:
+            self.black_mask ^= source_bit | target_bit
+            self._zobrist_key ^= source_black_key ^ target_black_key
+
+    def _create_piece(self, coordinates: Tuple[int, int], team: TeamEnum):
+        coordinates = (coordinates[COLUMN_INDEX], coordinates[ROW_INDEX])
+        bit, white_key, black_key = self._tiles[coordinates]
+        if coordinates in self.active_pieces:
+            self.remove_piece(coordinates)
+        self.active_pieces[coordinates] = team
+        self._pieces[coordinates] = self.PIECES[team]
+        if team is TeamEnum.white:
+            self.white_mask |= bit
+            self.white_count += 1
+            self._zobrist_key ^= white_key
+        else:
+            self.black_mask |= bit
+            self.black_count += 1
+            self._zobrist_key ^= black_key
+
+    def piece_masks(self) -> Tuple[int, int]:
+        return self.white_mask, self.black_mask
+
+    def _set_up_piece_masks(self, white_mask: int, black_mask: int):
+        self.white_mask = white_mask
+        self.black_mask = black_mask
+        self.active_pieces = dict.fromkeys(self._iterate_mask(white_mask), TeamEnum.white)
+        self.active_pieces.update(dict.fromkeys(self._iterate_mask(black_mask), TeamEnum.black))
+        self._pieces = {coordinates: self.PIECES[team] for coordinates, team in self.active_pieces.items()}
+        self.white_count = white_mask.bit_count()
+        self.black_count = black_mask.bit_count()
+        self._zobrist_key = self.zobrist_table.compute_key(self.active_pieces, TeamEnum.white)
+
+    @property
+    def score(self) -> Dict:
+        return {TeamEnum.white: self.white_count, TeamEnum.black: self.black_count}
+
+
+class SparseCheckerBoard(CheckerBoard):
+    """
+    CheckerBoard that keeps only its pieces, in active_pieces, instead of a length x height grid, so its memory and
+    setup time grow with the number of pieces rather than the board area. Meant for large variant boards with few
+    pieces: every tile lookup is a dict lookup, which is slower than the grid on small boards.
+    Reading a tile returns a shared CheckersGamePiece per team.
+    """
+    PIECES = {TeamEnum.white: CheckersGamePiece(TeamEnum.white), TeamEnum.black: CheckersGamePiece(TeamEnum.black)}
+
+    def __init__(self, board_length, board_height):
+        self.length = board_length
+        self.height = board_height
+        self.active_pieces: Dict[Tuple[int, int], TeamEnum] = {}
+        self.piece_counts = {TeamEnum.white: 0, TeamEnum.black: 0}
+        self.zobrist_table = get_zobrist_table(board_length, board_height)
+        self._zobrist_key = 0
+        self._black_to_move = False
+
+    def __getitem__(self, item: tuple):
+        team = self.active_pieces.get((item[COLUMN_INDEX], item[ROW_INDEX]))
+        return None if team is None else self.PIECES[team]
+
+    def remove_piece(self, coordinates: Tuple[int, int]):
+        coordinates = (coordinates[COLUMN_INDEX], coordinates[ROW_INDEX])
+        try:
+            team = self.active_pieces.pop(coordinates)
+        except KeyError:
+            raise MissingGamePieceException()
+        self.piece_counts[team] -= 1
+        self._zobrist_key ^= self.zobrist_table.piece_key(coordinates, team)
+
+    def verify_game_piece_can_be_moved(self, source: Tuple[int, int], target: Tuple[int, int]):
+        self.check_if_coordinates_are_on_board(source)
+        self.check_if_coordinates_are_on_board(target)
+        if (source[COLUMN_INDEX], source[ROW_INDEX]) not in self.active_pieces:
+            raise MissingGamePieceException()
+        if (target[COLUMN_INDEX], target[ROW_INDEX]) in self.active_pieces:
+            raise BoardTileOccupiedException()
+
+    def verify_game_piece_can_be_captured(self, coordinates: Tuple[int, int]):
+        if (coordinates[COLUMN_INDEX], coordinates[ROW_INDEX]) not in self.active_pieces:
+            raise MissingGamePieceException()
+
+    def move_piece(self, source: Tuple[int, int], target: Tuple[int, int]):
+        self.verify_game_piece_can_be_moved(source, target)
+        source = (source[COLUMN_INDEX], source[ROW_INDEX])
+        target = (target[COLUMN_INDEX], target[ROW_INDEX])
+        team = self.active_pieces.pop(source)
+        self.active_pieces[target] = team
+        self._zobrist_key ^= self.zobrist_table.piece_key(source, team) ^ self.zobrist_table.piece_key(target, team)
+
+    def _create_piece(self, coordinates: Tuple[int, int], team: TeamEnum):
+        self.check_if_coordinates_are_on_board(coordinates)
+        coordinates = (coordinates[COLUMN_INDEX], coordinates[ROW_INDEX])
+        if coordinates in self.active_pieces:
+            self.remove_piece(coordinates)
+        self.active_pieces[coordinates] = team
+        self.piece_counts[team] += 1
+        self._zobrist_key ^= self.zobrist_table.piece_key(coordinates, team)
+
+    def __str__(self):
+        '''
+        Same layout as CheckerBoard.__str__ on square boards: one line per row from the top, columns from the right.
+        Empty rows are built once, so only the tiles holding pieces are visited.
+        '''
+        rows = [bytearray(b'_' * self.length) for _ in range(self.height)]
+        for (column, row), team in self.active_pieces.items():
+            rows[row][self.length - 1 - column] = ord(team.name[0])
+        return ''.join(row.decode() + '\n' for row in reversed(rows))
 
 
 @dataclass
@@ -116,7 +415,8 @@ class CheckerBoardPresets:
 
 class CheckerBoardFactory:
     @staticmethod
-    def build_board_from_preset(board_preset: BoardPresetDataclass) -> CheckerBoard:
-        built_board = CheckerBoard(board_preset.length, board_preset.height)
+    def build_board_from_preset(board_preset: BoardPresetDataclass,
+                                board_class: Type[CheckerBoard] = CheckerBoard) -> CheckerBoard:
+        built_board = board_class(board_preset.length, board_preset.height)
         built_board.set_up_pieces(board_preset.white_coordinates, board_preset.black_coordinates)
         return built_board
@@ -0,0 +1,104 @@
+from functools import lru_cache
+from typing import Dict, Tuple
+
+from checkers_enums import TeamEnum, COLUMN_INDEX, ROW_INDEX
+from checkersmove import CheckersMove, get_move_intern_table
+
+
+class BoardGeometry:
+    '''
+    Diagonal neighbours and jump squares of every tile of a length x height board, per team.
+    A tile's entries are built the first time it is looked at and then shared by every game played on a board of
+    the same size (see get_board_geometry), so large boards only pay for the tiles that are actually used.
+    Moves come from the board size's MoveInternTable, so they are the same objects a move file is parsed into.
+    '''
+    def __init__(self, length: int, height: int):
+        self.length = length
+        self.height = height
+        self.moves = get_move_intern_table(length, height)
+        self._steps: Dict[TeamEnum, Dict[Tuple[int, int], Tuple[CheckersMove, ...]]] = \
+            {TeamEnum.white: {}, TeamEnum.black: {}}
+        self._jumps: Dict[TeamEnum, Dict[Tuple[int, int], Tuple[Tuple[CheckersMove, Tuple[int, int]], ...]]] = \
+            {TeamEnum.white: {}, TeamEnum.black: {}}
+        self._jumps_through: Dict[TeamEnum, Dict[Tuple[int, int], Tuple[Tuple[CheckersMove, Tuple[int, int]], ...]]] = \
+            {TeamEnum.white: {}, TeamEnum.black: {}}
+        self._mobility_sources: Dict[TeamEnum, Dict[Tuple[int, int], Tuple[Tuple[int, int], ...]]] = \
+            {TeamEnum.white: {}, TeamEnum.black: {}}
+
+    def is_on_board(self, coordinates: Tuple[int, int]) -> bool:
+        return 0 <= coordinates[COLUMN_INDEX] < self.length and 0 <= coordinates[ROW_INDEX] < self.height
+
+    def steps(self, coordinates: Tuple[int, int], team: TeamEnum) -> Tuple[CheckersMove, ...]:
+        '''
+        Regular moves from coordinates in the team's direction that stay on the board.
+        '''
+        try:
+            return self._steps[team][coordinates]
+        except KeyError:
+            column, row = coordinates[COLUMN_INDEX], coordinates[ROW_INDEX]
+            steps = tuple(self.moves.get([column, row, column + side, row + team.value]) for side in (1, -1)
+                          if self.is_on_board((column + side, row + team.value)))
+            self._steps[team][coordinates] = steps
+            return steps
+
+    def jumps(self, coordinates: Tuple[int, int], team: TeamEnum) -> Tuple[Tuple[CheckersMove, Tuple[int, int]], ...]:
+        '''
+        Capture moves from coordinates in the team's direction that land on the board, each paired with the
+        coordinates of the piece it would capture.
+        '''
+        try:
+            return self._jumps[team][coordinates]
+        except KeyError:
+            column, row = coordinates[COLUMN_INDEX], coordinates[ROW_INDEX]
+            jumps = tuple((self.moves.get([column, row, column + 2 * side, row + 2 * team.value]),
+                           (column + side, row + team.value)) for side in (1, -1)
+                          if self.is_on_board((column + 2 * side, row + 2 * team.value)))
+            self._jumps[team][coordinates] = jumps
+            return jumps
+
+    def jumps_through(self, coordinates: Tuple[int, int],
+                      team: TeamEnum) -> Tuple[Tuple[CheckersMove, Tuple[int, int]], ...]:
+        '''
+        Capture moves of the team that start from, jump over or land on coordinates, each paired with the
+        coordinates of the piece it would capture. These are the captures whose legality can change when the
+        tile at coordinates changes.
+        '''
+        try:
+            return self._jumps_through[team][coordinates]
+        except KeyError:
+            column, row = coordinates[COLUMN_INDEX], coordinates[ROW_INDEX]
+            jumps = list(self.jumps(coordinates, team))
+            for side in (1, -1):
+                jumper = (column - side, row - team.value)
+                if self.is_on_board(jumper) and self.is_on_board((column + side, row + team.value)):
+                    jumps.append((self.moves.get([jumper[COLUMN_INDEX], jumper[ROW_INDEX], column + side,
+                                                  row + team.value]), coordinates))
+                jumper = (column - 2 * side, row - 2 * team.value)
+                if self.is_on_board(jumper):
+                    jumps.append((self.moves.get([jumper[COLUMN_INDEX], jumper[ROW_INDEX], column, row]),
+                                  (column - side, row - team.value)))
+            self._jumps_through[team][coordinates] = tuple(jumps)
+            return self._jumps_through[team][coordinates]
+
+    def mobility_sources(self, coordinates: Tuple[int, int], team: TeamEnum) -> Tuple[Tuple[int, int], ...]:
+        '''
+        Tiles whose piece of the team could step onto, jump over or land on coordinates, and coordinates itself.
+        These are the pieces that can gain or lose their last move when the tile at coordinates changes.
+        '''
+        try:
+            return self._mobility_sources[team][coordinates]
+        except KeyError:
+            column, row = coordinates[COLUMN_INDEX], coordinates[ROW_INDEX]
+            sources = [(column, row)]
+            for distance in (1, 2):
+                for side in (1, -1):
+                    source = (column - distance * side, row - distance * team.value)
+                    if self.is_on_board(source):
+                        sources.append(source)
+            self._mobility_sources[team][coordinates] = tuple(sources)
+            return self._mobility_sources[team][coordinates]
+
+
+@lru_cache(maxsize=None)
+def get_board_geometry(length: int, height: int) -> BoardGeometry:
+    return BoardGeometry(length, height)
@@ -0,0 +1,48 @@
+from typing import Dict, Iterator, Tuple
+
+from checkersmove import CheckersMove
+
+
+class CaptureIndex:
+    '''
+    The capture moves available to one team, indexed by the three tiles each capture depends on: the capturing
+    piece, the captured piece and the landing tile. Whenever one of those tiles changes, discard_tile drops every
+    capture going through it, so only the captures around the tiles touched by a move have to be checked again.
+    Moves are kept in insertion order, which keeps iteration deterministic between runs.
+    '''
+    def __init__(self):
+        self._tiles_by_move: Dict[CheckersMove, Tuple[Tuple[int, int], ...]] = {}
+        self._moves_by_tile: Dict[Tuple[int, int], Dict[CheckersMove, None]] = {}
+
+    def add(self, move: CheckersMove, captured_coordinates: Tuple[int, int]):
+        if move in self._tiles_by_move:
+            return
+        tiles = (move.source, captured_coordinates, move.target)
+        self._tiles_by_move[move] = tiles
+        for tile in tiles:
+            self._moves_by_tile.setdefault(tile, {})[move] = None
+
+    def discard_tile(self, coordinates: Tuple[int, int]):
+        for move in self._moves_by_tile.pop(coordinates, ()):
+            for tile in self._tiles_by_move.pop(move):
+                if tile != coordinates:
+                    moves = self._moves_by_tile[tile]
+                    del moves[move]
+                    if not moves:
+                        del self._moves_by_tile[tile]
+
+    def clear(self):
+        self._tiles_by_move.clear()
+        self._moves_by_tile.clear()
+
+    def __contains__(self, move) -> bool:
+        return move in self._tiles_by_move
+
+    def __iter__(self) -> Iterator[CheckersMove]:
+        return iter(self._tiles_by_move)
+
+    def __len__(self) -> int:
+        return len(self._tiles_by_move)
+
+    def __repr__(self):
+        return f'CaptureIndex([{", ".join(str(move) for move in self._tiles_by_move)}])'
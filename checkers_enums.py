@@ -21,5 +21,16 @@ class GameStatusEnum(Enum):
     no_moves_provided = 'No moves provided'
 
 
+class MoveValidationEnum(Enum):
+    valid = 'valid'
+    off_board = 'move leaves the board'
+    occupied_target = 'target tile is occupied'
+    wrong_colour = 'source is not a piece of the team'
+    not_diagonal = 'move is not diagonal'
+    wrong_direction = 'move goes backwards'
+    too_far = 'move is too long'
+    no_piece_to_capture = 'no opposing piece to capture'
+
+
 ROW_INDEX = 1
 COLUMN_INDEX = 0
@@ -1,9 +1,40 @@
-from typing import Type, Iterator, Tuple, Dict, List
+import struct
+from dataclasses import dataclass
+from typing import Type, Iterator, Tuple, Dict, List, Optional, Set
 
-from checkersmove import CheckersMove, IllegalMoveException
-from board import Board, BoardException, CheckerBoard
-from checkers_enums import MoveTypeEnum, TeamEnum, GameStatusEnum, COLUMN_INDEX, ROW_INDEX
-from move_iterators import create_move_iterator_from_list_of_lists
+from checkersmove import CheckersMove, IllegalMoveException, get_move_intern_table
+from board import Board, BoardException, CheckerBoard, SnapshotFormatException
+from board_geometry import get_board_geometry
+from capture_index import CaptureIndex
+from checkers_enums import MoveTypeEnum, MoveValidationEnum, TeamEnum, GameStatusEnum, COLUMN_INDEX, ROW_INDEX
+
+
+# Snapshot header: format version, team to move, game status, then the number of recorded captures of white, of black,
+# and of pending multiple captures. Each of those moves follows as four unsigned shorts, then the board's snapshot.
+GAME_SNAPSHOT_VERSION = 1
+GAME_SNAPSHOT_HEADER = struct.Struct('<BBBHHH')
+SNAPSHOT_MOVE = struct.Struct('<4H')
+SNAPSHOT_TEAMS = (TeamEnum.white, TeamEnum.black)
+SNAPSHOT_STATUSES = tuple(GameStatusEnum)
+
+
+@dataclass(frozen=True, slots=True)
+class MoveUndoRecord:
+    move: CheckersMove
+    captured_coordinates: Optional[Tuple[int, int]]
+    team: TeamEnum
+    game_status: GameStatusEnum
+    multiple_capture_possibilities: Dict[CheckersMove, None]
+
+
+def describe_illegal_move(exception: IllegalMoveException, line_number: int, move: Optional[CheckersMove]) -> str:
+    '''
+    The result of a game stopped by an illegal move: the malformed line of the move file, or the move on line_number
+    that was rejected, written as in a move file.
+    '''
+    if exception.line_number is not None:
+        return f'line {exception.line_number} illegal move: {exception}'
+    return f'line {line_number} illegal move: {move.source[COLUMN_INDEX]},{move.source[ROW_INDEX]},{move.target[COLUMN_INDEX]},{move.target[ROW_INDEX]},'
 
 
 class CheckersGame:
@@ -12,15 +43,73 @@ class CheckersGame:
 
     def __init__(self, board: CheckerBoard, skip_scan_for_pieces_that_can_capture: bool=False):
         self.board = board
+        self.geometry = get_board_geometry(board.length, board.height)
         self.game_status = GameStatusEnum.game_continues
         self.current_team = self.FIRST_TURN
         self.other_team = self.SECOND_TURN
-        self.possible_capture_moves: Dict[TeamEnum, List[CheckersMove]] = {TeamEnum.white: [], TeamEnum.black: []}
-        self.multiple_capture_possibilities = []
+        self.possible_capture_moves: Dict[TeamEnum, CaptureIndex] = {TeamEnum.white: CaptureIndex(),
+                                                                     TeamEnum.black: CaptureIndex()}
+        self.multiple_capture_possibilities: Dict[CheckersMove, None] = {}
+        self.undo_stack: List[MoveUndoRecord] = []
+        self.movable_pieces: Dict[TeamEnum, Set[Tuple[int, int]]] = {TeamEnum.white: set(), TeamEnum.black: set()}
+        self._movable_pieces_key: Optional[int] = None
         if not skip_scan_for_pieces_that_can_capture:
             self.scan_and_record_pieces_that_can_capture()
 
+    def to_bytes(self) -> bytes:
+        '''
+        Encodes the position: the team to move, the game status, the recorded and pending captures in their order,
+        and the board's to_bytes. The undo stack isn't included, so a restored game can't unmake earlier moves, and
+        the board's pieces come back in tile order, so legal_moves may list regular moves in another order.
+        '''
+        capture_lists = (list(self.possible_capture_moves[TeamEnum.white]),
+                         list(self.possible_capture_moves[TeamEnum.black]), list(self.multiple_capture_possibilities))
+        header = GAME_SNAPSHOT_HEADER.pack(GAME_SNAPSHOT_VERSION, SNAPSHOT_TEAMS.index(self.current_team),
+                                           SNAPSHOT_STATUSES.index(self.game_status), *map(len, capture_lists))
+        return b''.join([header] + [SNAPSHOT_MOVE.pack(*move.source, *move.target)
+                                    for moves in capture_lists for move in moves] + [self.board.to_bytes()])
+
+    @classmethod
+    def from_bytes(cls, data: bytes, board_class: Type[CheckerBoard] = CheckerBoard,
+                   **game_arguments) -> 'CheckersGame':
+        '''
+        Rebuilds a game encoded by to_bytes on a board_class board. The recorded captures are restored as they were
+        instead of being scanned for again. game_arguments are passed on to the constructor of the class.
+        :raises SnapshotFormatException: if data isn't a game snapshot of this version
+        '''
+        if len(data) < GAME_SNAPSHOT_HEADER.size:
+            raise SnapshotFormatException('game snapshot is truncated')
+        version, team_index, status_index, *capture_counts = GAME_SNAPSHOT_HEADER.unpack_from(data)
+        if version != GAME_SNAPSHOT_VERSION:
+            raise SnapshotFormatException(f'unsupported game snapshot version {version}')
+        if team_index >= len(SNAPSHOT_TEAMS) or status_index >= len(SNAPSHOT_STATUSES):
+            raise SnapshotFormatException('game snapshot has an unknown team or status')
+        board_start = GAME_SNAPSHOT_HEADER.size + SNAPSHOT_MOVE.size * sum(capture_counts)
+        if len(data) < board_start:
+            raise SnapshotFormatException('game snapshot is truncated')
+        board = board_class.from_bytes(data[board_start:])
+        move_table = get_move_intern_table(board.length, board.height)
+        moves = [move_table.get(move)
+                 for move in SNAPSHOT_MOVE.iter_unpack(data[GAME_SNAPSHOT_HEADER.size:board_start])]
+        game = cls(board, skip_scan_for_pieces_that_can_capture=True, **game_arguments)
+        if SNAPSHOT_TEAMS[team_index] is not game.current_team:
+            game.current_team, game.other_team = game.other_team, game.current_team
+        game.game_status = SNAPSHOT_STATUSES[status_index]
+        white_captures_end = capture_counts[0]
+        black_captures_end = white_captures_end + capture_counts[1]
+        for team, team_moves in ((TeamEnum.white, moves[:white_captures_end]),
+                                 (TeamEnum.black, moves[white_captures_end:black_captures_end])):
+            for move in team_moves:
+                captured_coordinates = ((move.source[COLUMN_INDEX] + move.target[COLUMN_INDEX]) // 2,
+                                        (move.source[ROW_INDEX] + move.target[ROW_INDEX]) // 2)
+                game.possible_capture_moves[team].add(move, captured_coordinates)
+        game.multiple_capture_possibilities = dict.fromkeys(moves[black_captures_end:])
+        return game
+
     def switch_team_turn(self):
+        self.board.toggle_side_to_move()
+        if self._movable_pieces_key is not None:
+            self._movable_pieces_key ^= self.board.zobrist_table.side_to_move_key
         if self.current_team == TeamEnum.white:
             self.current_team = TeamEnum.black
             self.other_team = TeamEnum.white
@@ -83,108 +172,71 @@ class CheckersGame:
             return False
         return True
 
-    def verify_move_is_valid(self, move: CheckersMove, team: TeamEnum = None):
+    def validate_move(self, move: CheckersMove, team: TeamEnum = None) -> MoveValidationEnum:
+        '''
+        Runs the same checks as verify_move_is_valid, in the same order, without raising.
+        :return: MoveValidationEnum.valid, or the reason the first failing check rejects the move
+        '''
         if team is None:
             team = self.current_team
         if not self.is_move_inside_board(move):
-            raise IllegalMoveException()
+            return MoveValidationEnum.off_board
         if not self.verify_target_is_empty(move):
-            raise IllegalMoveException()
+            return MoveValidationEnum.occupied_target
         if not self.verify_source_is_correct_color(move, team):
-            raise IllegalMoveException()
+            return MoveValidationEnum.wrong_colour
         if not self.verify_move_is_diagonal(move):
-            raise IllegalMoveException()
+            return MoveValidationEnum.not_diagonal
         if not self.verify_correct_move_direction(move, team):
-            raise IllegalMoveException()
+            return MoveValidationEnum.wrong_direction
         if not self.verify_move_distance_is_valid(move):
-            raise IllegalMoveException()
+            return MoveValidationEnum.too_far
         if self.find_move_type(move) == MoveTypeEnum.capture:
             if not self.check_if_there_is_a_piece_to_capture(move, team):
-                raise IllegalMoveException()
-
-    def find_possible_capture_moves_as_a_result_of_removed_piece(self, coordinates: Tuple[int, int]):
-        for team in [TeamEnum.white, TeamEnum.black]:
-            raw_move_list = [[coordinates[COLUMN_INDEX] + 2,
-                              coordinates[ROW_INDEX] - 2 * team.value,
-                              coordinates[COLUMN_INDEX],
-                              coordinates[ROW_INDEX],
-                              ],
-                             [coordinates[COLUMN_INDEX] - 2,
-                              coordinates[ROW_INDEX] - 2 * team.value,
-                              coordinates[COLUMN_INDEX],
-                              coordinates[ROW_INDEX],
-                              ]
-                             ]
-            for potential_move in create_move_iterator_from_list_of_lists(raw_move_list):
-                if self.verify_legal_move(potential_move, team):
-                    self.possible_capture_moves[team].append(potential_move)
-
-    def find_possible_capture_moves_as_a_result_of_placed_piece_for_other_team(self, move: CheckersMove):
-        raw_move_list = [[move.target[COLUMN_INDEX] + 1,
-                          move.target[ROW_INDEX] + self.current_team.value,
-                          move.target[COLUMN_INDEX] - 1,
-                          move.source[ROW_INDEX],
-                          ],
-                         [move.target[COLUMN_INDEX] - 1,
-                          move.target[ROW_INDEX] + self.current_team.value,
-                          move.target[COLUMN_INDEX] + 1,
-                          move.source[ROW_INDEX],
-                          ],
-                         ]
-        for potential_move in create_move_iterator_from_list_of_lists(raw_move_list):
-            if self.verify_legal_move(potential_move, self.other_team):
-                self.possible_capture_moves[self.other_team].append(potential_move)
-
-    def add_capture_moves_as_a_result_of_placed_piece_for_current_team(self, move: CheckersMove):
-        raw_move_list = [[move.target[COLUMN_INDEX],
-                          move.target[ROW_INDEX],
-                          move.target[COLUMN_INDEX] + 2,
-                          move.target[ROW_INDEX] + 2 * self.current_team.value,
-                          ],
-                         [move.target[COLUMN_INDEX],
-                          move.target[ROW_INDEX],
-                          move.target[COLUMN_INDEX] - 2,
-                          move.target[ROW_INDEX] + self.current_team.value * 2,
-                          ],
-                         ]
-        for potential_move in create_move_iterator_from_list_of_lists(raw_move_list):
-            if self.verify_legal_move(potential_move, self.current_team):
-                if self.find_move_type(move) == MoveTypeEnum.capture:
-                    self.multiple_capture_possibilities.append(potential_move)
-                self.possible_capture_moves[self.current_team].append(potential_move)
+                return MoveValidationEnum.no_piece_to_capture
+        return MoveValidationEnum.valid
+
+    def verify_move_is_valid(self, move: CheckersMove, team: TeamEnum = None):
+        reason = self.validate_move(move, team)
+        if reason is not MoveValidationEnum.valid:
+            raise IllegalMoveException(f'{move!r}: {reason.value}')
+
+    def update_possible_capture_moves_around(self, touched_coordinates: Tuple[Tuple[int, int], ...]):
+        for team, capture_index in self.possible_capture_moves.items():
+            for coordinates in touched_coordinates:
+                capture_index.discard_tile(coordinates)
+            for coordinates in touched_coordinates:
+                for potential_move, captured_coordinates in self.geometry.jumps_through(coordinates, team):
+                    if self.validate_move(potential_move, team) is MoveValidationEnum.valid:
+                        capture_index.add(potential_move, captured_coordinates)
+
+    def record_multiple_capture_possibilities(self, move: CheckersMove):
+        self.multiple_capture_possibilities = {}
+        if self.find_move_type(move) == MoveTypeEnum.capture:
+            for potential_move, _ in self.geometry.jumps(move.target, self.current_team):
+                if potential_move in self.possible_capture_moves[self.current_team]:
+                    self.multiple_capture_possibilities[potential_move] = None
 
     def verify_legal_move(self, move: CheckersMove, team: TeamEnum) -> bool:
-        try:
-            self.verify_move_is_valid(move, team)
-            return True
-        except IllegalMoveException:
-            return False
+        return self.validate_move(move, team) is MoveValidationEnum.valid
 
     def add_all_possible_captures_as_result_of_move(self, move: CheckersMove):
         '''
         Capture Logic:
-        There are two situations where a capture can be made available.
-            1: Placement of piece: A piece is placed on a new tile: This is split into possible captures from the two teams:
-                'active' team: If regular move then a possible capture would be diagonally in two directions
-                (Assuming the move is valid). If the placement is a result of a capture and another capture is available
-                then the next capture MUST be made by the same team. The possible captures are added to self.possible_captures,
-                as well as self.multiple_capture_possibilities.
-                'passive' team: The placed piece might be captured from either side. Although it is technically impossible
-                to capture in the same direction that the active piece came from, it is computationally cheap to add it
-                and remove it in the validity check.
-            2: Removal of piece: A piece is removed from a tile either through a regular move, or when it is captured.
-                The options here is that the captured piece's coordinates become the target of a capture move. There are 4
-                directions in which this can be checked.
+        A capture is legal as long as the capturing piece, the captured piece and the landing tile are unchanged, so a
+        move can only create or invalidate captures that go through one of the tiles it touched: the source, the
+        target and, for a capture, the captured piece. For both teams, every recorded capture going through those
+        tiles is dropped and every capture that could go through them is verified again.
+        If the move was a capture and the placed piece can capture again, the next capture MUST be made by the same
+        team with that piece. Those captures are recorded in self.multiple_capture_possibilities.
         :param move:
         :return:
         '''
-        self.add_capture_moves_as_a_result_of_placed_piece_for_current_team(move)
-        self.find_possible_capture_moves_as_a_result_of_placed_piece_for_other_team(move)
-        self.find_possible_capture_moves_as_a_result_of_removed_piece(move.source)
+        touched_coordinates = (move.source, move.target)
         if self.find_move_type(move) == MoveTypeEnum.capture:
-            self.find_possible_capture_moves_as_a_result_of_removed_piece(
-                self.get_coordinates_for_piece_to_capture(move, self.current_team)
-            )
+            touched_coordinates += (self.get_coordinates_for_piece_to_capture(move, self.current_team),)
+        self.update_possible_capture_moves_around(touched_coordinates)
+        self.record_multiple_capture_possibilities(move)
 
     def check_if_move_is_one_of_available_captures(self, move: CheckersMove):
         if self.multiple_capture_possibilities and move not in self.multiple_capture_possibilities:
@@ -192,89 +244,170 @@ class CheckersGame:
         elif self.possible_capture_moves[self.current_team] and move not in self.possible_capture_moves[self.current_team]:
             raise IllegalMoveException('Capture available')
 
-    def remove_illegal_moves_from_immediate_and_possible_capture_moves(self):
-        for move in self.multiple_capture_possibilities:
-            if not self.verify_legal_move(move, self.current_team):
-                self.multiple_capture_possibilities.remove(move)
-        for team, move_list in self.possible_capture_moves.items():
-            for move in move_list.copy():
-                if not self.verify_legal_move(move, team):
-                    move_list.remove(move)
-
-    def make_move(self, move: CheckersMove):
-        self.verify_move_is_valid(move)
-        self.check_if_move_is_one_of_available_captures(move)
+    def apply_move_to_board(self, move: CheckersMove) -> Optional[Tuple[int, int]]:
+        '''
+        Moves the piece on the board and removes the piece it captures, if any.
+        :return: the coordinates of the captured piece, or None for a regular move
+        '''
+        captured_coordinates = None
         try:
             if self.find_move_type(move) == MoveTypeEnum.regular_move:
                 self.board.move_piece(move.source, move.target)
             elif self.find_move_type(move) == MoveTypeEnum.capture:
-                self.board.capture_piece(move.source, move.target,
-                                         self.get_coordinates_for_piece_to_capture(move, self.current_team))
+                captured_coordinates = self.get_coordinates_for_piece_to_capture(move, self.current_team)
+                self.board.capture_piece(move.source, move.target, captured_coordinates)
             else:
                 raise IllegalMoveException('Unknown move type')
         except BoardException:
             raise IllegalMoveException()
+        return captured_coordinates
+
+    def make_move(self, move: CheckersMove):
+        self.verify_move_is_valid(move)
+        self.check_if_move_is_one_of_available_captures(move)
+        tracking_movable_pieces = self._movable_pieces_key == self.board.zobrist_key
+        captured_coordinates = self.apply_move_to_board(move)
+        self.undo_stack.append(MoveUndoRecord(move, captured_coordinates, self.current_team, self.game_status,
+                                              self.multiple_capture_possibilities))
         self.add_all_possible_captures_as_result_of_move(move)
-        self.remove_illegal_moves_from_immediate_and_possible_capture_moves()
+        if tracking_movable_pieces:
+            self.update_movable_pieces_around((move.source, move.target) if captured_coordinates is None else
+                                              (move.source, move.target, captured_coordinates))
         if not self.multiple_capture_possibilities: #Switch teams only if there is no multiple capture possibility
             self.switch_team_turn()
 
+    def unmake_move(self) -> CheckersMove:
+        '''
+        Takes back the last move made with make_move.
+        The board is restored from the undo record, and the possible capture moves are recomputed around the tiles the
+        move touched, exactly as make_move did. The team, game status and multiple capture possibilities are restored
+        from the record.
+        :return: the move that was taken back
+        '''
+        if not self.undo_stack:
+            raise IllegalMoveException('No move to unmake')
+        record = self.undo_stack.pop()
+        move = record.move
+        tracking_movable_pieces = self._movable_pieces_key == self.board.zobrist_key
+        self.board.move_piece(move.target, move.source)
+        touched_coordinates = (move.source, move.target)
+        if record.captured_coordinates is not None:
+            if record.team is TeamEnum.white:
+                self.board.set_up_pieces([], [record.captured_coordinates])
+            else:
+                self.board.set_up_pieces([record.captured_coordinates], [])
+            touched_coordinates += (record.captured_coordinates,)
+        if self.current_team is not record.team:
+            self.switch_team_turn()
+        self.update_possible_capture_moves_around(touched_coordinates)
+        if tracking_movable_pieces:
+            self.update_movable_pieces_around(touched_coordinates)
+        self.multiple_capture_possibilities = record.multiple_capture_possibilities
+        self.game_status = record.game_status
+        return move
+
     def check_if_piece_can_move(self, coordinates: Tuple[int, int]) -> bool:
-        team = self.board[coordinates[COLUMN_INDEX], coordinates[ROW_INDEX]].team
-        possible_moves = [[coordinates[COLUMN_INDEX], coordinates[ROW_INDEX], coordinates[COLUMN_INDEX] + 1, coordinates[ROW_INDEX]+team.value],
-                          [coordinates[COLUMN_INDEX], coordinates[ROW_INDEX], coordinates[COLUMN_INDEX] - 1, coordinates[ROW_INDEX]+team.value],
-                          [coordinates[COLUMN_INDEX], coordinates[ROW_INDEX], coordinates[COLUMN_INDEX] + 2, coordinates[ROW_INDEX]+team.value*2],
-                          [coordinates[COLUMN_INDEX], coordinates[ROW_INDEX], coordinates[COLUMN_INDEX] - 2, coordinates[ROW_INDEX]+team.value*2]]
-        for move in create_move_iterator_from_list_of_lists(possible_moves):
-            if self.verify_legal_move(move, team):
+        return self.piece_can_move(coordinates, self.board[coordinates[COLUMN_INDEX], coordinates[ROW_INDEX]].team)
+
+    def piece_can_move(self, coordinates: Tuple[int, int], team: TeamEnum) -> bool:
+        '''
+        Whether the team's piece at coordinates has a regular move or a capture, ignoring whose turn it is.
+        Geometry only lists moves that stay on the board, so only the target and the captured tile are checked.
+        '''
+        board = self.board
+        for move in self.geometry.steps(coordinates, team):
+            if board[move.target] is None:
                 return True
-        else:
-            return False
+        for move, captured_coordinates in self.geometry.jumps(coordinates, team):
+            if board[move.target] is None:
+                captured_piece = board[captured_coordinates]
+                if captured_piece is not None and captured_piece.team is not team:
+                    return True
+        return False
+
+    def update_movable_pieces_around(self, touched_coordinates: Tuple[Tuple[int, int], ...]):
+        board = self.board
+        for team, movable_pieces in self.movable_pieces.items():
+            for coordinates in touched_coordinates:
+                for source in self.geometry.mobility_sources(coordinates, team):
+                    piece = board[source]
+                    if piece is not None and piece.team is team and self.piece_can_move(source, team):
+                        movable_pieces.add(source)
+                    else:
+                        movable_pieces.discard(source)
+        self._movable_pieces_key = board.zobrist_key
+
+    def scan_and_record_movable_pieces(self):
+        self.movable_pieces = {TeamEnum.white: set(), TeamEnum.black: set()}
+        for coordinates, team in self.board.active_pieces.items():
+            if self.piece_can_move(coordinates, team):
+                self.movable_pieces[team].add(coordinates)
+        self._movable_pieces_key = self.board.zobrist_key
+
+    def current_team_can_move(self) -> bool:
+        '''
+        Whether the team whose turn it is has a piece that can move.
+        The movable pieces of both teams are scanned the first time this is asked and then kept up to date by
+        make_move and unmake_move around the tiles each move touches, so later calls are a lookup. The board's
+        Zobrist key is remembered with them: if the board was changed some other way, they are scanned again.
+        '''
+        if self._movable_pieces_key != self.board.zobrist_key:
+            self.scan_and_record_movable_pieces()
+        return bool(self.movable_pieces[self.current_team])
 
     def scan_and_record_pieces_that_can_capture(self):
-        for coordinates in self.board.active_pieces:
-            team = self.board[coordinates[COLUMN_INDEX], coordinates[ROW_INDEX]].team
-            possible_moves = [[coordinates[COLUMN_INDEX], coordinates[ROW_INDEX], coordinates[COLUMN_INDEX] + 2, coordinates[ROW_INDEX]+team.value*2],
-                              [coordinates[COLUMN_INDEX], coordinates[ROW_INDEX], coordinates[COLUMN_INDEX] - 2, coordinates[ROW_INDEX]+team.value*2]]
-            for move in create_move_iterator_from_list_of_lists(possible_moves):
-                if self.verify_legal_move(move, team):
-                    self.possible_capture_moves[team].append(move)
+        for coordinates, team in self.board.active_pieces.items():
+            for move, captured_coordinates in self.geometry.jumps(coordinates, team):
+                if self.validate_move(move, team) is MoveValidationEnum.valid:
+                    self.possible_capture_moves[team].add(move, captured_coordinates)
+
+    def legal_moves(self) -> List[CheckersMove]:
+        '''
+        Lists the moves available to the team whose turn it is, in one pass over its pieces.
+        A pending multiple capture must be continued, and captures are mandatory, so the recorded capture moves are
+        returned whenever there are any. Otherwise the team's pieces are walked through the board geometry tables.
+        :return: legal moves without duplicates; an empty list means the team can't move and the game is over.
+        '''
+        if self.multiple_capture_possibilities:
+            return list(self.multiple_capture_possibilities)
+        if self.possible_capture_moves[self.current_team]:
+            return list(self.possible_capture_moves[self.current_team])
+        board = self.board
+        team = self.current_team
+        regular_moves = []
+        for coordinates, piece_team in board.active_pieces.items():
+            if piece_team is team:
+                for move in self.geometry.steps(coordinates, team):
+                    if board[move.target] is None:
+                        regular_moves.append(move)
+        return regular_moves
 
     def end_game(self) -> GameStatusEnum:
-        for coordinates, team in self.board.active_pieces.items():
-            if team == self.current_team:
-                if self.check_if_piece_can_move(coordinates):
-                    self.game_status = GameStatusEnum.incomplete_game
-                    return GameStatusEnum.incomplete_game
+        if self.current_team_can_move():
+            self.game_status = GameStatusEnum.incomplete_game
+            return GameStatusEnum.incomplete_game
+        scores = self.board.score
+        if scores[TeamEnum.white] == scores[TeamEnum.black]:
+            self.game_status = GameStatusEnum.tie_game
+        elif scores[TeamEnum.white] > scores[TeamEnum.black]:
+            self.game_status = GameStatusEnum.white_wins
         else:
-            white_score = self.board.score[TeamEnum.white]
-            black_score = self.board.score[TeamEnum.black]
-            if white_score == black_score:
-                self.game_status = GameStatusEnum.tie_game
-                return GameStatusEnum.tie_game
-            elif white_score > black_score:
-                self.game_status = GameStatusEnum.white_wins
-                return GameStatusEnum.white_wins
-            else:
-                self.game_status = GameStatusEnum.black_wins
-                return GameStatusEnum.black_wins
+            self.game_status = GameStatusEnum.black_wins
+        return self.game_status
 
-    def run_game(self, move_iterator: Iterator) -> str:
-        ind = -1
+    def run_game(self, move_iterator: Iterator, first_line_number: int = 1) -> str:
+        '''
+        :param first_line_number: the line number of the first move, when the game was resumed after earlier lines
+        '''
+        line_number = first_line_number - 1
+        move = None
         try:
-            try:
-                move = next(move_iterator)
+            for line_number, move in enumerate(move_iterator, first_line_number):
                 self.make_move(move)
-            except StopIteration:
+            if line_number == 0:
                 return 'No moves loaded'
-            for ind, move in enumerate(move_iterator):
-                self.make_move(move)
             self.end_game()
-        except IllegalMoveException:
+        except IllegalMoveException as e:
             self.game_status = GameStatusEnum.illegal_move
-        if ind == -1:
-            return 'No moves loead'
-        if self.game_status == GameStatusEnum.illegal_move:
-            if ind > -1:
-                return f'line {ind+1} illegal move: {move.source[COLUMN_INDEX]},{move.source[ROW_INDEX]},{move.target[COLUMN_INDEX]},{move.target[ROW_INDEX]},'
+            return describe_illegal_move(e, line_number, move)
         return self.game_status.value
\ No newline at end of file
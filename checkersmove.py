@@ -1,25 +1,74 @@
-from typing import List
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 
 
 class CheckersMove:
+    __slots__ = ('source', 'target', '_hash')
+
     def __init__(self, move: List[int]):
         if len(move) != 4:
             raise IllegalMoveException(f"Can't createa Move: Expected 4 arguments, got{len(move)} arguments instead")
-        for coordinate in move:
-            int(coordinate)
-        self.source = (move[0], move[1])
-        self.target = (move[2], move[3])
+        source_column, source_row, target_column, target_row = move
+        self.source = (int(source_column), int(source_row))
+        self.target = (int(target_column), int(target_row))
+        self._hash = hash((self.source, self.target))
 
     def __eq__(self, other):
+        if other.__class__ is CheckersMove:
+            return self is other or (self.source == other.source and self.target == other.target)
         return (self.source, self.target) == other
 
     def __hash__(self):
-        return hash(f"source {self.source} target {self.target}")
+        return self._hash
 
     def __str__(self):
         return f'{self.source}, {self.target}'
 
+    def __repr__(self):
+        return f'CheckersMove([{self.source[0]}, {self.source[1]}, {self.target[0]}, {self.target[1]}])'
+
+
+class MoveInternTable:
+    '''
+    Hands out a single shared CheckersMove per distinct move on a length x height board, so replaying a game doesn't
+    allocate a new move per line and equality checks between interned moves short-circuit on identity.
+    Only moves that start and end on the board and span at most two tiles are interned; anything else can't be a legal
+    move and is built fresh, which keeps the table bounded no matter what the input contains.
+    '''
+    MAX_INTERNED_DISTANCE = 2
+
+    def __init__(self, length: int, height: int):
+        self.length = length
+        self.height = height
+        self._moves: Dict[Tuple[int, int, int, int], CheckersMove] = {}
+
+    def get(self, move: List[int]) -> CheckersMove:
+        try:
+            return self._moves[tuple(move)]
+        except KeyError:
+            pass
+        checkers_move = CheckersMove(move)
+        if not self._can_be_interned(checkers_move):
+            return checkers_move
+        return self._moves.setdefault((*checkers_move.source, *checkers_move.target), checkers_move)
+
+    def _can_be_interned(self, move: CheckersMove) -> bool:
+        for column, row in (move.source, move.target):
+            if not (0 <= column < self.length and 0 <= row < self.height):
+                return False
+        return abs(move.source[0] - move.target[0]) <= self.MAX_INTERNED_DISTANCE and \
+            abs(move.source[1] - move.target[1]) <= self.MAX_INTERNED_DISTANCE
+
+    def __len__(self) -> int:
+        return len(self._moves)
+
+
+@lru_cache(maxsize=None)
+def get_move_intern_table(length: int, height: int) -> MoveInternTable:
+    return MoveInternTable(length, height)
 
 
 class IllegalMoveException(Exception):
-    pass
+    def __init__(self, message: str = '', line_number: Optional[int] = None):
+        super().__init__(message)
+        self.line_number = line_number
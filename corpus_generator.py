@@ -0,0 +1,182 @@
+import argparse
+import os
+import random
+import time
+from dataclasses import dataclass
+from functools import partial
+from multiprocessing import Pool
+from typing import Iterator, Optional
+
+from board import BoardPresetDataclass, CheckerBoardFactory
+from checkers_enums import MoveValidationEnum
+from checkers_game import CheckersGame
+from checkersmove import CheckersMove
+from perft import add_preset_arguments, load_presets
+from search_engine import SearchEngine
+from zobrist import splitmix64
+
+
+class RandomPolicy:
+    def choose_move(self, game: CheckersGame, rng: random.Random) -> CheckersMove:
+        return rng.choice(game.legal_moves())
+
+
+class CaptureGreedyPolicy:
+    '''
+    Looks one move ahead for material: prefers the move after which the team has the most pieces left over the
+    opponent, and among those the one that leaves the opponent the fewest captures. Ties are broken at random.
+    '''
+    def choose_move(self, game: CheckersGame, rng: random.Random) -> CheckersMove:
+        team, other_team = game.current_team, game.other_team
+        best_moves = []
+        best_score = None
+        for move in game.legal_moves():
+            game.make_move(move)
+            scores = game.board.score
+            score = (scores[team] - scores[other_team], -len(game.possible_capture_moves[other_team]))
+            game.unmake_move()
+            if best_score is None or score > best_score:
+                best_score, best_moves = score, [move]
+            elif score == best_score:
+                best_moves.append(move)
+        return rng.choice(best_moves)
+
+
+class EnginePolicy:
+    '''
+    Plays the SearchEngine's move searched to a fixed depth, without a time limit, so games are reproducible.
+    '''
+    def __init__(self, depth: int = 3):
+        self.engine = SearchEngine(time_budget=float('inf'), max_depth=depth)
+
+    def choose_move(self, game: CheckersGame, rng: random.Random) -> CheckersMove:
+        return self.engine.choose_move(game).best_move
+
+
+POLICIES = {'random': RandomPolicy, 'capture-greedy': CaptureGreedyPolicy, 'engine': EnginePolicy}
+
+
+@dataclass
+class CorpusSettings:
+    preset: BoardPresetDataclass
+    output_dir: str
+    seed: int = 0
+    white_policy: str = 'random'
+    black_policy: str = 'random'
+    engine_depth: int = 3
+    max_moves: int = 500
+    illegal_move_rate: float = 0.0
+
+
+@dataclass
+class GeneratedGame:
+    index: int
+    path: str
+    moves: int
+    illegal_move_line: Optional[int]
+
+
+def game_seed(seed: int, index: int) -> int:
+    '''
+    Every game gets its own seed derived from the corpus seed and the game's index, so a game is the same whichever
+    worker plays it and however many workers there are.
+    '''
+    return splitmix64(splitmix64(seed) ^ index)
+
+
+def build_policy(name: str, engine_depth: int):
+    return EnginePolicy(engine_depth) if name == 'engine' else POLICIES[name]()
+
+
+def find_illegal_move(game: CheckersGame, rng: random.Random) -> CheckersMove:
+    '''
+    A move on the board that the team to move can't make: a step or jump of one of its pieces in any direction that
+    make_move would reject, either because validation fails or because a capture is mandatory.
+    Falls back to moving a tile onto itself if no such move exists.
+    '''
+    legal_moves = set(game.legal_moves())
+    candidates = []
+    for (column, row), team in game.board.active_pieces.items():
+        if team is not game.current_team:
+            continue
+        for distance in (1, 2):
+            for column_step in (distance, -distance):
+                for row_step in (distance, -distance):
+                    move = game.geometry.moves.get([column, row, column + column_step, row + row_step])
+                    if move not in legal_moves and \
+                            game.validate_move(move) is not MoveValidationEnum.off_board:
+                        candidates.append(move)
+    if not candidates:
+        return CheckersMove([0, 0, 0, 0])
+    return rng.choice(candidates)
+
+
+def generate_game(settings: CorpusSettings, index: int) -> GeneratedGame:
+    rng = random.Random(game_seed(settings.seed, index))
+    game = CheckersGame(CheckerBoardFactory.build_board_from_preset(settings.preset))
+    policies = {game.FIRST_TURN: build_policy(settings.white_policy, settings.engine_depth),
+                game.SECOND_TURN: build_policy(settings.black_policy, settings.engine_depth)}
+    moves = []
+    while len(moves) < settings.max_moves and game.legal_moves():
+        move = policies[game.current_team].choose_move(game, rng)
+        game.make_move(move)
+        moves.append(move)
+    illegal_move_line = None
+    if rng.random() < settings.illegal_move_rate:
+        # The game is taken back to a random point, where the illegal move replaces the rest of the game
+        for _ in range(rng.randrange(len(moves) + 1)):
+            game.unmake_move()
+            moves.pop()
+        moves.append(find_illegal_move(game, rng))
+        illegal_move_line = len(moves)
+    path = os.path.join(settings.output_dir, f'game_{index:06d}.txt')
+    with open(path, 'w') as file:
+        file.writelines(f'{move.source[0]},{move.source[1]},{move.target[0]},{move.target[1]}\n' for move in moves)
+    return GeneratedGame(index, path, len(moves), illegal_move_line)
+
+
+def generate_corpus(settings: CorpusSettings, games: int, workers: int = 1,
+                    chunksize: int = 8) -> Iterator[GeneratedGame]:
+    '''
+    Plays games with the settings' policies and writes each one to output_dir in the comma separated move format.
+    Games are generated in parallel by a pool of worker processes and yielded as they are finished.
+    '''
+    os.makedirs(settings.output_dir, exist_ok=True)
+    play = partial(generate_game, settings)
+    if workers <= 1:
+        yield from map(play, range(games))
+        return
+    with Pool(workers) as pool:
+        yield from pool.imap_unordered(play, range(games), chunksize)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a corpus of self-play game files')
+    parser.add_argument('output_dir', type=str)
+    parser.add_argument('--games', type=int, default=1000)
+    add_preset_arguments(parser)
+    parser.add_argument('--white-policy', choices=sorted(POLICIES), default='random')
+    parser.add_argument('--black-policy', choices=sorted(POLICIES), default='random')
+    parser.add_argument('--engine-depth', type=int, default=3, help='search depth of the engine policy')
+    parser.add_argument('--max-moves', type=int, default=500, help='moves after which a game is cut off')
+    parser.add_argument('--illegal-move-rate', type=float, default=0.0,
+                        help='fraction of games that get an illegal move at a random point')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='number of worker processes')
+    parser.add_argument('--chunksize', type=int, default=8, help='games handed to a worker at a time')
+    args = parser.parse_args()
+    settings = CorpusSettings(load_presets(parser, args)[args.preset], args.output_dir, args.seed, args.white_policy, args.black_policy,
+                              args.engine_depth, args.max_moves, args.illegal_move_rate)
+    start_time = time.perf_counter()
+    moves = 0
+    illegal_games = 0
+    for generated_game in generate_corpus(settings, args.games, args.workers, args.chunksize):
+        moves += generated_game.moves
+        illegal_games += generated_game.illegal_move_line is not None
+    elapsed = time.perf_counter() - start_time
+    print(f'{args.games} games ({illegal_games} with an illegal move), {moves} moves in {elapsed:.2f}s '
+          f'({args.games / elapsed:.1f} games/s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,268 @@
+import argparse
+import mmap
+import struct
+import time
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from checkers_enums import GameStatusEnum, TeamEnum
+from checkers_game import CheckersGame
+
+# Tablebase file layout, little endian:
+#     header: magic b'CKTB', format version (uint8), maximum number of pieces (uint8), board length (uint8),
+#             board height (uint8), tile parity (uint8), padding (3 bytes), number of entries (uint32)
+#     entries: one byte per position, see TablebaseIndexing for the order, holding a result code
+# Only the tiles whose (column + row) % 2 equals the parity are used; pieces moving diagonally never leave them.
+MAGIC = b'CKTB'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sBBBBB3xI')
+STANDARD_PARITY = 1
+
+# Result codes: the result under perfect play, or NOT_A_POSITION for index slots where pieces would overlap.
+NOT_A_POSITION = 0
+RESULT_CODES = {GameStatusEnum.black_wins: 1, GameStatusEnum.tie_game: 2, GameStatusEnum.white_wins: 3}
+RESULT_BY_CODE = {code: result for result, code in RESULT_CODES.items()}
+# Results are compared as white's outcome: white picks the largest code, black the smallest.
+TEAMS = (TeamEnum.white, TeamEnum.black)
+
+
+class TablebaseFormatException(Exception):
+    pass
+
+
+class TablebaseIndexing:
+    '''
+    Maps positions with at most max_pieces pieces to entry indices, and evaluates positions from the entries of the
+    positions they lead to.
+    A position is the sorted tuple of white squares, the sorted tuple of black squares and the team to move, where
+    squares number the tiles of the board's parity. Positions are grouped by material (white count, black count),
+    in order of total pieces, then white count. Inside a material block, the entry of a position is
+    (team * white combinations + white rank) * black combinations + black rank, ranks being the combinatorial number
+    system rank of the squares. Overlapping white and black squares waste a slot each, which keeps ranking simple.
+    '''
+    def __init__(self, max_pieces: int, length: int = 8, height: int = 8, parity: int = STANDARD_PARITY):
+        self.max_pieces = max_pieces
+        self.length = length
+        self.height = height
+        self.parity = parity
+        self.tiles: List[Tuple[int, int]] = [(column, row) for column in range(length) for row in range(height)
+                                             if (column + row) % 2 == parity]
+        self.squares: Dict[Tuple[int, int], int] = {tile: square for square, tile in enumerate(self.tiles)}
+        self.binomials = [[self._binomial(n, k) for k in range(max_pieces + 2)] for n in range(len(self.tiles) + 1)]
+        self.steps: Dict[TeamEnum, List[Tuple[int, ...]]] = {}
+        self.jumps: Dict[TeamEnum, List[Tuple[Tuple[int, int], ...]]] = {}
+        for team in TEAMS:
+            self.steps[team] = [tuple(self.squares[(column + side, row + team.value)] for side in (1, -1)
+                                      if (column + side, row + team.value) in self.squares)
+                                for column, row in self.tiles]
+            self.jumps[team] = [tuple((self.squares[(column + side, row + team.value)],
+                                       self.squares[(column + 2 * side, row + 2 * team.value)]) for side in (1, -1)
+                                      if (column + 2 * side, row + 2 * team.value) in self.squares)
+                                for column, row in self.tiles]
+        self.materials: List[Tuple[int, int]] = [(white_count, total - white_count)
+                                                 for total in range(max_pieces + 1)
+                                                 for white_count in range(total + 1)]
+        self.offsets: Dict[Tuple[int, int], int] = {}
+        self.size = 0
+        for white_count, black_count in self.materials:
+            self.offsets[(white_count, black_count)] = self.size
+            self.size += 2 * self.combinations(white_count) * self.combinations(black_count)
+
+    @staticmethod
+    def _binomial(n: int, k: int) -> int:
+        result = 1
+        for i in range(k):
+            result = result * (n - i) // (i + 1)
+        return result
+
+    def combinations(self, count: int) -> int:
+        return self.binomials[len(self.tiles)][count]
+
+    def rank(self, squares: Sequence[int]) -> int:
+        binomials = self.binomials
+        return sum(binomials[square][position + 1] for position, square in enumerate(squares))
+
+    def index(self, white: Tuple[int, ...], black: Tuple[int, ...], team: TeamEnum) -> int:
+        white_combinations = self.binomials[len(self.tiles)][len(white)]
+        black_combinations = self.binomials[len(self.tiles)][len(black)]
+        team_index = 0 if team is TeamEnum.white else 1
+        return self.offsets[(len(white), len(black))] + \
+            ((team_index * white_combinations + self.rank(white)) * black_combinations + self.rank(black))
+
+    def evaluate(self, white: Tuple[int, ...], black: Tuple[int, ...], team: TeamEnum, entries,
+                 continuing_square: Optional[int] = None) -> int:
+        '''
+        The result code of a position under perfect play, from the entries of the positions its moves lead to:
+        positions with fewer pieces, and positions with the same pieces that are one regular move more advanced.
+        When continuing_square is given, the piece on it is in the middle of a multiple capture and has to continue.
+        '''
+        own, other = (white, black) if team is TeamEnum.white else (black, white)
+        other_set = set(other)
+        occupied = other_set.union(own)
+        jumps = self.jumps[team]
+        choose = max if team is TeamEnum.white else min
+        capture_results = []
+        for square in (own if continuing_square is None else (continuing_square,)):
+            for over, landing in jumps[square]:
+                if over in other_set and landing not in occupied:
+                    capture_results.append(self._capture_result(own, other, team, square, over, landing, entries))
+        if capture_results:
+            return choose(capture_results)
+        steps = self.steps[team]
+        step_results = []
+        for square in own:
+            for target in steps[square]:
+                if target not in occupied:
+                    moved = tuple(sorted(target if piece == square else piece for piece in own))
+                    step_results.append(self._entry(moved, other, team, entries))
+        if step_results:
+            return choose(step_results)
+        white_count, black_count = len(white), len(black)
+        if white_count == black_count:
+            return RESULT_CODES[GameStatusEnum.tie_game]
+        return RESULT_CODES[GameStatusEnum.white_wins if white_count > black_count else GameStatusEnum.black_wins]
+
+    def _capture_result(self, own: Tuple[int, ...], other: Tuple[int, ...], team: TeamEnum, square: int, over: int,
+                        landing: int, entries) -> int:
+        moved = tuple(sorted(landing if piece == square else piece for piece in own))
+        remaining = tuple(piece for piece in other if piece != over)
+        remaining_set = set(remaining)
+        for next_over, next_landing in self.jumps[team][landing]:
+            if next_over in remaining_set and next_landing not in remaining_set and next_landing not in moved:
+                white, black = (moved, remaining) if team is TeamEnum.white else (remaining, moved)
+                return self.evaluate(white, black, team, entries, continuing_square=landing)
+        return self._entry(moved, remaining, team, entries)
+
+    def _entry(self, own: Tuple[int, ...], other: Tuple[int, ...], team: TeamEnum, entries) -> int:
+        '''
+        The entry of the position after the team's move, with the other team to move.
+        '''
+        if team is TeamEnum.white:
+            return entries[self.index(own, other, TeamEnum.black)]
+        return entries[self.index(other, own, TeamEnum.white)]
+
+
+def generate_tablebase(max_pieces: int, length: int = 8, height: int = 8,
+                       parity: int = STANDARD_PARITY) -> bytearray:
+    '''
+    Solves every position with at most max_pieces pieces, working backwards from the positions closest to the end.
+    Men only move forward, so the game can't repeat a position: a capture leads to fewer pieces and a regular move
+    makes one piece one row more advanced. Materials are therefore solved from the fewest pieces up, and inside a
+    material from the most advanced positions down, so every position's successors are solved before it is.
+    '''
+    indexing = TablebaseIndexing(max_pieces, length, height, parity)
+    entries = bytearray(indexing.size)
+    rows = [row for _, row in indexing.tiles]
+    for white_count, black_count in indexing.materials:
+        positions_by_advancement: Dict[int, List[Tuple[Tuple[int, ...], Tuple[int, ...]]]] = {}
+        for white in combinations(range(len(indexing.tiles)), white_count):
+            white_advancement = sum(rows[square] for square in white)
+            for black in combinations(range(len(indexing.tiles)), black_count):
+                if not set(white).isdisjoint(black):
+                    continue
+                advancement = white_advancement + sum(height - 1 - rows[square] for square in black)
+                positions_by_advancement.setdefault(advancement, []).append((white, black))
+        for advancement in sorted(positions_by_advancement, reverse=True):
+            for white, black in positions_by_advancement[advancement]:
+                for team in TEAMS:
+                    entries[indexing.index(white, black, team)] = indexing.evaluate(white, black, team, entries)
+    return entries
+
+
+def write_tablebase(path: str, max_pieces: int, entries: bytes, length: int = 8, height: int = 8,
+                    parity: int = STANDARD_PARITY):
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION, max_pieces, length, height, parity, len(entries)))
+        file.write(entries)
+
+
+class EndgameTablebase:
+    '''
+    Perfect-play results read from a tablebase file, which is memory mapped so opening it costs nothing and only the
+    pages that are probed are read.
+    '''
+    def __init__(self, path: str):
+        with open(path, 'rb') as file:
+            header = file.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise TablebaseFormatException(f'{path} is too short to be a tablebase')
+            magic, version, max_pieces, length, height, parity, size = HEADER.unpack(header)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise TablebaseFormatException(f'{path} is not a version {FORMAT_VERSION} tablebase')
+            self.indexing = TablebaseIndexing(max_pieces, length, height, parity)
+            if size != self.indexing.size:
+                raise TablebaseFormatException(f'{path} has {size} entries, expected {self.indexing.size}')
+            self._mapped_file = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mapped_file) < HEADER.size + size:
+            self.close()
+            raise TablebaseFormatException(f'{path} is truncated')
+        self._entries = memoryview(self._mapped_file)[HEADER.size:HEADER.size + size]
+
+    @property
+    def max_pieces(self) -> int:
+        return self.indexing.max_pieces
+
+    def close(self):
+        if getattr(self, '_entries', None) is not None:
+            self._entries.release()
+            self._entries = None
+        self._mapped_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def probe_position(self, white_coordinates: Sequence[Tuple[int, int]],
+                       black_coordinates: Sequence[Tuple[int, int]], team: TeamEnum,
+                       continuing_coordinates: Optional[Tuple[int, int]] = None) -> Optional[GameStatusEnum]:
+        '''
+        :return: the result of the position under perfect play, or None if it isn't covered by the tablebase
+        '''
+        indexing = self.indexing
+        if len(white_coordinates) + len(black_coordinates) > indexing.max_pieces:
+            return None
+        try:
+            white = tuple(sorted(indexing.squares[tuple(tile)] for tile in white_coordinates))
+            black = tuple(sorted(indexing.squares[tuple(tile)] for tile in black_coordinates))
+            continuing_square = None if continuing_coordinates is None else indexing.squares[tuple(continuing_coordinates)]
+        except KeyError:
+            return None
+        if continuing_square is not None:
+            return RESULT_BY_CODE[indexing.evaluate(white, black, team, self._entries, continuing_square)]
+        return RESULT_BY_CODE[self._entries[indexing.index(white, black, team)]]
+
+    def probe(self, game: CheckersGame) -> Optional[GameStatusEnum]:
+        '''
+        The result of the game's current position under perfect play, or None if the tablebase doesn't cover it:
+        too many pieces, another board size or pieces on the other tile colour.
+        '''
+        board = game.board
+        scores = board.score
+        if scores[TeamEnum.white] + scores[TeamEnum.black] > self.indexing.max_pieces or \
+                (board.length, board.height) != (self.indexing.length, self.indexing.height):
+            return None
+        white_coordinates = []
+        black_coordinates = []
+        for coordinates, team in board.active_pieces.items():
+            (white_coordinates if team is TeamEnum.white else black_coordinates).append(coordinates)
+        continuing_coordinates = None
+        if game.multiple_capture_possibilities:
+            continuing_coordinates = next(iter(game.multiple_capture_possibilities)).source
+        return self.probe_position(white_coordinates, black_coordinates, game.current_team, continuing_coordinates)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate an endgame tablebase file')
+    parser.add_argument('path', type=str)
+    parser.add_argument('--pieces', type=int, default=4, help='maximum number of pieces on the board')
+    args = parser.parse_args()
+    start_time = time.perf_counter()
+    entries = generate_tablebase(args.pieces)
+    write_tablebase(args.path, args.pieces, entries)
+    print(f'{len(entries)} entries for up to {args.pieces} pieces in {time.perf_counter() - start_time:.1f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,19 @@
+import glob
+import os
+from typing import Iterator, List
+
+
+def expand_paths(paths: List[str]) -> Iterator[str]:
+    '''
+    Expands every argument into game files: directories yield the files they contain, patterns are globbed,
+    anything else is passed through as is (so a missing file is still reported).
+    '''
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if os.path.isfile(os.path.join(path, name)):
+                    yield os.path.join(path, name)
+        elif glob.has_magic(path):
+            yield from sorted(glob.glob(path, recursive=True))
+        else:
+            yield path
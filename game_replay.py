@@ -0,0 +1,236 @@
+import argparse
+import os
+import struct
+from typing import List, Optional, Tuple, Type
+
+from binary_move_log import MoveLogFormatException, create_move_iterator_from_binary_log, is_binary_move_log
+from board import BoardPresetDataclass, CheckerBoard, CheckerBoardFactory, CheckerBoardPresets
+from checkers_game import CheckersGame, describe_illegal_move
+from checkersmove import CheckersMove, IllegalMoveException, get_move_intern_table
+from move_iterators import create_move_iterator_from_move_file
+from perft import add_preset_arguments, load_presets
+
+INDEX_SUFFIX = '.replay-index'
+DEFAULT_SNAPSHOT_INTERVAL = 32
+# Index file: the header, then snapshot_count CheckersGame.to_bytes snapshots, each preceded by its size as an
+# unsigned int, then error_size bytes of UTF-8 describing the move that stopped the replay, if any.
+# The game file's size and modification time are recorded to notice when it changes.
+MAGIC = b'CKRI'
+FORMAT_VERSION = 2
+HEADER = struct.Struct('<4sBxHHIIIIQq')
+SNAPSHOT_SIZE = struct.Struct('<I')
+
+
+def read_moves(path: str, preset: BoardPresetDataclass) -> Tuple[List[CheckersMove], Optional[Exception]]:
+    '''
+    Reads a text move file or a binary move log.
+    :return: the moves before the first malformed line, and the exception the malformed line raised, if any: an
+        IllegalMoveException, or a MoveLogFormatException with no moves if the binary move log can't be read
+    '''
+    if is_binary_move_log(path):
+        move_iterator = create_move_iterator_from_binary_log(path)
+    else:
+        move_iterator = create_move_iterator_from_move_file(path, get_move_intern_table(preset.length, preset.height))
+    moves = []
+    try:
+        for move in move_iterator:
+            moves.append(move)
+    except IllegalMoveException as e:
+        return moves, e
+    except MoveLogFormatException as e:
+        return [], e
+    return moves, None
+
+
+class GameReplay:
+    '''
+    Random access to the positions of a recorded game. An index of game snapshots (CheckersGame.to_bytes), one every
+    interval moves, is built by replaying the game once, the first time a position is asked for, and saved next to
+    the game file (index_path) for the next GameReplay of the same file. It is rebuilt if the game file changed, or if
+    its first snapshot isn't the starting position of the replay's preset.
+    seek restores the nearest snapshot at or before the position and replays at most interval - 1 moves, unless the
+    current game is closer: moving within the moves replayed since the last restore uses make_move and unmake_move
+    only, so stepping forwards or backwards costs one move.
+    The replayed game belongs to the replay and is changed by the next seek: copy it with to_bytes to keep a position.
+    '''
+    def __init__(self, path: str, preset: BoardPresetDataclass = CheckerBoardPresets.standard_8_by_8,
+                 interval: int = DEFAULT_SNAPSHOT_INTERVAL, index_path: Optional[str] = None,
+                 board_class: Type[CheckerBoard] = CheckerBoard):
+        if interval < 1:
+            raise ValueError('interval must be at least 1')
+        self.path = path
+        self.preset = preset
+        self.interval = interval
+        self.index_path = path + INDEX_SUFFIX if index_path is None else index_path
+        self.board_class = board_class
+        self.game: Optional[CheckersGame] = None
+        self.position = 0
+        self._restored_position = 0
+        self._moves: Optional[List[CheckersMove]] = None
+        self._snapshots: Optional[List[bytes]] = None
+        self._move_count = 0
+        self._error: Optional[str] = None
+        self._source_signature_at_build = (0, 0)
+
+    @property
+    def moves(self) -> List[CheckersMove]:
+        if self._moves is None:
+            self._moves = read_moves(self.path, self.preset)[0]
+        return self._moves
+
+    def __len__(self) -> int:
+        '''
+        The number of moves that can be replayed: every move of the file, or those before the first illegal one.
+        '''
+        self._load_index()
+        return self._move_count
+
+    @property
+    def error(self) -> Optional[str]:
+        '''
+        Why the replay stops before the end of the file, in run_game's words, or None if every move is legal.
+        '''
+        self._load_index()
+        return self._error
+
+    def _initial_game(self) -> CheckersGame:
+        return CheckersGame(CheckerBoardFactory.build_board_from_preset(self.preset, self.board_class))
+
+    def _source_signature(self) -> Tuple[int, int]:
+        status = os.stat(self.path)
+        return status.st_size, status.st_mtime_ns
+
+    def _load_index(self):
+        if self._snapshots is not None:
+            return
+        if not self._read_index():
+            self._build_index()
+            self._write_index()
+
+    def _read_index(self) -> bool:
+        '''
+        :return: whether an index of the current game file, with the same board size and interval, was read
+        '''
+        try:
+            with open(self.index_path, 'rb') as file:
+                data = file.read()
+        except OSError:
+            return False
+        if len(data) < HEADER.size:
+            return False
+        magic, version, length, height, interval, move_count, snapshot_count, error_size, source_size, \
+            source_mtime = HEADER.unpack_from(data)
+        if magic != MAGIC or version != FORMAT_VERSION or (length, height, interval) != \
+                (self.preset.length, self.preset.height, self.interval) or \
+                (source_size, source_mtime) != self._source_signature():
+            return False
+        snapshots = []
+        offset = HEADER.size
+        for _ in range(snapshot_count):
+            if len(data) < offset + SNAPSHOT_SIZE.size:
+                return False
+            size, = SNAPSHOT_SIZE.unpack_from(data, offset)
+            offset += SNAPSHOT_SIZE.size
+            snapshots.append(data[offset:offset + size])
+            offset += size
+        if len(data) != offset + error_size or not snapshots or snapshots[0] != self._initial_game().to_bytes():
+            return False
+        self._snapshots = snapshots
+        self._move_count = move_count
+        self._error = data[offset:].decode() if error_size else None
+        return True
+
+    def _build_index(self):
+        self._source_signature_at_build = self._source_signature()
+        moves, parse_error = read_moves(self.path, self.preset)
+        self._moves = moves
+        game = self._initial_game()
+        snapshots = [game.to_bytes()]
+        move_count = 0
+        error = None
+        for move in moves:
+            try:
+                game.make_move(move)
+            except IllegalMoveException as e:
+                error = describe_illegal_move(e, move_count + 1, move)
+                break
+            move_count += 1
+            if move_count % self.interval == 0:
+                snapshots.append(game.to_bytes())
+            game.undo_stack.clear()
+        else:
+            if isinstance(parse_error, MoveLogFormatException):
+                error = f'could not read file: {parse_error}'
+            elif parse_error is not None:
+                error = describe_illegal_move(parse_error, move_count + 1, None)
+        self._snapshots = snapshots
+        self._move_count = move_count
+        self._error = error
+
+    def _write_index(self):
+        '''
+        Writes the index through a temporary file, so a reader never sees half of it. An index that can't be written
+        is only kept in memory.
+        '''
+        error = b'' if self._error is None else self._error.encode()
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, self.preset.length, self.preset.height, self.interval,
+                             self._move_count, len(self._snapshots), len(error), *self._source_signature_at_build)
+        temporary_path = f'{self.index_path}.{os.getpid()}.tmp'
+        try:
+            with open(temporary_path, 'wb') as file:
+                file.write(header)
+                for snapshot in self._snapshots:
+                    file.write(SNAPSHOT_SIZE.pack(len(snapshot)))
+                    file.write(snapshot)
+                file.write(error)
+            os.replace(temporary_path, self.index_path)
+        except OSError:
+            try:
+                os.remove(temporary_path)
+            except OSError:
+                pass
+
+    def seek(self, position: int) -> CheckersGame:
+        '''
+        :return: the game after the first position moves
+        :raises IndexError: if position is outside 0..len(self)
+        '''
+        if not 0 <= position <= len(self):
+            raise IndexError(f'position {position} is outside 0..{len(self)}')
+        snapshot_position = position - position % self.interval
+        if self.game is None or position < self._restored_position or \
+                abs(position - self.position) > position - snapshot_position:
+            self.game = CheckersGame.from_bytes(self._snapshots[snapshot_position // self.interval], self.board_class)
+            self.position = self._restored_position = snapshot_position
+        while self.position > position:
+            self.game.unmake_move()
+            self.position -= 1
+        while self.position < position:
+            self.game.make_move(self.moves[self.position])
+            self.position += 1
+        return self.game
+
+    def step_forward(self) -> CheckersGame:
+        return self.seek(self.position + 1)
+
+    def step_back(self) -> CheckersGame:
+        return self.seek(self.position - 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show the position at a move of a game file')
+    parser.add_argument('path', type=str)
+    parser.add_argument('--move', type=int, default=None, help='number of moves played (default: all of them)')
+    add_preset_arguments(parser)
+    parser.add_argument('--interval', type=int, default=DEFAULT_SNAPSHOT_INTERVAL, help='moves between snapshots')
+    args = parser.parse_args()
+    replay = GameReplay(args.path, load_presets(parser, args)[args.preset], args.interval)
+    game = replay.seek(len(replay) if args.move is None else args.move)
+    print(f'move {replay.position} of {len(replay)}, {game.current_team.name} to move')
+    print(game.board, end='')
+    if replay.error is not None:
+        print(replay.error)
+
+
+if __name__ == '__main__':
+    main()
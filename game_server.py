@@ -0,0 +1,239 @@
+import argparse
+import asyncio
+import secrets
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from board import BoardPresetDataclass, CheckerBoardFactory
+from checkers_enums import GameStatusEnum, TeamEnum
+from checkers_game import CheckersGame
+from checkersmove import CheckersMove, IllegalMoveException
+from perft import add_preset_arguments, get_presets, load_presets
+
+# Line protocol: one request per line, answered by one line starting with OK or ERR.
+#     NEW [preset]           -> OK <session>
+#     MOVE <session> c,r,c,r -> OK <status> <team to move>       the move is played with make_move
+#     STATE <session>        -> OK <status> <team to move> <white pieces> <black pieces> <board rows, top first, />
+#     LEGAL <session>        -> OK [c,r,c,r ...]
+#     RESIGN <session>       -> OK <status>                      the other team wins and the session is closed
+#     QUIT                   -> OK                               the connection is closed
+# Statuses are GameStatusEnum names. A game is over once its status isn't game_continues; its session stays open for
+# STATE until it is resigned, evicted or its connection ends.
+# Sessions are random hex strings and belong to the connection that created them: other connections are told that
+# there is no such session.
+MAX_LINE_LENGTH = 1024
+SESSION_ID_BYTES = 16
+
+
+@dataclass
+class GameSession:
+    game: CheckersGame
+    last_active: float
+    owner: object
+
+
+class ProtocolException(Exception):
+    pass
+
+
+class GameServer:
+    '''
+    Hosts many CheckersGame sessions over a line protocol (see above).
+    Every connection is served by its own task, which reads a request, answers it and waits for the answer to be
+    flushed before reading the next one, so a client that doesn't read its answers stops being served instead of
+    growing the server's buffers. Sessions are only used by the connection that created them, which closes them when
+    it ends. They are limited to max_sessions and evicted once they have been idle for idle_timeout seconds.
+    '''
+    def __init__(self, max_sessions: int = 10000, idle_timeout: float = 300.0,
+                 presets: Optional[Dict[str, BoardPresetDataclass]] = None):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.presets = get_presets() if presets is None else presets
+        self.sessions: Dict[str, GameSession] = {}
+        self._servers: List[asyncio.AbstractServer] = []
+        self._eviction_task: Optional[asyncio.Task] = None
+
+    async def start_tcp(self, host: str = '127.0.0.1', port: int = 0) -> asyncio.AbstractServer:
+        server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_LINE_LENGTH)
+        self._register(server)
+        return server
+
+    async def start_unix(self, path: str) -> asyncio.AbstractServer:
+        server = await asyncio.start_unix_server(self.handle_connection, path, limit=MAX_LINE_LENGTH)
+        self._register(server)
+        return server
+
+    def _register(self, server: asyncio.AbstractServer):
+        self._servers.append(server)
+        if self._eviction_task is None:
+            self._eviction_task = asyncio.get_running_loop().create_task(self._evict_idle_sessions_periodically())
+
+    async def close(self):
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._servers = []
+        if self._eviction_task is not None:
+            self._eviction_task.cancel()
+            self._eviction_task = None
+
+    async def _evict_idle_sessions_periodically(self):
+        while True:
+            await asyncio.sleep(max(self.idle_timeout / 4, 0.01))
+            self.evict_idle_sessions()
+
+    def evict_idle_sessions(self, now: Optional[float] = None) -> int:
+        '''
+        :return: the number of sessions evicted
+        '''
+        deadline = (time.monotonic() if now is None else now) - self.idle_timeout
+        idle_sessions = [session_id for session_id, session in self.sessions.items() if session.last_active < deadline]
+        for session_id in idle_sessions:
+            del self.sessions[session_id]
+        return len(idle_sessions)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        owner = object()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    writer.write(b'ERR line too long\n')
+                    break
+                if not line:
+                    break
+                request = line.decode(errors='replace').strip()
+                if not request:
+                    continue
+                writer.write((self.handle_request(request, owner) + '\n').encode())
+                await writer.drain()
+                if request.upper() == 'QUIT':
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.close_sessions(owner)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    def close_sessions(self, owner: object) -> int:
+        '''
+        :return: the number of sessions of owner closed
+        '''
+        owned_sessions = [session_id for session_id, session in self.sessions.items() if session.owner is owner]
+        for session_id in owned_sessions:
+            del self.sessions[session_id]
+        return len(owned_sessions)
+
+    def handle_request(self, request: str, owner: object = None) -> str:
+        '''
+        :param owner: the connection making the request: it can only use the sessions it created
+        '''
+        command, *arguments = request.split()
+        if command.upper() not in self.COMMANDS:
+            return f'ERR unknown command {command}'
+        handler, minimum_arguments, maximum_arguments = self.COMMANDS[command.upper()]
+        if not minimum_arguments <= len(arguments) <= maximum_arguments:
+            return f'ERR wrong number of arguments for {command.upper()}'
+        try:
+            return 'OK' + ''.join(f' {field}' for field in handler(self, owner, *arguments))
+        except ProtocolException as e:
+            return f'ERR {e}'
+
+    def _session(self, owner: object, session_id: str) -> GameSession:
+        session = self.sessions.get(session_id)
+        if session is None or session.owner is not owner:
+            raise ProtocolException(f'no session {session_id}')
+        session.last_active = time.monotonic()
+        return session
+
+    def _new_game(self, owner: object, preset_name: str = 'standard_8_by_8') -> List[str]:
+        if preset_name not in self.presets:
+            raise ProtocolException(f'unknown preset {preset_name}')
+        if len(self.sessions) >= self.max_sessions:
+            self.evict_idle_sessions()
+            if len(self.sessions) >= self.max_sessions:
+                raise ProtocolException('too many sessions')
+        session_id = secrets.token_hex(SESSION_ID_BYTES)
+        game = CheckersGame(CheckerBoardFactory.build_board_from_preset(self.presets[preset_name]))
+        self.sessions[session_id] = GameSession(game, time.monotonic(), owner)
+        return [session_id]
+
+    def _move(self, owner: object, session_id: str, move_text: str) -> List[str]:
+        game = self._session(owner, session_id).game
+        if game.game_status is not GameStatusEnum.game_continues:
+            raise ProtocolException(f'game is over: {game.game_status.name}')
+        try:
+            game.make_move(CheckersMove([int(coordinate) for coordinate in move_text.split(',')]))
+        except ValueError:
+            raise ProtocolException(f'malformed move {move_text}')
+        except IllegalMoveException as e:
+            raise ProtocolException(f'illegal move: {e}')
+        if not game.current_team_can_move():
+            game.end_game()
+        return [game.game_status.name, game.current_team.name]
+
+    def _state(self, owner: object, session_id: str) -> List[str]:
+        game = self._session(owner, session_id).game
+        scores = game.board.score
+        return [game.game_status.name, game.current_team.name, str(scores[TeamEnum.white]),
+                str(scores[TeamEnum.black]), str(game.board).strip().replace('\n', '/')]
+
+    def _legal_moves(self, owner: object, session_id: str) -> List[str]:
+        game = self._session(owner, session_id).game
+        if game.game_status is not GameStatusEnum.game_continues:
+            return []
+        return [f'{move.source[0]},{move.source[1]},{move.target[0]},{move.target[1]}' for move in game.legal_moves()]
+
+    def _resign(self, owner: object, session_id: str) -> List[str]:
+        game = self._session(owner, session_id).game
+        del self.sessions[session_id]
+        if game.game_status is GameStatusEnum.game_continues:
+            game.game_status = GameStatusEnum.black_wins if game.current_team is TeamEnum.white \
+                else GameStatusEnum.white_wins
+        return [game.game_status.name]
+
+    def _quit(self, owner: object) -> List[str]:
+        return []
+
+    # Command: (handler, minimum number of arguments, maximum number of arguments)
+    COMMANDS = {'NEW': (_new_game, 0, 1), 'MOVE': (_move, 2, 2), 'STATE': (_state, 1, 1),
+                'LEGAL': (_legal_moves, 1, 1), 'RESIGN': (_resign, 1, 1), 'QUIT': (_quit, 0, 0)}
+
+
+async def serve(args: argparse.Namespace, presets: Dict[str, BoardPresetDataclass]):
+    server = GameServer(args.max_sessions, args.idle_timeout, presets)
+    if args.unix is not None:
+        listener = await server.start_unix(args.unix)
+    else:
+        listener = await server.start_tcp(args.host, args.port)
+    print(f'serving on {", ".join(str(socket.getsockname()) for socket in listener.sockets)}', flush=True)
+    try:
+        await listener.serve_forever()
+    finally:
+        await server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve checkers games over a line protocol')
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7878)
+    parser.add_argument('--unix', type=str, default=None, help='listen on this Unix socket path instead of TCP')
+    parser.add_argument('--max-sessions', type=int, default=10000)
+    parser.add_argument('--idle-timeout', type=float, default=300.0, help='seconds before an idle session is evicted')
+    add_preset_arguments(parser, choose_preset=False)
+    args = parser.parse_args()
+    presets = load_presets(parser, args)
+    try:
+        asyncio.run(serve(args, presets))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+import json
+import time
+from typing import Dict, Optional, Tuple
+
+from board import CheckerBoard
+from checkers_enums import GameStatusEnum, MoveValidationEnum, TeamEnum
+from checkers_game import CheckersGame
+from checkersmove import CheckersMove, IllegalMoveException
+
+
+class GameStatistics:
+    '''
+    Counters and cumulative per-phase timers (in seconds) filled in by InstrumentedCheckersGame.
+    Statistics of several games, or of other processes, are combined with merge.
+    '''
+    def __init__(self):
+        self.counters: Dict[str, int] = {}
+        self.timers: Dict[str, float] = {}
+
+    def count(self, name: str, amount: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_time(self, phase: str, elapsed: float):
+        self.timers[phase] = self.timers.get(phase, 0.0) + elapsed
+
+    def merge(self, snapshot: Dict[str, Dict]):
+        '''
+        Adds the counters and timers of a snapshot taken from other statistics.
+        '''
+        for name, amount in snapshot['counters'].items():
+            self.count(name, amount)
+        for phase, elapsed in snapshot['timers'].items():
+            self.add_time(phase, elapsed)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {'counters': dict(sorted(self.counters.items())), 'timers': dict(sorted(self.timers.items()))}
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def clear(self):
+        self.counters.clear()
+        self.timers.clear()
+
+
+class InstrumentedCheckersGame(CheckersGame):
+    '''
+    CheckersGame that records GameStatistics while it plays. Instrumentation is opt-in by using this class:
+    CheckersGame itself carries no checks or timers, so uninstrumented games don't pay for it.
+    Counters: games, validations (every validate_move call, including the speculative ones of the capture scans),
+    exceptions (IllegalMoveException raised by make_move), capture_candidates (captures re-examined by the capture
+    scans), moves_applied and moves_unmade.
+    Timers: make_move in total, and its validation, board_mutation, capture_scan and mobility_update phases, plus
+    unmake_move and end_game.
+    '''
+    def __init__(self, board: CheckerBoard, statistics: Optional[GameStatistics] = None,
+                 skip_scan_for_pieces_that_can_capture: bool = False):
+        self.statistics = GameStatistics() if statistics is None else statistics
+        self.statistics.count('games')
+        super().__init__(board, skip_scan_for_pieces_that_can_capture)
+
+    def validate_move(self, move: CheckersMove, team: TeamEnum = None) -> MoveValidationEnum:
+        self.statistics.count('validations')
+        return super().validate_move(move, team)
+
+    def verify_move_is_valid(self, move: CheckersMove, team: TeamEnum = None):
+        start_time = time.perf_counter()
+        try:
+            super().verify_move_is_valid(move, team)
+        finally:
+            self.statistics.add_time('validation', time.perf_counter() - start_time)
+
+    def check_if_move_is_one_of_available_captures(self, move: CheckersMove):
+        start_time = time.perf_counter()
+        try:
+            super().check_if_move_is_one_of_available_captures(move)
+        finally:
+            self.statistics.add_time('validation', time.perf_counter() - start_time)
+
+    def apply_move_to_board(self, move: CheckersMove) -> Optional[Tuple[int, int]]:
+        start_time = time.perf_counter()
+        try:
+            return super().apply_move_to_board(move)
+        finally:
+            self.statistics.add_time('board_mutation', time.perf_counter() - start_time)
+
+    def update_possible_capture_moves_around(self, touched_coordinates: Tuple[Tuple[int, int], ...]):
+        start_time = time.perf_counter()
+        for team in self.possible_capture_moves:
+            for coordinates in touched_coordinates:
+                self.statistics.count('capture_candidates', len(self.geometry.jumps_through(coordinates, team)))
+        super().update_possible_capture_moves_around(touched_coordinates)
+        self.statistics.add_time('capture_scan', time.perf_counter() - start_time)
+
+    def update_movable_pieces_around(self, touched_coordinates: Tuple[Tuple[int, int], ...]):
+        start_time = time.perf_counter()
+        super().update_movable_pieces_around(touched_coordinates)
+        self.statistics.add_time('mobility_update', time.perf_counter() - start_time)
+
+    def make_move(self, move: CheckersMove):
+        start_time = time.perf_counter()
+        try:
+            super().make_move(move)
+        except IllegalMoveException:
+            self.statistics.count('exceptions')
+            raise
+        finally:
+            self.statistics.add_time('make_move', time.perf_counter() - start_time)
+        self.statistics.count('moves_applied')
+
+    def unmake_move(self) -> CheckersMove:
+        start_time = time.perf_counter()
+        move = super().unmake_move()
+        self.statistics.add_time('unmake_move', time.perf_counter() - start_time)
+        self.statistics.count('moves_unmade')
+        return move
+
+    def end_game(self) -> GameStatusEnum:
+        start_time = time.perf_counter()
+        game_status = super().end_game()
+        self.statistics.add_time('end_game', time.perf_counter() - start_time)
+        return game_status
@@ -1,20 +1,285 @@
 import argparse
+import itertools
+import json
 import os
+import sys
+from multiprocessing import Pool
+from typing import Dict, Iterable, Iterator, Optional, TextIO, Tuple
 
-from board import CheckerBoardFactory, CheckerBoardPresets
+import binary_move_log
+from binary_move_log import MoveLogFormatException, create_move_iterator_from_binary_data, \
+    create_move_iterator_from_binary_log, is_binary_move_log
+from board import BoardPresetDataclass, CheckerBoardFactory, CheckerBoardPresets
 from checkers_game import CheckersGame
-from move_iterators import create_move_iterator_from_move_file
+from checkersmove import get_move_intern_table
+from game_files import expand_paths
+from instrumentation import GameStatistics, InstrumentedCheckersGame
+from move_iterators import create_move_iterator_from_move_file, create_move_iterator_from_text
+from result_cache import DEFAULT_MAX_ENTRIES, ResultCache, ValidationCheckpoint, validate_game_data
+
+
+def validate_game_file(path: str, statistics: Optional[GameStatistics] = None) -> str:
+    return f'{os.path.basename(path)} - {play_game_file(path, statistics)}'
+
+
+def play_game_file(path: str, statistics: Optional[GameStatistics] = None) -> str:
+    try:
+        preset = CheckerBoardPresets.standard_8_by_8
+        if is_binary_move_log(path):
+            move_iterator = create_move_iterator_from_binary_log(path)
+        else:
+            move_iterator = create_move_iterator_from_move_file(path, get_move_intern_table(preset.length, preset.height))
+        board = CheckerBoardFactory.build_board_from_preset(preset)
+        game = CheckersGame(board) if statistics is None else InstrumentedCheckersGame(board, statistics)
+        return game.run_game(move_iterator)
+    except OSError as e:
+        return f'could not read file: {e.strerror}'
+    except MoveLogFormatException as e:
+        return f'could not read file: {e}'
+
+
+def play_binary_move_log_data(path: str, data: bytes, preset: BoardPresetDataclass,
+                              statistics: Optional[GameStatistics] = None) -> str:
+    '''
+    Plays the contents of a binary move log already read from path, as play_game_file plays the file.
+    '''
+    board = CheckerBoardFactory.build_board_from_preset(preset)
+    game = CheckersGame(board) if statistics is None else InstrumentedCheckersGame(board, statistics)
+    try:
+        return game.run_game(create_move_iterator_from_binary_data(data, path))
+    except MoveLogFormatException as e:
+        return f'could not read file: {e}'
+
+
+def validate_game_file_with_statistics(path: str) -> Tuple[str, Dict[str, Dict]]:
+    statistics = GameStatistics()
+    return validate_game_file(path, statistics), statistics.snapshot()
+
+
+# A cached validation job: the path, its contents and their hash (None if the file couldn't be read), its result if
+# it is already known (cached, or the file couldn't be read), the checkpoint of its last validation, the cache's
+# preset and whether to instrument the game
+CachedValidationJob = Tuple[str, Optional[bytes], Optional[bytes], Optional[str], Optional[ValidationCheckpoint],
+                            BoardPresetDataclass, bool]
+
+
+def validate_cached_game_file(job: CachedValidationJob) -> Tuple[str, str, Optional[bytes],
+                                                                  Optional[ValidationCheckpoint], bool, Optional[Dict]]:
+    '''
+    Validates the contents of a game file, as the parent read and hashed them, for validate_game_files with a cache,
+    resuming from the checkpoint if the file grew since.
+    :return: the path, the result, the hash of the contents that were validated (None if the result was already
+        known), the new checkpoint, whether the validation resumed and the statistics snapshot
+    '''
+    path, data, data_hash, result, checkpoint, preset, instrumented = job
+    if result is not None:
+        return path, result, None, None, False, None
+    statistics = GameStatistics() if instrumented else None
+    if data.startswith(binary_move_log.MAGIC):
+        result, new_checkpoint, resumed = play_binary_move_log_data(path, data, preset, statistics), None, False
+    else:
+        result, new_checkpoint, resumed = validate_game_data(data, checkpoint, preset, statistics)
+    return path, result, data_hash, new_checkpoint, resumed, None if statistics is None else statistics.snapshot()
+
+
+def validate_game_files(paths: Iterable[str], workers: int = 1, ordered: bool = False,
+                        chunksize: int = 16, statistics: Optional[GameStatistics] = None,
+                        cache: Optional[ResultCache] = None) -> Iterator[str]:
+    '''
+    Validates the games with a pool of worker processes. When statistics are given, the games are instrumented and
+    the statistics of every game, wherever it was played, are merged into them.
+    With a cache, files whose contents were already validated aren't played again, and files that grew since their
+    last validation resume from its checkpoint. The cache is only used by this process: files are read and hashed
+    here, a batch ahead of the workers, and sent to them with their hashes; the workers report the results to store.
+    '''
+    if cache is not None:
+        yield from _validate_game_files_with_cache(paths, workers, ordered, chunksize, statistics, cache)
+        return
+    if statistics is None:
+        yield from _map_game_files(validate_game_file, paths, workers, ordered, chunksize)
+        return
+    for result, snapshot in _map_game_files(validate_game_file_with_statistics, paths, workers, ordered, chunksize):
+        statistics.merge(snapshot)
+        yield result
+
+
+def _validate_game_files_with_cache(paths: Iterable[str], workers: int, ordered: bool, chunksize: int,
+                                    statistics: Optional[GameStatistics], cache: ResultCache) -> Iterator[str]:
+    counters_before = cache.counters
+    jobs = _cached_validation_jobs(paths, cache, statistics is not None)
+    for path, result, data_hash, checkpoint, resumed, snapshot in _map_cached_validation_jobs(
+            jobs, workers, ordered, chunksize):
+        if data_hash is not None:
+            cache.store(path, data_hash, result, checkpoint, resumed)
+        if snapshot is not None:
+            statistics.merge(snapshot)
+        yield f'{os.path.basename(path)} - {result}'
+    if statistics is not None:
+        for name, amount in cache.counters.items():
+            statistics.count(name, amount - counters_before[name])
+
+
+def _cached_validation_jobs(paths: Iterable[str], cache: ResultCache,
+                            instrumented: bool) -> Iterator[CachedValidationJob]:
+    for path in paths:
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+        except OSError as e:
+            yield path, None, None, f'could not read file: {e.strerror}', None, cache.preset, instrumented
+            continue
+        data_hash, result = cache.lookup(data)
+        yield path, data, data_hash, result, None if result is not None else cache.checkpoint(path), cache.preset, \
+            instrumented
+
+
+def _map_cached_validation_jobs(jobs: Iterator[CachedValidationJob], workers: int, ordered: bool,
+                                chunksize: int) -> Iterator:
+    '''
+    Maps validate_cached_game_file over the jobs as they are built. A pool takes its jobs from another thread and
+    the cache's SQLite connection belongs to this one, so the jobs are built here a batch at a time: the next batch
+    is built and handed to the pool before the results of the previous one are read.
+    '''
+    if workers <= 1:
+        yield from map(validate_cached_game_file, jobs)
+        return
+    with Pool(workers) as pool:
+        map_batch = pool.imap if ordered else pool.imap_unordered
+        results = iter(())
+        while True:
+            batch = list(itertools.islice(jobs, workers * chunksize))
+            next_results = map_batch(validate_cached_game_file, batch, chunksize) if batch else None
+            yield from results
+            if next_results is None:
+                return
+            results = next_results
+
+
+def _map_game_files(function, paths: Iterable[str], workers: int, ordered: bool, chunksize: int) -> Iterator:
+    if workers <= 1:
+        yield from map(function, paths)
+        return
+    with Pool(workers) as pool:
+        if ordered:
+            yield from pool.imap(function, paths, chunksize)
+        else:
+            yield from pool.imap_unordered(function, paths, chunksize)
+
+
+class GameValidator:
+    '''
+    Validates games one after another in a long-lived process, as play_game_file does. The preset's starting
+    position is built once and kept as a CheckersGame.to_bytes template; every game is restored from it instead of
+    setting up the board and scanning it for captures again.
+    '''
+    def __init__(self, preset: BoardPresetDataclass = CheckerBoardPresets.standard_8_by_8,
+                 statistics: Optional[GameStatistics] = None):
+        self.statistics = statistics
+        self.intern_table = get_move_intern_table(preset.length, preset.height)
+        self._template = CheckersGame(CheckerBoardFactory.build_board_from_preset(preset)).to_bytes()
+
+    def new_game(self) -> CheckersGame:
+        if self.statistics is None:
+            return CheckersGame.from_bytes(self._template)
+        return InstrumentedCheckersGame.from_bytes(self._template, statistics=self.statistics)
+
+    def validate_file(self, path: str) -> str:
+        try:
+            if is_binary_move_log(path):
+                move_iterator = create_move_iterator_from_binary_log(path)
+            else:
+                move_iterator = create_move_iterator_from_move_file(path, self.intern_table)
+            return self.new_game().run_game(move_iterator)
+        except OSError as e:
+            return f'could not read file: {e.strerror}'
+        except MoveLogFormatException as e:
+            return f'could not read file: {e}'
+
+    def validate_moves(self, text: str) -> str:
+        '''
+        Validates the contents of a text move file.
+        '''
+        return self.new_game().run_game(create_move_iterator_from_text(text, self.intern_table))
+
+
+def handle_validation_request(request: str, validator: GameValidator) -> Dict:
+    '''
+    Answers one line of serve's input: either a game file path, or a JSON object with the "path" of a game file or
+    the "moves" of a game as the text of a move file. An "id" in the object is copied to the answer. A game that
+    can't be validated is answered with an "error", so it only fails its own request.
+    '''
+    if not request.startswith('{'):
+        fields = {'path': request}
+    else:
+        try:
+            fields = json.loads(request)
+        except ValueError as e:
+            return {'error': f'invalid JSON: {e}'}
+    answer = {'id': fields['id']} if 'id' in fields else {}
+    try:
+        if isinstance(fields.get('path'), str):
+            answer['path'] = fields['path']
+            answer['result'] = validator.validate_file(fields['path'])
+        elif isinstance(fields.get('moves'), str):
+            answer['result'] = validator.validate_moves(fields['moves'])
+        else:
+            answer['error'] = 'request needs a "path" or "moves" string'
+    except Exception as e:
+        answer['error'] = f'could not validate the game: {e}'
+    return answer
+
+
+def serve(requests: Iterable[str], output: TextIO, validator: GameValidator):
+    '''
+    Validates a game for every non-blank line of requests (see handle_validation_request) and writes one JSON line
+    per game to output, flushed right away so a caller waiting on it can read it.
+    '''
+    for line in requests:
+        request = line.strip()
+        if request:
+            output.write(json.dumps(handle_validation_request(request, validator)) + '\n')
+            output.flush()
 
 
 def main():
     parser = argparse.ArgumentParser(description='Please enter file path for game')
-    parser.add_argument('path', type=str)
+    parser.add_argument('paths', type=str, nargs='*', help='game files, directories or glob patterns')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='number of worker processes')
+    parser.add_argument('--ordered', action='store_true', help='print results in input order')
+    parser.add_argument('--chunksize', type=int, default=16, help='files handed to a worker at a time')
+    parser.add_argument('--stats', action='store_true',
+                        help='instrument the games and print their counters and timers as JSON to stderr')
+    parser.add_argument('--cache', type=str, default=None,
+                        help='SQLite file caching the results by file contents, created if needed')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_MAX_ENTRIES,
+                        help='results and checkpoints kept in the cache')
+    parser.add_argument('--serve', action='store_true',
+                        help='keep running and validate the game of every line of stdin, a path or a JSON request, '
+                             'printing one JSON result line per game')
     args = parser.parse_args()
-    move_iterator = create_move_iterator_from_move_file(args.path)
-    game = CheckersGame(CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8))
-    game_result = game.run_game(move_iterator)
-    print(f'{os.path.basename(args.path)} - {game_result}')
+    if args.serve:
+        if args.paths or args.cache is not None:
+            parser.error('--serve reads its games from stdin and takes no paths or --cache')
+        statistics = GameStatistics() if args.stats else None
+        serve(iter(sys.stdin.readline, ''), sys.stdout, GameValidator(statistics=statistics))
+        if statistics is not None:
+            print(statistics.to_json(), file=sys.stderr)
+        return
+    if not args.paths:
+        parser.error('the following arguments are required: paths')
+    paths = list(expand_paths(args.paths))
+    statistics = GameStatistics() if args.stats else None
+    cache = None if args.cache is None else ResultCache(args.cache, args.cache_size)
+    try:
+        for line in validate_game_files(paths, min(args.workers, len(paths)), args.ordered, args.chunksize,
+                                        statistics, cache):
+            print(line, flush=True)
+    finally:
+        if cache is not None:
+            cache.close()
+    if statistics is not None:
+        print(statistics.to_json(), file=sys.stderr)
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -1,21 +1,86 @@
-from typing import Iterator, List
 
-from checkersmove import CheckersMove, IllegalMoveException
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
-def create_move_iterator_from_move_file(path: str) -> Iterator[CheckersMove]:
-    with open(path, 'r') as file:
-        for line in file:
+from checkersmove import CheckersMove, IllegalMoveException, MoveInternTable
+
+MOVE_FILE_BLOCK_SIZE = 1 << 20
+MAX_CACHED_LINES = 1 << 12
+
+
+def create_move_iterator_from_move_file(path: str, intern_table: Optional[MoveInternTable] = None,
+                                        block_size: int = MOVE_FILE_BLOCK_SIZE) -> Iterator[CheckersMove]:
+    '''
+    Reads the move file in blocks of block_size characters and parses all the complete lines of a block before
+    yielding their moves. A game only uses a few hundred distinct moves, so each distinct line is parsed once and
+    looked up afterwards.
+    A malformed line raises IllegalMoveException, with its 1-based line number as line_number, once the moves of the
+    lines before it have been yielded. The file is decoded as UTF-8 with undecodable bytes replaced, as
+    result_cache.validate_game_data does, so they make their line malformed instead of failing the whole file.
+    '''
+    build_move = CheckersMove if intern_table is None else intern_table.get
+    moves_by_line: Dict[str, CheckersMove] = {}
+    line_number = 0
+    remainder = ''
+    with open(path, 'r', encoding='utf-8', errors='replace') as file:
+        while True:
+            block = file.read(block_size)
+            if not block:
+                break
+            lines = (remainder + block).split('\n')
+            remainder = lines.pop()
+            moves, error = _parse_lines(lines, line_number, build_move, moves_by_line)
+            yield from moves
+            if error is not None:
+                raise error
+            line_number += len(moves)
+    if remainder:
+        moves, error = _parse_lines([remainder], line_number, build_move, moves_by_line)
+        yield from moves
+        if error is not None:
+            raise error
+
+
+def create_move_iterator_from_text(text: str, intern_table: Optional[MoveInternTable] = None,
+                                   line_number: int = 0) -> Iterator[CheckersMove]:
+    '''
+    Parses the lines of a move file's text, already in memory, as create_move_iterator_from_move_file does.
+    :param line_number: the number of lines before text, when it is the end of a longer file
+    '''
+    build_move = CheckersMove if intern_table is None else intern_table.get
+    lines = text.split('\n')
+    if not lines[-1]:
+        lines.pop()
+    moves, error = _parse_lines(lines, line_number, build_move, {})
+    yield from moves
+    if error is not None:
+        raise error
+
+
+def _parse_lines(lines: List[str], line_number: int, build_move: Callable[[List[int]], CheckersMove],
+                 moves_by_line: Dict[str, CheckersMove]) -> Tuple[List[CheckersMove], Optional[IllegalMoveException]]:
+    '''
+    :return: the moves of the lines up to the first malformed one, and the exception for that line if there is one
+    '''
+    moves = []
+    for line in lines:
+        move = moves_by_line.get(line)
+        if move is None:
             try:
-                move = CheckersMove([int(coord) for coord in line.split(',')])
-            except ValueError as e:
-                raise IllegalMoveException(str(e))
-            yield move
+                move = build_move([int(coord) for coord in line.split(',')])
+            except (ValueError, IllegalMoveException):
+                return moves, IllegalMoveException(line.strip(), line_number + len(moves) + 1)
+            if len(moves_by_line) < MAX_CACHED_LINES:
+                moves_by_line[line] = move
+        moves.append(move)
+    return moves, None
 
 
-def create_move_iterator_from_list_of_lists(list_of_moves: List[List[int]]) -> Iterator[CheckersMove]:
-    for move in list_of_moves:
+def create_move_iterator_from_list_of_lists(list_of_moves: List[List[int]],
+                                            intern_table: Optional[MoveInternTable] = None) -> Iterator[CheckersMove]:
+    build_move = CheckersMove if intern_table is None else intern_table.get
+    for line_number, move in enumerate(list_of_moves, 1):
         try:
-            move = CheckersMove(move)
-        except ValueError as e:
-            raise IllegalMoveException(str(e))
+            move = build_move(move)
+        except (ValueError, IllegalMoveException) as e:
+            raise IllegalMoveException(str(e), line_number)
         yield move
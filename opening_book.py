@@ -0,0 +1,257 @@
+import argparse
+import os
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from functools import partial
+from multiprocessing import Pool
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from board import BoardPresetDataclass, CheckerBoardFactory, CheckerBoardPresets
+from checkers_enums import GameStatusEnum
+from checkers_game import CheckersGame
+from checkersmove import CheckersMove, IllegalMoveException, get_move_intern_table
+from game_files import expand_paths
+from move_iterators import create_move_iterator_from_move_file
+from search_engine import SearchEngine
+
+# Outcomes counted per position, in the column order of the positions table
+OUTCOMES = (GameStatusEnum.white_wins, GameStatusEnum.black_wins, GameStatusEnum.tie_game,
+            GameStatusEnum.incomplete_game, GameStatusEnum.illegal_move)
+OUTCOME_COLUMNS = ('white_wins', 'black_wins', 'ties', 'incomplete', 'illegal')
+SCHEMA = f'''
+CREATE TABLE IF NOT EXISTS metadata (board_length INTEGER NOT NULL, board_height INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS positions (
+    key INTEGER PRIMARY KEY,
+    visits INTEGER NOT NULL,
+    {', '.join(f'{column} INTEGER NOT NULL' for column in OUTCOME_COLUMNS)}
+);
+CREATE TABLE IF NOT EXISTS continuations (
+    key INTEGER NOT NULL,
+    move TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    child_key INTEGER NOT NULL,
+    PRIMARY KEY (key, move)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS indexed_files (path TEXT PRIMARY KEY) WITHOUT ROWID;
+'''
+
+
+def to_signed_key(key: int) -> int:
+    '''
+    Zobrist keys are unsigned 64-bit integers, SQLite integers are signed.
+    '''
+    return key - (1 << 64) if key >= 1 << 63 else key
+
+
+def format_move(move: CheckersMove) -> str:
+    return f'{move.source[0]},{move.source[1]},{move.target[0]},{move.target[1]}'
+
+
+@dataclass
+class GameFileStatistics:
+    '''
+    What one game file adds to the book: the visits and outcome counts of every position it reached, and the moves
+    played from them with the number of times each was played and the key of the position it led to.
+    '''
+    path: str
+    readable: bool = True
+    positions: Dict[int, List[int]] = field(default_factory=dict)
+    continuations: Dict[Tuple[int, str], List[int]] = field(default_factory=dict)
+
+
+def index_game_file(path: str, preset: BoardPresetDataclass = CheckerBoardPresets.standard_8_by_8) -> GameFileStatistics:
+    '''
+    Replays a move file and collects the positions it went through. A game that hits an illegal move, or a line that
+    isn't valid UTF-8, keeps the positions reached before it, with an illegal move outcome; an unreadable file adds
+    nothing and isn't marked as indexed.
+    '''
+    statistics = GameFileStatistics(os.path.abspath(path))
+    game = CheckersGame(CheckerBoardFactory.build_board_from_preset(preset))
+    keys = [SearchEngine.position_key(game)]
+    moves_played = []
+    try:
+        for move in create_move_iterator_from_move_file(path, get_move_intern_table(preset.length, preset.height)):
+            game.make_move(move)
+            moves_played.append(move)
+            keys.append(SearchEngine.position_key(game))
+        outcome = game.end_game()
+    except IllegalMoveException:
+        outcome = GameStatusEnum.illegal_move
+    except OSError:
+        statistics.readable = False
+        return statistics
+    outcome_index = OUTCOMES.index(outcome)
+    for key in keys:
+        counts = statistics.positions.setdefault(to_signed_key(key), [0] * (1 + len(OUTCOMES)))
+        counts[0] += 1
+        counts[1 + outcome_index] += 1
+    for key, move, child_key in zip(keys, moves_played, keys[1:]):
+        statistics.continuations.setdefault((to_signed_key(key), format_move(move)), [0, to_signed_key(child_key)])[0] += 1
+    return statistics
+
+
+@dataclass
+class PositionStatistics:
+    visits: int
+    outcomes: Dict[GameStatusEnum, int]
+    continuations: List[Tuple[CheckersMove, int]]
+
+
+class OpeningBook:
+    '''
+    Statistics of every position reached by the indexed games, stored in an SQLite database keyed by the position's
+    Zobrist key (see SearchEngine.position_key), so transpositions share an entry.
+    Files are indexed once: add_game_files skips the paths that are already in the book.
+    Every continuation stores the key of the position it leads to, so the book is also a trie of the games' moves
+    that lookup walks without replaying them.
+    '''
+    def __init__(self, path: str, preset: BoardPresetDataclass = CheckerBoardPresets.standard_8_by_8):
+        self.preset = preset
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+        board_size = self.connection.execute('SELECT board_length, board_height FROM metadata').fetchone()
+        if board_size is None:
+            with self.connection:
+                self.connection.execute('INSERT INTO metadata VALUES (?, ?)', (preset.length, preset.height))
+        elif tuple(board_size) != (preset.length, preset.height):
+            raise ValueError(f'{path} indexes {board_size[0]}x{board_size[1]} games')
+        self.start_key = SearchEngine.position_key(CheckersGame(CheckerBoardFactory.build_board_from_preset(preset)))
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def is_indexed(self, path: str) -> bool:
+        return self.connection.execute('SELECT 1 FROM indexed_files WHERE path = ?',
+                                       (os.path.abspath(path),)).fetchone() is not None
+
+    def add_game_files(self, paths: Iterable[str], workers: int = 1, chunksize: int = 16,
+                       batch_size: int = 1024) -> int:
+        '''
+        Indexes the game files that aren't in the book yet, replaying them in a pool of worker processes.
+        Statistics are merged in memory and written every batch_size files, each batch in one transaction.
+        :return: the number of files indexed
+        '''
+        new_paths = list(dict.fromkeys(path for path in paths if not self.is_indexed(path)))
+        indexed = 0
+        batch = []
+        for statistics in self._index_files(new_paths, workers, chunksize):
+            if not statistics.readable:
+                continue
+            batch.append(statistics)
+            if len(batch) >= batch_size:
+                self._write_batch(batch)
+                indexed += len(batch)
+                batch = []
+        if batch:
+            self._write_batch(batch)
+            indexed += len(batch)
+        return indexed
+
+    def _index_files(self, paths: List[str], workers: int, chunksize: int) -> Iterable[GameFileStatistics]:
+        index_file = partial(index_game_file, preset=self.preset)
+        if workers <= 1 or len(paths) <= 1:
+            yield from map(index_file, paths)
+            return
+        with Pool(workers) as pool:
+            yield from pool.imap_unordered(index_file, paths, chunksize)
+
+    def _write_batch(self, batch: List[GameFileStatistics]):
+        positions: Dict[int, List[int]] = {}
+        continuations: Dict[Tuple[int, str], List[int]] = {}
+        for statistics in batch:
+            for key, counts in statistics.positions.items():
+                total_counts = positions.setdefault(key, [0] * len(counts))
+                for index, count in enumerate(counts):
+                    total_counts[index] += count
+            for continuation, (count, child_key) in statistics.continuations.items():
+                continuations.setdefault(continuation, [0, child_key])[0] += count
+        columns = ('visits',) + OUTCOME_COLUMNS
+        with self.connection:
+            self.connection.executemany(
+                f'INSERT INTO positions VALUES (?, {", ".join("?" for _ in columns)}) ON CONFLICT (key) DO UPDATE SET '
+                f'{", ".join(f"{column} = {column} + excluded.{column}" for column in columns)}',
+                [(key, *counts) for key, counts in positions.items()])
+            self.connection.executemany(
+                'INSERT INTO continuations VALUES (?, ?, ?, ?) ON CONFLICT (key, move) DO UPDATE SET '
+                'count = count + excluded.count',
+                [(key, move, count, child_key) for (key, move), (count, child_key) in continuations.items()])
+            self.connection.executemany('INSERT OR IGNORE INTO indexed_files VALUES (?)',
+                                        [(statistics.path,) for statistics in batch])
+
+    def position_statistics(self, key: int) -> Optional[PositionStatistics]:
+        '''
+        The statistics of the position with the given SearchEngine.position_key, or None if no game reached it.
+        Continuations are sorted from the most played.
+        '''
+        key = to_signed_key(key)
+        row = self.connection.execute(f'SELECT visits, {", ".join(OUTCOME_COLUMNS)} FROM positions WHERE key = ?',
+                                      (key,)).fetchone()
+        if row is None:
+            return None
+        move_table = get_move_intern_table(self.preset.length, self.preset.height)
+        continuations = [(move_table.get([int(coordinate) for coordinate in move.split(',')]), count)
+                         for move, count in self.connection.execute(
+                             'SELECT move, count FROM continuations WHERE key = ? ORDER BY count DESC, move', (key,))]
+        return PositionStatistics(row[0], dict(zip(OUTCOMES, row[1:])), continuations)
+
+    def lookup(self, moves: Iterable[CheckersMove]) -> Optional[PositionStatistics]:
+        '''
+        The statistics of the position reached by playing moves from the start position.
+        The moves are followed through the stored continuations. A prefix no game played can still reach a position
+        that games reached in another move order, so it is replayed to find the position's key.
+        :raises IllegalMoveException: if the moves can't be played
+        '''
+        moves = list(moves)
+        key = to_signed_key(self.start_key)
+        for move in moves:
+            row = self.connection.execute('SELECT child_key FROM continuations WHERE key = ? AND move = ?',
+                                          (key, format_move(move))).fetchone()
+            if row is None:
+                game = CheckersGame(CheckerBoardFactory.build_board_from_preset(self.preset))
+                for move_to_replay in moves:
+                    game.make_move(move_to_replay)
+                return self.position_statistics(SearchEngine.position_key(game))
+            key = row[0]
+        return self.position_statistics(key)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build or query an opening book of the positions reached by games')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build_parser = subparsers.add_parser('build', help='index the game files that are not in the book yet')
+    build_parser.add_argument('book', type=str)
+    build_parser.add_argument('paths', type=str, nargs='+', help='game files, directories or glob patterns')
+    build_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='number of worker processes')
+    build_parser.add_argument('--chunksize', type=int, default=16, help='files handed to a worker at a time')
+    query_parser = subparsers.add_parser('query', help='show the statistics of the position after some moves')
+    query_parser.add_argument('book', type=str)
+    query_parser.add_argument('moves', type=str, nargs='*', help='moves from the start, as column,row,column,row')
+    args = parser.parse_args()
+    with OpeningBook(args.book) as book:
+        start_time = time.perf_counter()
+        if args.command == 'build':
+            indexed = book.add_game_files(expand_paths(args.paths), args.workers, args.chunksize)
+            print(f'indexed {indexed} new files in {time.perf_counter() - start_time:.2f}s')
+            return
+        statistics = book.lookup(CheckersMove([int(coordinate) for coordinate in move.split(',')])
+                                 for move in args.moves)
+        elapsed = time.perf_counter() - start_time
+        if statistics is None:
+            print('position not in the book')
+            return
+        print(f'{statistics.visits} visits ({elapsed * 1000:.2f}ms)')
+        for outcome, count in statistics.outcomes.items():
+            print(f'    {outcome.value}: {count}')
+        for move, count in statistics.continuations:
+            print(f'    {format_move(move)}: {count}')
+
+
+if __name__ == '__main__':
+    main()
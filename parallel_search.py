@@ -0,0 +1,179 @@
+import argparse
+import time
+from multiprocessing import Pool, Value
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from board import CheckerBoardFactory
+from checkers_game import CheckersGame
+from checkersmove import CheckersMove, get_move_intern_table
+from perft import add_preset_arguments, load_presets, perft
+from search_engine import SearchEngine, SearchResult
+
+# Set in every worker process by _initialize_worker, and in this process by a walker without a pool before it runs tasks
+_shared_bound = None
+_engine: Optional[SearchEngine] = None
+
+
+def _set_worker_state(shared_bound, engine: SearchEngine):
+    global _shared_bound, _engine
+    _shared_bound = shared_bound
+    _engine = engine
+
+
+def _initialize_worker(shared_bound, transposition_table_size: int):
+    _set_worker_state(shared_bound, SearchEngine(transposition_table_size=transposition_table_size))
+
+
+def _perft_task(task: Tuple[int, bytes, int]) -> Tuple[int, int]:
+    root_move_index, snapshot, depth = task
+    return root_move_index, perft(CheckersGame.from_bytes(snapshot), depth)
+
+
+def _search_task(task: Tuple[int, bytes, Tuple[int, int, int, int], int]) -> Tuple[int, int, bool, int]:
+    '''
+    Searches one root move, starting from the best exact score any worker has found for the root so far, and shares
+    the move's score if it is better.
+    :return: the index of the move, its score, whether the score is exact and the number of nodes searched
+    '''
+    root_move_index, snapshot, move, depth = task
+    game = CheckersGame.from_bytes(snapshot)
+    alpha = _shared_bound.value
+    nodes_before = _engine.nodes
+    score = _engine.search_root_move(game, get_move_intern_table(game.board.length, game.board.height).get(move),
+                                     depth, alpha)
+    exact = score > alpha
+    if exact:
+        with _shared_bound.get_lock():
+            if score > _shared_bound.value:
+                _shared_bound.value = score
+    return root_move_index, score, exact, _engine.nodes - nodes_before
+
+
+def _frontier(game: CheckersGame, depth: int, split_depth: int) -> Iterator[Tuple[bytes, int]]:
+    '''
+    The positions split_depth moves below the game (or depth moves, if that is less), encoded with to_bytes, each
+    with the depth left to count from it. Positions where the team to move can't move before that are left out,
+    as perft doesn't count them.
+    '''
+    if split_depth <= 0 or depth <= 0:
+        yield game.to_bytes(), depth
+        return
+    for move in game.legal_moves():
+        game.make_move(move)
+        yield from _frontier(game, depth - 1, split_depth - 1)
+        game.unmake_move()
+
+
+class ParallelTreeWalker:
+    '''
+    Walks the game tree from a position with a pool of worker processes, split at the root: the root's moves, or
+    the positions split_depth moves deep for perft, are sent to the workers as CheckersGame.to_bytes snapshots and
+    the workers' results are merged here.
+    search runs an alpha-beta search of every root move in its own task. The workers share the best exact score
+    found for the root so far and start every move's search from it, so moves searched after a good one are cut
+    off as they would be by a single search.
+    The pool is kept for the walker's lifetime; with one worker, tasks run in this process.
+    '''
+    def __init__(self, workers: int = 1, split_depth: int = 2, transposition_table_size: int = 1 << 16):
+        self.workers = workers
+        self.split_depth = split_depth
+        self._shared_bound = Value('q', 0)
+        self._pool = None
+        self._engine = None
+        if workers > 1:
+            self._pool = Pool(workers, _initialize_worker, (self._shared_bound, transposition_table_size))
+        else:
+            self._engine = SearchEngine(transposition_table_size=transposition_table_size)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _map(self, function, tasks: list) -> Iterator:
+        if self._pool is None:
+            _set_worker_state(self._shared_bound, self._engine)
+            return map(function, tasks)
+        return self._pool.imap_unordered(function, tasks)
+
+    def divide(self, game: CheckersGame, depth: int) -> List[Tuple[CheckersMove, int]]:
+        '''
+        perft.divide, counted by the workers. The game is left as it was.
+        '''
+        moves = game.legal_moves()
+        if depth <= 0:
+            return []
+        tasks = []
+        for index, move in enumerate(moves):
+            game.make_move(move)
+            tasks.extend((index, snapshot, remaining_depth)
+                         for snapshot, remaining_depth in _frontier(game, depth - 1, self.split_depth - 1))
+            game.unmake_move()
+        counts = [0] * len(moves)
+        for index, count in self._map(_perft_task, tasks):
+            counts[index] += count
+        return list(zip(moves, counts))
+
+    def perft(self, game: CheckersGame, depth: int) -> int:
+        if depth == 0:
+            return 1
+        return sum(count for _, count in self.divide(game, depth))
+
+    def search(self, game: CheckersGame, depth: int) -> SearchResult:
+        '''
+        Iterative deepening up to depth, every iteration searching the root moves in parallel, from the best to the
+        worst of the previous iteration.
+        '''
+        start_time = time.perf_counter()
+        moves = game.legal_moves()
+        snapshot = game.to_bytes()
+        result = SearchResult(moves[0] if moves else None, 0, 0, 0, 0.0)
+        order = list(range(len(moves)))
+        nodes = 0
+        for iteration_depth in range(1, depth + 1 if len(moves) > 1 else 1):
+            self._shared_bound.value = -SearchEngine.WIN_SCORE - 1
+            scores: Dict[int, int] = {}
+            exact_scores: Dict[int, int] = {}
+            tasks = [(index, snapshot, (*moves[index].source, *moves[index].target), iteration_depth)
+                     for index in order]
+            for index, score, exact, task_nodes in self._map(_search_task, tasks):
+                scores[index] = score
+                if exact:
+                    exact_scores[index] = score
+                nodes += task_nodes
+            order.sort(key=lambda index: (-scores[index], index not in exact_scores))
+            best_index = max(exact_scores, key=lambda index: (exact_scores[index], -order.index(index)))
+            result = SearchResult(moves[best_index], exact_scores[best_index], iteration_depth, nodes, 0.0)
+        result.nodes = nodes
+        result.elapsed = time.perf_counter() - start_time
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Count positions or search for a move with several processes')
+    parser.add_argument('command', choices=['perft', 'search'])
+    parser.add_argument('depth', type=int)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--split-depth', type=int, default=2, help='moves below the root at which perft is split')
+    add_preset_arguments(parser)
+    args = parser.parse_args()
+    game = CheckersGame(CheckerBoardFactory.build_board_from_preset(load_presets(parser, args)[args.preset]))
+    with ParallelTreeWalker(args.workers, args.split_depth) as walker:
+        start_time = time.perf_counter()
+        if args.command == 'perft':
+            nodes = walker.perft(game, args.depth)
+            elapsed = time.perf_counter() - start_time
+            print(f'depth {args.depth}: {nodes} nodes in {elapsed:.3f}s ({nodes / elapsed:.0f} nodes/s)')
+        else:
+            print(walker.search(game, args.depth))
+
+
+if __name__ == '__main__':
+    main()
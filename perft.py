@@ -0,0 +1,109 @@
+import argparse
+import importlib
+import time
+from typing import Dict, List, Optional, Tuple
+
+from board import BoardPresetDataclass, CheckerBoardFactory, CheckerBoardPresets
+from checkers_game import CheckersGame
+from checkersmove import CheckersMove
+
+
+def perft(game: CheckersGame, depth: int) -> int:
+    '''
+    Counts the positions reached after exactly depth moves from the game's current position. Every make_move counts
+    as a move, including each capture of a multiple capture. Positions where the team to move has no moves before
+    depth is reached are not counted. The game is walked in place with make_move/unmake_move and left as it was.
+    '''
+    if depth == 0:
+        return 1
+    moves = game.legal_moves()
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        game.make_move(move)
+        nodes += perft(game, depth - 1)
+        game.unmake_move()
+    return nodes
+
+
+def divide(game: CheckersGame, depth: int) -> List[Tuple[CheckersMove, int]]:
+    '''
+    perft split by the first move: the number of positions at depth reached through each legal move.
+    '''
+    counts = []
+    for move in game.legal_moves():
+        game.make_move(move)
+        counts.append((move, perft(game, depth - 1)))
+        game.unmake_move()
+    return counts
+
+
+def run_perft(preset: BoardPresetDataclass, max_depth: int, show_divide: bool = False) -> Dict[int, int]:
+    game = CheckersGame(CheckerBoardFactory.build_board_from_preset(preset))
+    counts = {}
+    for depth in range(1, max_depth + 1):
+        start_time = time.perf_counter()
+        if show_divide:
+            move_counts = divide(game, depth)
+            counts[depth] = sum(count for _, count in move_counts)
+        else:
+            counts[depth] = perft(game, depth)
+        elapsed = time.perf_counter() - start_time
+        nodes_per_second = counts[depth] / elapsed if elapsed > 0 else 0.0
+        print(f'depth {depth}: {counts[depth]} nodes in {elapsed:.3f}s ({nodes_per_second:.0f} nodes/s)')
+        if show_divide:
+            for move, count in move_counts:
+                print(f'    {move}: {count}')
+    return counts
+
+
+def get_presets(source: Optional[str] = None) -> Dict[str, BoardPresetDataclass]:
+    '''
+    The presets offered by the tools: those of CheckerBoardPresets, and those of source if given, a
+    'module:attribute' naming a class or dict of BoardPresetDataclass.
+    '''
+    presets = _collect_presets(vars(CheckerBoardPresets))
+    if source is not None:
+        module_name, _, attribute = source.partition(':')
+        extra_presets = getattr(importlib.import_module(module_name), attribute)
+        presets.update(_collect_presets(extra_presets if isinstance(extra_presets, dict) else vars(extra_presets)))
+    return presets
+
+
+def _collect_presets(namespace: Dict) -> Dict[str, BoardPresetDataclass]:
+    return {name: preset for name, preset in namespace.items() if isinstance(preset, BoardPresetDataclass)}
+
+
+def add_preset_arguments(parser: argparse.ArgumentParser, choose_preset: bool = True):
+    if choose_preset:
+        parser.add_argument('--preset', type=str, default='standard_8_by_8', help='name of the board preset')
+    parser.add_argument('--presets', type=str, default=None, metavar='MODULE:ATTRIBUTE',
+                        help='also offer the presets of a class or dict of BoardPresetDataclass, '
+                             'e.g. tests.board_presets_for_tests:CheckerBoardTestPresets')
+
+
+def load_presets(parser: argparse.ArgumentParser, args: argparse.Namespace) -> Dict[str, BoardPresetDataclass]:
+    '''
+    :return: the presets of the arguments added by add_preset_arguments, after checking the chosen --preset
+    '''
+    try:
+        presets = get_presets(args.presets)
+    except (ImportError, AttributeError, TypeError) as e:
+        parser.error(f'could not load the presets {args.presets}: {e}')
+    if 'preset' in args and args.preset not in presets:
+        parser.error(f'unknown preset {args.preset}, choose from {", ".join(sorted(presets))}')
+    return presets
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Count the positions reachable from a board preset')
+    parser.add_argument('depth', type=int)
+    add_preset_arguments(parser)
+    parser.add_argument('--divide', action='store_true', help='break the count down by first move')
+    args = parser.parse_args()
+    run_perft(load_presets(parser, args)[args.preset], args.depth, args.divide)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+import hashlib
+import os
+import sqlite3
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from board import BoardPresetDataclass, CheckerBoardFactory, CheckerBoardPresets, SnapshotFormatException
+from checkers_game import CheckersGame
+from checkersmove import get_move_intern_table
+from instrumentation import GameStatistics, InstrumentedCheckersGame
+from move_iterators import create_move_iterator_from_text
+
+# Cached results are only valid for the validator that computed them: bump this when run_game's results change
+CACHE_VERSION = 2
+DEFAULT_MAX_ENTRIES = 100000
+COMMIT_INTERVAL = 256
+# The cache's results are those of one preset, identified by the hash of its starting position's snapshot
+METADATA_TABLE = 'CREATE TABLE IF NOT EXISTS metadata (version INTEGER NOT NULL, preset_hash BLOB NOT NULL)'
+SCHEMA = f'''
+{METADATA_TABLE};
+CREATE TABLE IF NOT EXISTS results (
+    content_hash BLOB PRIMARY KEY,
+    result TEXT NOT NULL,
+    last_used INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_by_last_used ON results (last_used);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    content_hash BLOB NOT NULL,
+    line_count INTEGER NOT NULL,
+    snapshot BLOB NOT NULL,
+    last_used INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS checkpoints_by_last_used ON checkpoints (last_used);
+'''
+
+
+def content_hash(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+@dataclass
+class ValidationCheckpoint:
+    '''
+    A game file's game after its last complete line: the first size bytes of the file, with the given content_hash,
+    hold line_count lines and snapshot is the CheckersGame.to_bytes of the game after them, before end_game.
+    If lines are appended to the file, its validation can resume from there.
+    '''
+    size: int
+    content_hash: bytes
+    line_count: int
+    snapshot: bytes
+
+
+def validate_game_data(data: bytes, checkpoint: Optional[ValidationCheckpoint] = None,
+                       preset: BoardPresetDataclass = CheckerBoardPresets.standard_8_by_8,
+                       statistics: Optional[GameStatistics] = None) -> Tuple[str, Optional[ValidationCheckpoint], bool]:
+    '''
+    Validates the contents of a move file as run_game does. When checkpoint is the checkpoint of a prefix of data,
+    the game is restored from it and only the lines after it are played.
+    :return: the result of run_game, the checkpoint at the last complete line of data (None if the game stopped
+        before it), and whether the validation resumed from checkpoint
+    '''
+    complete_size = data.rfind(b'\n') + 1
+    game = None
+    if checkpoint is not None and checkpoint.size <= complete_size and \
+            content_hash(data[:checkpoint.size]) == checkpoint.content_hash:
+        try:
+            game = CheckersGame.from_bytes(checkpoint.snapshot) if statistics is None else \
+                InstrumentedCheckersGame.from_bytes(checkpoint.snapshot, statistics=statistics)
+        except SnapshotFormatException:
+            game = None
+    resumed = game is not None
+    if resumed:
+        start, line_count = checkpoint.size, checkpoint.line_count
+    else:
+        board = CheckerBoardFactory.build_board_from_preset(preset)
+        game = CheckersGame(board) if statistics is None else InstrumentedCheckersGame(board, statistics)
+        start, line_count = 0, 0
+    intern_table = get_move_intern_table(preset.length, preset.height)
+    complete_text = data[start:complete_size].decode(errors='replace')
+    complete_line_count = line_count + complete_text.count('\n')
+    new_checkpoints = []
+
+    def moves():
+        yield from create_move_iterator_from_text(complete_text, intern_table, line_count)
+        # Every move of the complete lines has been played once the next one is asked for
+        new_checkpoints.append(ValidationCheckpoint(complete_size, content_hash(data[:complete_size]),
+                                                    complete_line_count, game.to_bytes()))
+        yield from create_move_iterator_from_text(data[complete_size:].decode(errors='replace'), intern_table,
+                                                  complete_line_count)
+
+    result = game.run_game(moves(), line_count + 1)
+    return result, new_checkpoints[0] if new_checkpoints else None, resumed
+
+
+class ResultCache:
+    '''
+    Validation results stored in an SQLite database, keyed by the hash of the game file's contents, so a file that
+    didn't change, wherever it is, is never validated twice. Every path also keeps the ValidationCheckpoint of its
+    last validation, so a file that only grew since is validated from there.
+    The games are played from preset: a cache opened with another preset than the one it was filled with is cleared.
+    Results and checkpoints are each limited to max_entries, the least recently used being evicted first.
+    hits, misses, resumed and evictions count what happened since the cache was opened.
+    Writes are committed every COMMIT_INTERVAL stores and on close.
+    '''
+    def __init__(self, path: str, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 preset: BoardPresetDataclass = CheckerBoardPresets.standard_8_by_8):
+        self.max_entries = max_entries
+        self.preset = preset
+        self.hits = 0
+        self.misses = 0
+        self.resumed = 0
+        self.evictions = 0
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+        preset_hash = content_hash(CheckersGame(CheckerBoardFactory.build_board_from_preset(preset)).to_bytes())
+        metadata = self.connection.execute('SELECT * FROM metadata').fetchone()
+        if metadata is None or tuple(metadata) != (CACHE_VERSION, preset_hash):
+            with self.connection:
+                # Caches of an earlier version may have other metadata columns
+                self.connection.execute('DROP TABLE metadata')
+                self.connection.execute(METADATA_TABLE)
+                for table in ('results', 'checkpoints'):
+                    self.connection.execute(f'DELETE FROM {table}')
+                self.connection.execute('INSERT INTO metadata VALUES (?, ?)', (CACHE_VERSION, preset_hash))
+        self._clock = max(self.connection.execute(f'SELECT COALESCE(MAX(last_used), 0) FROM {table}').fetchone()[0]
+                          for table in ('results', 'checkpoints'))
+        self._sizes = {table: self.connection.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                       for table in ('results', 'checkpoints')}
+        self._uncommitted_stores = 0
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        return {'cache_hits': self.hits, 'cache_misses': self.misses, 'cache_resumed': self.resumed,
+                'cache_evictions': self.evictions}
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    def lookup(self, data: bytes) -> Tuple[bytes, Optional[str]]:
+        '''
+        :return: the hash of data, and the cached result for it or None
+        '''
+        data_hash = content_hash(data)
+        row = self.connection.execute('SELECT result FROM results WHERE content_hash = ?', (data_hash,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return data_hash, None
+        self.hits += 1
+        self.connection.execute('UPDATE results SET last_used = ? WHERE content_hash = ?', (self._tick(), data_hash))
+        return data_hash, row[0]
+
+    def checkpoint(self, path: str) -> Optional[ValidationCheckpoint]:
+        row = self.connection.execute('SELECT size, content_hash, line_count, snapshot FROM checkpoints WHERE path = ?',
+                                      (os.path.abspath(path),)).fetchone()
+        return None if row is None else ValidationCheckpoint(*row)
+
+    def store(self, path: str, data_hash: bytes, result: str, checkpoint: Optional[ValidationCheckpoint],
+              resumed: bool = False):
+        '''
+        Caches the result of a file whose contents hash to data_hash, and the checkpoint of its path if there is one.
+        :param resumed: whether the validation resumed from the path's previous checkpoint
+        '''
+        self.resumed += resumed
+        path = os.path.abspath(path)
+        self._upsert('results', 'content_hash', data_hash, 'INSERT INTO results VALUES (?, ?, ?)',
+                     (data_hash, result, self._tick()))
+        if checkpoint is not None:
+            self._upsert('checkpoints', 'path', path, 'INSERT INTO checkpoints VALUES (?, ?, ?, ?, ?, ?)',
+                         (path, checkpoint.size, checkpoint.content_hash, checkpoint.line_count, checkpoint.snapshot,
+                          self._tick()))
+        self._uncommitted_stores += 1
+        if self._uncommitted_stores >= COMMIT_INTERVAL:
+            self.connection.commit()
+            self._uncommitted_stores = 0
+
+    def _upsert(self, table: str, key_column: str, key, insert: str, row: tuple):
+        if self.connection.execute(f'DELETE FROM {table} WHERE {key_column} = ?', (key,)).rowcount == 0:
+            self._sizes[table] += 1
+        self.connection.execute(insert, row)
+        excess = self._sizes[table] - self.max_entries
+        if excess > 0:
+            self.connection.execute(f'DELETE FROM {table} WHERE {key_column} IN '
+                                    f'(SELECT {key_column} FROM {table} ORDER BY last_used LIMIT ?)', (excess,))
+            self._sizes[table] -= excess
+            self.evictions += excess
@@ -0,0 +1,293 @@
+import argparse
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from board import CheckerBoardFactory, CheckerBoardPresets
+from checkers_enums import GameStatusEnum, MoveTypeEnum, TeamEnum
+from checkers_game import CheckersGame
+from checkersmove import CheckersMove
+from endgame_tablebase import EndgameTablebase
+from zobrist import splitmix64
+
+
+class SearchTimeoutException(Exception):
+    pass
+
+
+@dataclass
+class SearchResult:
+    best_move: Optional[CheckersMove]
+    score: int
+    depth: int
+    nodes: int
+    elapsed: float
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self):
+        return f'move {self.best_move} score {self.score} depth {self.depth} nodes {self.nodes} ' \
+               f'({self.nodes_per_second:.0f} nodes/s)'
+
+
+class TranspositionTable:
+    '''
+    Fixed-size transposition table: an entry lives in slot key % size and replaces whatever was stored there unless
+    the stored entry comes from a deeper search of another position.
+    '''
+    EXACT = 0
+    LOWER_BOUND = 1
+    UPPER_BOUND = 2
+
+    def __init__(self, size: int = 1 << 16):
+        self.size = size
+        self._entries: List[Optional[Tuple[int, int, int, int, Optional[CheckersMove]]]] = [None] * size
+
+    def get(self, key: int) -> Optional[Tuple[int, int, int, int, Optional[CheckersMove]]]:
+        entry = self._entries[key % self.size]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key: int, depth: int, score: int, flag: int, best_move: Optional[CheckersMove]):
+        slot = key % self.size
+        entry = self._entries[slot]
+        if entry is None or entry[0] == key or entry[1] <= depth:
+            self._entries[slot] = (key, depth, score, flag, best_move)
+
+    def clear(self):
+        self._entries = [None] * self.size
+
+
+class SearchEngine:
+    '''
+    Picks moves for the team whose turn it is with an iterative deepening alpha-beta (negamax) search.
+    Moves are tried in the order: transposition table move, killer moves, captures, other moves. The rules are the
+    ones CheckersGame enforces: legal_moves only offers captures when one is available, and a team that can continue
+    a multiple capture moves again, so such moves keep the score's perspective and don't use up search depth.
+    The game is searched in place with make_move/unmake_move and is left as it was found.
+    With an EndgameTablebase, positions it covers are scored from their perfect-play result instead of searched.
+    Tablebase wins score below the wins the search finds itself, so the engine still prefers a win it can see.
+    '''
+    WIN_SCORE = 100000
+    PIECE_SCORE = 100
+    ADVANCEMENT_SCORE = 1
+    MAX_PLY = 1000
+    TIME_CHECK_INTERVAL = 1024
+
+    def __init__(self, time_budget: float = 1.0, max_depth: int = 64, transposition_table_size: int = 1 << 16,
+                 tablebase: Optional[EndgameTablebase] = None):
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.transposition_table = TranspositionTable(transposition_table_size)
+        self.tablebase = tablebase
+        self.killer_moves: List[List[CheckersMove]] = []
+        self.nodes = 0
+        self._deadline = 0.0
+
+    def choose_move(self, game: CheckersGame) -> SearchResult:
+        start_time = time.perf_counter()
+        self._deadline = start_time + self.time_budget
+        self.nodes = 0
+        self.killer_moves = [[] for _ in range(self.max_depth + 1)]
+        legal_moves = game.legal_moves()
+        result = SearchResult(legal_moves[0] if legal_moves else None, 0, 0, 0, 0.0)
+        if len(legal_moves) > 1:
+            for depth in range(1, self.max_depth + 1):
+                try:
+                    score, best_move = self._search_root(game, depth)
+                except SearchTimeoutException:
+                    break
+                result = SearchResult(best_move, score, depth, self.nodes, 0.0)
+                if abs(score) >= self.WIN_SCORE - self.MAX_PLY:
+                    break
+        result.nodes = self.nodes
+        result.elapsed = time.perf_counter() - start_time
+        return result
+
+    def evaluate(self, game: CheckersGame) -> int:
+        '''
+        Static evaluation from the point of view of the team whose turn it is: material, then advancement.
+        '''
+        score = 0
+        height = game.board.height
+        for (_, row), team in game.board.active_pieces.items():
+            advancement = row if team is TeamEnum.white else height - 1 - row
+            value = self.PIECE_SCORE + self.ADVANCEMENT_SCORE * advancement
+            score += value if team is game.current_team else -value
+        return score
+
+    def _terminal_score(self, game: CheckersGame, ply: int) -> int:
+        scores = game.board.score
+        difference = scores[game.current_team] - scores[game.other_team]
+        if difference > 0:
+            return self.WIN_SCORE - ply
+        if difference < 0:
+            return ply - self.WIN_SCORE
+        return 0
+
+    def _tablebase_score(self, game: CheckersGame, ply: int) -> Optional[int]:
+        result = self.tablebase.probe(game)
+        if result is None:
+            return None
+        if result is GameStatusEnum.tie_game:
+            return 0
+        won = (result is GameStatusEnum.white_wins) == (game.current_team is TeamEnum.white)
+        score = self.WIN_SCORE - self.MAX_PLY // 2 - ply
+        return score if won else -score
+
+    def _score_to_table(self, score: int, ply: int) -> int:
+        '''
+        Win and loss scores count plies from the root; the table stores them counted from the position instead.
+        '''
+        if score >= self.WIN_SCORE - self.MAX_PLY:
+            return score + ply
+        if score <= self.MAX_PLY - self.WIN_SCORE:
+            return score - ply
+        return score
+
+    def _score_from_table(self, score: int, ply: int) -> int:
+        if score >= self.WIN_SCORE - self.MAX_PLY:
+            return score - ply
+        if score <= self.MAX_PLY - self.WIN_SCORE:
+            return score + ply
+        return score
+
+    @staticmethod
+    def position_key(game: CheckersGame) -> int:
+        key = game.board.zobrist_key
+        if game.multiple_capture_possibilities:
+            continuing_piece = next(iter(game.multiple_capture_possibilities)).source
+            key ^= splitmix64(game.board.zobrist_table.piece_key(continuing_piece, game.current_team))
+        return key
+
+    def _order_moves(self, moves: List[CheckersMove], table_move: Optional[CheckersMove], ply: int) -> List[CheckersMove]:
+        killers = self.killer_moves[ply] if ply < len(self.killer_moves) else []
+
+        def move_priority(move: CheckersMove) -> int:
+            if move == table_move:
+                return 0
+            if move in killers:
+                return 1
+            if CheckersGame.find_move_type(move) == MoveTypeEnum.capture:
+                return 2
+            return 3
+        return sorted(moves, key=move_priority)
+
+    def _record_killer(self, move: CheckersMove, ply: int):
+        if ply >= len(self.killer_moves) or CheckersGame.find_move_type(move) == MoveTypeEnum.capture:
+            return
+        killers = self.killer_moves[ply]
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[2:]
+
+    def _search_root(self, game: CheckersGame, depth: int) -> Tuple[int, CheckersMove]:
+        entry = self.transposition_table.get(self.position_key(game))
+        moves = self._order_moves(game.legal_moves(), entry[4] if entry else None, 0)
+        alpha, beta = -self.WIN_SCORE - 1, self.WIN_SCORE + 1
+        best_move = moves[0]
+        for move in moves:
+            score = self._search_child(game, move, depth, alpha, beta, 0)
+            if score > alpha:
+                alpha, best_move = score, move
+        self.transposition_table.store(self.position_key(game), depth, alpha, TranspositionTable.EXACT, best_move)
+        return alpha, best_move
+
+    def search_root_move(self, game: CheckersGame, move: CheckersMove, depth: int, alpha: Optional[int] = None,
+                         beta: Optional[int] = None) -> int:
+        '''
+        Scores one move of the team whose turn it is with a depth search, as the root search does, without a time
+        limit: lets the moves of the root be searched separately, by several engines.
+        :return: the move's score, exact if it is inside (alpha, beta), otherwise a bound on the side it fell
+        '''
+        if not self.killer_moves:
+            self.killer_moves = [[] for _ in range(self.max_depth + 1)]
+        self._deadline = float('inf')
+        alpha = -self.WIN_SCORE - 1 if alpha is None else alpha
+        beta = self.WIN_SCORE + 1 if beta is None else beta
+        return self._search_child(game, move, depth, alpha, beta, 0)
+
+    def _search_child(self, game: CheckersGame, move: CheckersMove, depth: int, alpha: int, beta: int,
+                      ply: int) -> int:
+        team = game.current_team
+        game.make_move(move)
+        try:
+            if game.current_team is team:
+                return self._negamax(game, depth, alpha, beta, ply + 1)
+            return -self._negamax(game, depth - 1, -beta, -alpha, ply + 1)
+        finally:
+            game.unmake_move()
+
+    def _negamax(self, game: CheckersGame, depth: int, alpha: int, beta: int, ply: int) -> int:
+        self.nodes += 1
+        if self.nodes % self.TIME_CHECK_INTERVAL == 0 and time.perf_counter() > self._deadline:
+            raise SearchTimeoutException()
+        moves = game.legal_moves()
+        if not moves:
+            return self._terminal_score(game, ply)
+        if self.tablebase is not None:
+            score = self._tablebase_score(game, ply)
+            if score is not None:
+                return score
+        if depth <= 0:
+            return self.evaluate(game)
+        key = self.position_key(game)
+        entry = self.transposition_table.get(key)
+        table_move = None
+        if entry is not None:
+            _, entry_depth, entry_score, entry_flag, table_move = entry
+            entry_score = self._score_from_table(entry_score, ply)
+            if entry_depth >= depth:
+                if entry_flag == TranspositionTable.EXACT:
+                    return entry_score
+                if entry_flag == TranspositionTable.LOWER_BOUND:
+                    alpha = max(alpha, entry_score)
+                elif entry_flag == TranspositionTable.UPPER_BOUND:
+                    beta = min(beta, entry_score)
+                if alpha >= beta:
+                    return entry_score
+        original_alpha = alpha
+        best_score = -self.WIN_SCORE - 1
+        best_move = None
+        for move in self._order_moves(moves, table_move, ply):
+            score = self._search_child(game, move, depth, alpha, beta, ply)
+            if score > best_score:
+                best_score, best_move = score, move
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                self._record_killer(move, ply)
+                break
+        if best_score <= original_alpha:
+            flag = TranspositionTable.UPPER_BOUND
+        elif best_score >= beta:
+            flag = TranspositionTable.LOWER_BOUND
+        else:
+            flag = TranspositionTable.EXACT
+        self.transposition_table.store(key, depth, self._score_to_table(best_score, ply), flag, best_move)
+        return best_score
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Let the search engine play a game against itself')
+    parser.add_argument('--time-budget', type=float, default=0.5, help='seconds per move')
+    parser.add_argument('--max-depth', type=int, default=64)
+    parser.add_argument('--max-moves', type=int, default=200)
+    parser.add_argument('--tablebase', type=str, default=None, help='endgame tablebase file to probe')
+    args = parser.parse_args()
+    game = CheckersGame(CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8))
+    tablebase = None if args.tablebase is None else EndgameTablebase(args.tablebase)
+    engine = SearchEngine(args.time_budget, args.max_depth, tablebase=tablebase)
+    for _ in range(args.max_moves):
+        result = engine.choose_move(game)
+        if result.best_move is None:
+            break
+        print(f'{game.current_team.name}: {result}', flush=True)
+        game.make_move(result.best_move)
+    print(game.end_game().value)
+
+
+if __name__ == '__main__':
+    main()
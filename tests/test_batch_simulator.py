@@ -0,0 +1,109 @@
+import unittest
+
+import numpy as np
+
+from batch_simulator import BatchCheckersSimulator
+from board import CheckerBoardFactory, CheckerBoardPresets
+from checkers_enums import GameStatusEnum
+from checkers_game import CheckersGame
+from checkersmove import CheckersMove, IllegalMoveException
+from move_iterators import create_move_iterator_from_move_file
+from tests.board_presets_for_tests import CheckerBoardTestPresets
+
+
+class TestBatchCheckersSimulator(unittest.TestCase):
+    def assert_same_as_game(self, simulator: BatchCheckersSimulator, index: int, test_game: CheckersGame):
+        self.assertEqual(simulator.active_pieces(index), test_game.board.active_pieces)
+        self.assertEqual(simulator.statuses()[index], test_game.game_status)
+        self.assertEqual(simulator.current_team[index], test_game.current_team.value)
+
+    def test_random_rollouts_match_checkers_game(self):
+        for preset in (CheckerBoardPresets.standard_8_by_8, CheckerBoardTestPresets.test_capture_board):
+            simulator = BatchCheckersSimulator(preset, 32)
+            history = simulator.play_random_moves(np.random.default_rng(5), 200)
+            for index in range(simulator.batch_size):
+                test_game = CheckersGame(CheckerBoardFactory.build_board_from_preset(preset))
+                for move in history[index]:
+                    if move[0] < 0:
+                        break
+                    test_game.make_move(CheckersMove(move.tolist()))
+                test_game.end_game()
+                self.assertEqual(test_game.legal_moves(), [])
+                self.assert_same_as_game(simulator, index, test_game)
+
+    def test_random_moves_are_legal_when_every_draw_is_zero(self):
+        class ZeroRandom:
+            @staticmethod
+            def random(shape, dtype=np.float64):
+                return np.zeros(shape, dtype)
+
+        preset = CheckerBoardPresets.standard_8_by_8
+        simulator = BatchCheckersSimulator(preset, 4)
+        history = simulator.play_random_moves(ZeroRandom(), 10)
+        for index in range(simulator.batch_size):
+            test_game = CheckersGame(CheckerBoardFactory.build_board_from_preset(preset))
+            for move in history[index]:
+                test_game.make_move(CheckersMove(move.tolist()))
+            test_game.end_game()
+            self.assert_same_as_game(simulator, index, test_game)
+
+    def test_legal_move_mask_matches_legal_moves(self):
+        simulator = BatchCheckersSimulator(CheckerBoardPresets.standard_8_by_8, 16)
+        rng = np.random.default_rng(8)
+        games = [CheckersGame(CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8))
+                 for _ in range(simulator.batch_size)]
+        for _ in range(60):
+            mask = simulator.legal_move_mask().reshape(simulator.batch_size, -1)
+            for index, test_game in enumerate(games):
+                flat_indices = np.flatnonzero(mask[index])
+                mask_moves = simulator.moves_from_mask_indices(np.full(flat_indices.size, index), flat_indices)
+                self.assertEqual(set(CheckersMove(move.tolist()) for move in mask_moves), set(test_game.legal_moves()))
+            has_moves = mask.any(axis=1)
+            if not has_moves.any():
+                break
+            scores = np.where(mask, rng.random(mask.shape), -1.0)
+            moves = simulator.moves_from_mask_indices(np.arange(simulator.batch_size), scores.argmax(axis=1))
+            simulator.apply_moves(moves, has_moves)
+            for index, test_game in enumerate(games):
+                if has_moves[index]:
+                    test_game.make_move(CheckersMove(moves[index].tolist()))
+
+    def test_arbitrary_moves_match_checkers_game(self):
+        rng = np.random.default_rng(13)
+        preset = CheckerBoardPresets.standard_8_by_8
+        simulator = BatchCheckersSimulator(preset, 64)
+        games = [CheckersGame(CheckerBoardFactory.build_board_from_preset(preset)) for _ in range(simulator.batch_size)]
+        for _ in range(40):
+            legal = simulator.legal_move_mask().reshape(simulator.batch_size, -1)
+            scores = np.where(legal, rng.random(legal.shape), -1.0)
+            moves = simulator.moves_from_mask_indices(np.arange(simulator.batch_size), scores.argmax(axis=1))
+            noisy = rng.random(simulator.batch_size) < 0.1
+            moves[noisy] = rng.integers(-1, 9, size=(int(noisy.sum()), 4))
+            accepted = simulator.apply_moves(moves)
+            for index, test_game in enumerate(games):
+                if test_game.game_status is not GameStatusEnum.game_continues:
+                    continue
+                try:
+                    test_game.make_move(CheckersMove(moves[index].tolist()))
+                    self.assertTrue(accepted[index])
+                except IllegalMoveException:
+                    self.assertFalse(accepted[index])
+                    test_game.game_status = GameStatusEnum.illegal_move
+                self.assert_same_as_game(simulator, index, test_game)
+
+    def test_game_files(self):
+        paths = ['games/white.txt', 'games/black.txt', 'games/incomplete.txt', 'games/illegal_move.txt']
+        move_lists = [[[*move.source, *move.target] for move in create_move_iterator_from_move_file(path)]
+                      for path in paths]
+        simulator = BatchCheckersSimulator(CheckerBoardPresets.standard_8_by_8, len(paths))
+        for move_number in range(max(len(move_list) for move_list in move_lists)):
+            active = np.array([move_number < len(move_list) for move_list in move_lists])
+            moves = np.array([move_list[move_number] if move_number < len(move_list) else [0, 0, 0, 0]
+                              for move_list in move_lists])
+            simulator.apply_moves(moves, active)
+        self.assertEqual(simulator.end_games(), [GameStatusEnum.white_wins, GameStatusEnum.black_wins,
+                                                 GameStatusEnum.incomplete_game, GameStatusEnum.illegal_move])
+
+
+if __name__ == '__main__':
+    unittest.main()
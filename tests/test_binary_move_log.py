@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+
+from binary_move_log import convert_move_file_to_binary_log, create_move_iterator_from_binary_log, \
+    is_binary_move_log, write_binary_move_log, MoveLogFormatException
+from board import CheckerBoardFactory, CheckerBoardPresets
+from checkers_game import CheckersGame
+from checkersmove import CheckersMove, IllegalMoveException
+from move_iterators import create_move_iterator_from_move_file
+
+
+class TestBinaryMoveLog(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.binary_path = os.path.join(self.temporary_directory.name, 'game.ckml')
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def test_round_trip_of_game_files(self):
+        for name in sorted(os.listdir('games')):
+            path = os.path.join('games', name)
+            self.assertEqual(convert_move_file_to_binary_log(path, self.binary_path),
+                             len(list(create_move_iterator_from_move_file(path))))
+            self.assertTrue(is_binary_move_log(self.binary_path))
+            self.assertFalse(is_binary_move_log(path))
+            self.assertEqual(list(create_move_iterator_from_binary_log(self.binary_path)),
+                             list(create_move_iterator_from_move_file(path)))
+            results = []
+            for move_iterator in (create_move_iterator_from_move_file(path),
+                                  create_move_iterator_from_binary_log(self.binary_path)):
+                test_game = CheckersGame(CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8))
+                results.append(test_game.run_game(move_iterator))
+            self.assertEqual(results[0], results[1])
+
+    def test_moves_are_interned(self):
+        write_binary_move_log(self.binary_path, [CheckersMove([1, 2, 2, 3]), CheckersMove([1, 2, 2, 3])])
+        first_move, second_move = create_move_iterator_from_binary_log(self.binary_path)
+        self.assertIs(first_move, second_move)
+
+    def test_wide_coordinates(self):
+        moves = [CheckersMove([0, 0, 2, 2]), CheckersMove([-1, 300, 5, 7]), CheckersMove([1, 2, 70000, 3])]
+        for move_count in (2, 3):
+            write_binary_move_log(self.binary_path, moves[:move_count], 8, 400)
+            self.assertEqual(list(create_move_iterator_from_binary_log(self.binary_path)), moves[:move_count])
+
+    def test_malformed_line(self):
+        text_path = os.path.join(self.temporary_directory.name, 'game.txt')
+        with open(text_path, 'w') as file:
+            file.write('1,2,2,3\n5,5,4\n6,5,7,4\n')
+        self.assertEqual(convert_move_file_to_binary_log(text_path, self.binary_path), 1)
+        move_iterator = create_move_iterator_from_binary_log(self.binary_path)
+        self.assertEqual(next(move_iterator), CheckersMove([1, 2, 2, 3]))
+        self.assertRaises(IllegalMoveException, next, move_iterator)
+
+    def test_malformed_line_results_match_text(self):
+        text_path = os.path.join(self.temporary_directory.name, 'game.txt')
+        for contents in (b'1,2,2,3\n5,5,4\n6,5,7,4\n', b'x\n', b'1,2,2,3\n5,\xff,4,4\n'):
+            with open(text_path, 'wb') as file:
+                file.write(contents)
+            convert_move_file_to_binary_log(text_path, self.binary_path)
+            results = []
+            for move_iterator in (create_move_iterator_from_move_file(text_path),
+                                  create_move_iterator_from_binary_log(self.binary_path)):
+                test_game = CheckersGame(CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8))
+                results.append(test_game.run_game(move_iterator))
+            self.assertEqual(results[1], results[0])
+        self.assertEqual(results[0], 'line 2 illegal move: 5,\ufffd,4,4')
+
+    def test_empty_and_invalid_logs(self):
+        write_binary_move_log(self.binary_path, [])
+        self.assertEqual(list(create_move_iterator_from_binary_log(self.binary_path)), [])
+        with open(self.binary_path, 'wb') as file:
+            file.write(b'1,2,2,3\n4,5,3,4\n')
+        self.assertRaises(MoveLogFormatException, list, create_move_iterator_from_binary_log(self.binary_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
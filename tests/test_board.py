@@ -1,7 +1,9 @@
 import unittest
 
 from board import Board, CheckerBoardFactory, CheckerBoardPresets, MissingGamePieceException, \
-    BoardTileOccupiedException, OutOfBoardException, BoardPresetDataclass
+    BoardTileOccupiedException, OutOfBoardException, BoardPresetDataclass, BitboardCheckerBoard, CheckerBoard, \
+    SnapshotFormatException, SparseCheckerBoard
+from board_geometry import get_board_geometry
 from checkers_enums import TeamEnum
 from checkersmove import CheckersMove
 from game_pieces import CheckersGamePiece
@@ -79,5 +81,135 @@ class TestBoardMoves(unittest.TestCase):
         self.assertRaises(OutOfBoardException, test_board.move_piece, CheckersMove([4, 11, 11, 11]).source,
                           CheckersMove([4, 11, 11, 11]).target)
 
+
+class TestBitboardCheckerBoard(unittest.TestCase):
+    board_class = BitboardCheckerBoard
+
+    def build_boards(self, preset: BoardPresetDataclass = CheckerBoardPresets.standard_8_by_8):
+        return CheckerBoardFactory.build_board_from_preset(preset), \
+               CheckerBoardFactory.build_board_from_preset(preset, self.board_class)
+
+    def test_factory_builds_bitboard(self):
+        _, test_board = self.build_boards()
+        self.assertIsInstance(test_board, self.board_class)
+        self.assertEqual(test_board.score, {TeamEnum.white: 12, TeamEnum.black: 12})
+
+    def test_matches_list_board(self):
+        list_board, bit_board = self.build_boards()
+        self.assertEqual(list_board.active_pieces, bit_board.active_pieces)
+        self.assertEqual(str(list_board), str(bit_board))
+        for test_board in (list_board, bit_board):
+            test_board.move_piece((1, 2), (2, 3))
+            test_board.move_piece((4, 5), (3, 4))
+            test_board.capture_piece((2, 3), (4, 5), (3, 4))
+        self.assertEqual(list_board.active_pieces, bit_board.active_pieces)
+        self.assertEqual(list_board.score, bit_board.score)
+        self.assertEqual(str(list_board), str(bit_board))
+
+    def test_piece_masks_follow_mutations(self):
+        _, test_board = self.build_boards()
+        test_board.move_piece((1, 2), (2, 3))
+        test_board.move_piece((4, 5), (3, 4))
+        test_board.capture_piece((2, 3), (4, 5), (3, 4))
+        test_board.set_up_pieces([], [(3, 4)])
+        self.assertIs(test_board.active_pieces, test_board.active_pieces)
+        white_mask, black_mask = test_board.piece_masks()
+        self.assertEqual(test_board.active_pieces,
+                         {**dict.fromkeys(test_board._iterate_mask(white_mask), TeamEnum.white),
+                          **dict.fromkeys(test_board._iterate_mask(black_mask), TeamEnum.black)})
+        self.assertEqual(test_board.score, {TeamEnum.white: 12, TeamEnum.black: 12})
+        self.assertEqual(test_board.zobrist_key,
+                         test_board.zobrist_table.compute_key(test_board.active_pieces, TeamEnum.white))
+
+    def test_getitem(self):
+        _, test_board = self.build_boards()
+        self.assertIsInstance(test_board[1, 0], CheckersGamePiece)
+        self.assertEqual(test_board[1, 0].team, TeamEnum.white)
+        self.assertEqual(test_board[0, 7].team, TeamEnum.black)
+        self.assertIsNone(test_board[1, 1])
+        self.assertIsNone(test_board[8, 0])
+        self.assertIsNone(test_board[-1, 0])
+
+    def test_board_exceptions(self):
+        _, test_board = self.build_boards()
+        self.assertRaises(MissingGamePieceException, test_board.move_piece, (1, 1), (1, 0))
+        self.assertRaises(BoardTileOccupiedException, test_board.move_piece, (1, 0), (3, 0))
+        for target in [(8, 0), (-1, 0), (0, 8), (0, -1), (0, 11)]:
+            self.assertRaises(OutOfBoardException, test_board.move_piece, (1, 0), target)
+        self.assertRaises(MissingGamePieceException, test_board.capture_piece, (1, 0), (1, 1), (0, 4))
+        self.assertRaises(MissingGamePieceException, test_board.remove_piece, (0, 4))
+
+    def test_board_dimensions(self):
+        _, test_board = self.build_boards(BoardPresetDataclass(8, 100, [(0, 0)], []))
+        test_board.move_piece((0, 0), (2, 2))
+        test_board.move_piece((2, 2), (4, 11))
+        self.assertEqual(test_board.active_pieces, {(4, 11): TeamEnum.white})
+        self.assertRaises(OutOfBoardException, test_board.move_piece, (4, 11), (11, 11))
+
+
+class TestSparseCheckerBoard(TestBitboardCheckerBoard):
+    board_class = SparseCheckerBoard
+
+    def test_large_board(self):
+        test_board = CheckerBoardFactory.build_board_from_preset(
+            BoardPresetDataclass(1000, 1000, [(0, 0), (500, 500)], [(501, 501), (999, 999)]), SparseCheckerBoard)
+        self.assertFalse(hasattr(test_board, 'board'))
+        test_board.capture_piece((500, 500), (502, 502), (501, 501))
+        self.assertEqual(test_board.active_pieces, {(0, 0): TeamEnum.white, (502, 502): TeamEnum.white,
+                                                    (999, 999): TeamEnum.black})
+        self.assertEqual(test_board.score, {TeamEnum.white: 2, TeamEnum.black: 1})
+        rows = str(test_board).split('\n')
+        self.assertEqual(len(rows), 1001)
+        self.assertEqual(rows[0], 'b' + '_' * 999)
+        self.assertEqual(rows[497], '_' * 497 + 'w' + '_' * 502)
+        self.assertEqual(rows[999], '_' * 999 + 'w')
+
+
+class TestBoardSnapshots(unittest.TestCase):
+    def test_round_trip(self):
+        preset = BoardPresetDataclass(5, 9, [(0, 0), (4, 1), (2, 8)], [(1, 1), (3, 7)])
+        for source_class in (CheckerBoard, BitboardCheckerBoard, SparseCheckerBoard):
+            for target_class in (CheckerBoard, BitboardCheckerBoard, SparseCheckerBoard):
+                test_board = CheckerBoardFactory.build_board_from_preset(preset, source_class)
+                test_board.toggle_side_to_move()
+                restored_board = target_class.from_bytes(test_board.to_bytes())
+                self.assertIsInstance(restored_board, target_class)
+                self.assertEqual((restored_board.length, restored_board.height), (5, 9))
+                self.assertEqual(restored_board.active_pieces, test_board.active_pieces)
+                self.assertEqual(restored_board.score, test_board.score)
+                self.assertEqual(restored_board.zobrist_key, test_board.zobrist_key)
+                self.assertEqual(restored_board.to_bytes(), test_board.to_bytes())
+
+    def test_size(self):
+        test_board = CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8)
+        self.assertEqual(len(test_board.to_bytes()), 6 + 2 * 8)
+
+    def test_malformed_snapshots(self):
+        snapshot = CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8).to_bytes()
+        self.assertRaises(SnapshotFormatException, CheckerBoard.from_bytes, snapshot[:3])
+        self.assertRaises(SnapshotFormatException, CheckerBoard.from_bytes, snapshot[:-1])
+        self.assertRaises(SnapshotFormatException, CheckerBoard.from_bytes, bytes([2]) + snapshot[1:])
+        self.assertRaises(SnapshotFormatException, CheckerBoard.from_bytes, snapshot[:6] + b'\x01' * 16)
+
+
+class TestBoardGeometry(unittest.TestCase):
+    def test_tables_are_shared(self):
+        self.assertIs(get_board_geometry(8, 8), get_board_geometry(8, 8))
+        self.assertIsNot(get_board_geometry(8, 8), get_board_geometry(8, 100))
+
+    def test_steps(self):
+        geometry = get_board_geometry(8, 8)
+        self.assertEqual(geometry.steps((1, 2), TeamEnum.white), (CheckersMove([1, 2, 2, 3]), CheckersMove([1, 2, 0, 3])))
+        self.assertEqual(geometry.steps((0, 5), TeamEnum.black), (CheckersMove([0, 5, 1, 4]),))
+        self.assertEqual(geometry.steps((3, 7), TeamEnum.white), ())
+
+    def test_jumps(self):
+        geometry = get_board_geometry(8, 8)
+        self.assertEqual(geometry.jumps((1, 2), TeamEnum.white), ((CheckersMove([1, 2, 3, 4]), (2, 3)),))
+        self.assertEqual(geometry.jumps((4, 5), TeamEnum.black),
+                         ((CheckersMove([4, 5, 6, 3]), (5, 4)), (CheckersMove([4, 5, 2, 3]), (3, 4))))
+        self.assertEqual(geometry.jumps((4, 1), TeamEnum.black), ())
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,37 @@
+import random
+import unittest
+
+from board import CheckerBoardFactory, CheckerBoardPresets
+from capture_index import CaptureIndex
+from checkers_game import CheckersGame
+from checkersmove import CheckersMove
+
+
+class TestCaptureIndex(unittest.TestCase):
+    def test_add_and_discard(self):
+        capture_index = CaptureIndex()
+        capture_index.add(CheckersMove([0, 0, 2, 2]), (1, 1))
+        capture_index.add(CheckersMove([0, 0, 2, 2]), (1, 1))
+        capture_index.add(CheckersMove([2, 2, 4, 4]), (3, 3))
+        self.assertEqual(len(capture_index), 2)
+        self.assertIn(CheckersMove([0, 0, 2, 2]), capture_index)
+        capture_index.discard_tile((1, 1))
+        self.assertNotIn(CheckersMove([0, 0, 2, 2]), capture_index)
+        self.assertEqual(list(capture_index), [CheckersMove([2, 2, 4, 4])])
+        capture_index.discard_tile((1, 1))
+        capture_index.discard_tile((4, 4))
+        self.assertFalse(capture_index)
+
+    def test_index_matches_full_scan(self):
+        rng = random.Random(7)
+        for _ in range(20):
+            test_game = CheckersGame(CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8))
+            while test_game.legal_moves():
+                test_game.make_move(rng.choice(test_game.legal_moves()))
+                scanned_game = CheckersGame(test_game.board)
+                for team, capture_index in test_game.possible_capture_moves.items():
+                    self.assertEqual(set(capture_index), set(scanned_game.possible_capture_moves[team]))
+
+
+if __name__ == '__main__':
+    unittest.main()
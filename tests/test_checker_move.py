@@ -3,7 +3,7 @@ import unittest
 from board import CheckerBoardFactory, CheckerBoardPresets
 from checkers_enums import TeamEnum
 from checkers_game import CheckersGame
-from checkersmove import CheckersMove, IllegalMoveException
+from checkersmove import CheckersMove, IllegalMoveException, MoveInternTable, get_move_intern_table
 from tests.board_presets_for_tests import CheckerBoardTestPresets
 
 
@@ -20,6 +20,27 @@ class TestCheckerMove(unittest.TestCase):
     def test_too_little_arguments(self):
         self.assertRaises(IllegalMoveException, CheckersMove, [3, 4, 5])
 
+    def test_equality_and_hash(self):
+        move = CheckersMove([1, 2, 2, 3])
+        self.assertEqual(move, CheckersMove(['1', '2', '2', '3']))
+        self.assertEqual(move, ((1, 2), (2, 3)))
+        self.assertNotEqual(move, CheckersMove([1, 2, 0, 3]))
+        self.assertEqual(hash(move), hash(CheckersMove([1, 2, 2, 3])))
+        self.assertIn(((1, 2), (2, 3)), {move})
+        self.assertIn(move, {((1, 2), (2, 3))})
+
+    def test_intern_table(self):
+        intern_table = MoveInternTable(8, 8)
+        move = intern_table.get([1, 2, 2, 3])
+        self.assertIs(intern_table.get([1, 2, 2, 3]), move)
+        self.assertIs(intern_table.get(['1', '2', '2', '3']), move)
+        self.assertEqual(intern_table.get([1, 2, 2, 9]), CheckersMove([1, 2, 2, 9]))
+        self.assertEqual(intern_table.get([0, 0, 7, 7]), CheckersMove([0, 0, 7, 7]))
+        self.assertEqual(len(intern_table), 1)
+        self.assertRaises(ValueError, intern_table.get, ['a', 2, 3, 4])
+        self.assertRaises(IllegalMoveException, intern_table.get, [1, 2, 3])
+        self.assertIs(get_move_intern_table(8, 8), get_move_intern_table(8, 8))
+
     def test_check_if_there_is_a_piece_to_capture(self):
         test_board = CheckerBoardFactory.build_board_from_preset(CheckerBoardTestPresets.multi_capture_test_board_8_by_8)
         test_game = CheckersGame(test_board)
@@ -1,10 +1,13 @@
+import random
 import unittest
 
 from checkers_game import CheckersGame
 from checkersmove import CheckersMove, IllegalMoveException
-from move_iterators import create_move_iterator_from_list_of_lists, create_move_iterator_from_move_file
-from board import CheckerBoardPresets, CheckerBoardFactory, BoardPresetDataclass
-from checkers_enums import TeamEnum
+from move_iterators import create_move_iterator_from_list_of_lists, create_move_iterator_from_move_file, \
+    create_move_iterator_from_text
+from board import CheckerBoardPresets, CheckerBoardFactory, BoardPresetDataclass, BitboardCheckerBoard, \
+    CheckerBoard, SnapshotFormatException, SparseCheckerBoard
+from checkers_enums import GameStatusEnum, TeamEnum
 from game_pieces import CheckersGamePiece
 from tests.board_presets_for_tests import CheckerBoardTestPresets
 
@@ -130,6 +133,16 @@ class TestCaptures(unittest.TestCase):
         self.assertEqual(test_game2.current_team, TeamEnum.white)
         test_game2.make_move(CheckersMove([4, 4, 6, 6]))
 
+    def test_team_switches_after_multi_capture_with_two_continuations(self):
+        test_game = CheckersGame(CheckerBoardFactory.build_board_from_preset(
+            BoardPresetDataclass(8, 8, [(2, 2)], [(3, 3), (3, 5), (5, 5), (7, 7)])))
+        test_game.make_move(CheckersMove([2, 2, 4, 4]))
+        self.assertEqual(test_game.current_team, TeamEnum.white)
+        self.assertEqual(len(test_game.multiple_capture_possibilities), 2)
+        test_game.make_move(CheckersMove([4, 4, 6, 6]))
+        self.assertEqual(test_game.current_team, TeamEnum.black)
+        self.assertFalse(test_game.multiple_capture_possibilities)
+
     def test_extensive_possible_captures(self):
         test_board = CheckerBoardFactory.build_board_from_preset(
             BoardPresetDataclass(8, 8, [(7, 2), (6, 3), (4, 3), (3, 2), (2, 3)], [(5, 4), (4, 5), (5, 6), (6, 5)]))
@@ -201,6 +214,179 @@ class TestFullGames(unittest.TestCase):
             test_game.make_move(move)
         self.assertEqual(test_game.end_game().value, 'incomplete game')
 
+    def test_games_on_other_boards(self):
+        for path, result in [('games/white.txt', 'first'), ('games/black.txt', 'second'),
+                             ('games/incomplete.txt', 'incomplete game')]:
+            for board_class in (BitboardCheckerBoard, SparseCheckerBoard):
+                test_game = CheckersGame(
+                    CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8, board_class))
+                self.assertEqual(test_game.run_game(create_move_iterator_from_move_file(path)), result)
+
+    def test_malformed_first_line(self):
+        test_game = CheckersGame(CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8))
+        self.assertEqual(test_game.run_game(create_move_iterator_from_text('x\n1,2,2,3\n')), 'line 1 illegal move: x')
+        self.assertEqual(test_game.game_status, GameStatusEnum.illegal_move)
+
+    def test_sparse_board_matches_list_board(self):
+        rng = random.Random(7)
+        preset = BoardPresetDataclass(60, 60, [(i, j) for i in range(20, 40) for j in range(25, 28) if (i + j) % 2],
+                                      [(i, j) for i in range(20, 40) for j in range(31, 34) if (i + j) % 2])
+        list_game = CheckersGame(CheckerBoardFactory.build_board_from_preset(preset))
+        sparse_game = CheckersGame(CheckerBoardFactory.build_board_from_preset(preset, SparseCheckerBoard))
+        while list_game.legal_moves():
+            self.assertEqual(sparse_game.legal_moves(), list_game.legal_moves())
+            move = rng.choice(list_game.legal_moves())
+            list_game.make_move(move)
+            sparse_game.make_move(move)
+        self.assertEqual(str(sparse_game.board), str(list_game.board))
+        self.assertEqual(sparse_game.end_game(), list_game.end_game())
+
+
+class TestLegalMoves(unittest.TestCase):
+    def test_opening_moves(self):
+        test_game = CheckersGame(CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8))
+        legal_moves = test_game.legal_moves()
+        self.assertEqual(len(legal_moves), 7)
+        self.assertIn(CheckersMove([1, 2, 0, 3]), legal_moves)
+        self.assertIn(CheckersMove([7, 2, 6, 3]), legal_moves)
+
+    def test_capture_is_mandatory(self):
+        test_game = CheckersGame(CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8))
+        for move in create_move_iterator_from_list_of_lists([[1, 2, 2, 3], [0, 5, 1, 4]]):
+            test_game.make_move(move)
+        self.assertEqual(test_game.legal_moves(), [CheckersMove([2, 3, 0, 5])])
+
+    def test_multi_capture_continuation(self):
+        test_game = CheckersGame(
+            CheckerBoardFactory.build_board_from_preset(CheckerBoardTestPresets.multi_capture_test_board_8_by_8))
+        self.assertEqual(test_game.legal_moves(), [CheckersMove([0, 0, 2, 2])])
+        test_game.make_move(CheckersMove([0, 0, 2, 2]))
+        self.assertEqual(test_game.legal_moves(), [CheckersMove([2, 2, 4, 4])])
+
+    def test_blocked_team_has_no_moves(self):
+        test_game = CheckersGame(CheckerBoardFactory.build_board_from_preset(CheckerBoardTestPresets.simple_tie_test_board))
+        self.assertEqual(test_game.legal_moves(), [])
+
+    def test_game_moves_are_listed(self):
+        for path in ['games/white.txt', 'games/black.txt', 'games/incomplete.txt']:
+            test_game = CheckersGame(CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8))
+            for move in create_move_iterator_from_move_file(path):
+                self.assertIn(move, test_game.legal_moves())
+                test_game.make_move(move)
+            self.assertEqual(test_game.legal_moves() == [], test_game.end_game().value != 'incomplete game')
+
+
+class TestUnmakeMove(unittest.TestCase):
+    @staticmethod
+    def game_state(test_game: CheckersGame):
+        return (dict(test_game.board.active_pieces), test_game.board.zobrist_key, test_game.current_team,
+                test_game.other_team, test_game.game_status, dict(test_game.multiple_capture_possibilities),
+                {team: set(moves) for team, moves in test_game.possible_capture_moves.items()})
+
+    def test_unmake_restores_every_position(self):
+        rng = random.Random(11)
+        for _ in range(10):
+            test_game = CheckersGame(CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8))
+            states = []
+            while test_game.legal_moves():
+                states.append(self.game_state(test_game))
+                test_game.make_move(rng.choice(test_game.legal_moves()))
+            while states:
+                test_game.unmake_move()
+                self.assertEqual(self.game_state(test_game), states.pop())
+
+    def test_unmake_multi_capture(self):
+        test_game = CheckersGame(
+            CheckerBoardFactory.build_board_from_preset(CheckerBoardTestPresets.multi_capture_test_board_8_by_8))
+        test_game.make_move(CheckersMove([0, 0, 2, 2]))
+        test_game.make_move(CheckersMove([2, 2, 4, 4]))
+        self.assertEqual(test_game.unmake_move(), CheckersMove([2, 2, 4, 4]))
+        self.assertEqual(test_game.current_team, TeamEnum.white)
+        self.assertEqual(test_game.legal_moves(), [CheckersMove([2, 2, 4, 4])])
+        self.assertEqual(test_game.unmake_move(), CheckersMove([0, 0, 2, 2]))
+        self.assertEqual(test_game.board.active_pieces,
+                         {(0, 0): TeamEnum.white, (1, 1): TeamEnum.black, (3, 3): TeamEnum.black})
+
+    def test_unmake_without_moves(self):
+        test_game = CheckersGame(CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8))
+        self.assertRaises(IllegalMoveException, test_game.unmake_move)
+
+
+class TestMovablePieces(unittest.TestCase):
+    @staticmethod
+    def scanned_movable_pieces(test_game: CheckersGame):
+        return {team: {coordinates for coordinates, piece_team in test_game.board.active_pieces.items()
+                       if piece_team is team and test_game.piece_can_move(coordinates, team)}
+                for team in (TeamEnum.white, TeamEnum.black)}
+
+    def test_tracking_matches_scan(self):
+        rng = random.Random(3)
+        for board_class in (CheckerBoard, BitboardCheckerBoard, SparseCheckerBoard):
+            for _ in range(10):
+                test_game = CheckersGame(
+                    CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8, board_class))
+                test_game.current_team_can_move()
+                while test_game.legal_moves():
+                    if test_game.undo_stack and rng.random() < 0.2:
+                        test_game.unmake_move()
+                    else:
+                        test_game.make_move(rng.choice(test_game.legal_moves()))
+                    self.assertEqual(test_game.movable_pieces, self.scanned_movable_pieces(test_game))
+                    self.assertEqual(test_game.board.score[TeamEnum.white] + test_game.board.score[TeamEnum.black],
+                                     len(test_game.board.active_pieces))
+                self.assertFalse(test_game.current_team_can_move())
+                self.assertNotEqual(test_game.end_game().value, 'incomplete game')
+
+    def test_board_changed_outside_of_moves(self):
+        test_game = CheckersGame(CheckerBoardFactory.build_board_from_preset(CheckerBoardTestPresets.simple_tie_test_board))
+        self.assertFalse(test_game.current_team_can_move())
+        test_game.board.set_up_pieces([(5, 5)], [])
+        self.assertTrue(test_game.current_team_can_move())
+        test_game.switch_team_turn()
+        self.assertFalse(test_game.current_team_can_move())
+
+
+class TestGameSnapshots(unittest.TestCase):
+    @staticmethod
+    def game_state(test_game: CheckersGame):
+        return (test_game.board.active_pieces, test_game.board.zobrist_key, test_game.current_team,
+                test_game.other_team, test_game.game_status, list(test_game.multiple_capture_possibilities),
+                {team: list(moves) for team, moves in test_game.possible_capture_moves.items()})
+
+    def test_round_trip_every_position(self):
+        rng = random.Random(5)
+        for board_class in (CheckerBoard, BitboardCheckerBoard):
+            test_game = CheckersGame(CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8))
+            while test_game.legal_moves():
+                restored_game = CheckersGame.from_bytes(test_game.to_bytes(), board_class)
+                self.assertIsInstance(restored_game.board, board_class)
+                self.assertEqual(self.game_state(restored_game), self.game_state(test_game))
+                self.assertCountEqual(restored_game.legal_moves(), test_game.legal_moves())
+                self.assertEqual(restored_game.current_team_can_move(), test_game.current_team_can_move())
+                test_game.make_move(rng.choice(test_game.legal_moves()))
+            test_game.end_game()
+            restored_game = CheckersGame.from_bytes(test_game.to_bytes(), board_class)
+            self.assertEqual(self.game_state(restored_game), self.game_state(test_game))
+
+    def test_pending_multiple_capture(self):
+        test_game = CheckersGame(
+            CheckerBoardFactory.build_board_from_preset(CheckerBoardTestPresets.multi_capture_test_board_8_by_8))
+        test_game.make_move(CheckersMove([0, 0, 2, 2]))
+        restored_game = CheckersGame.from_bytes(test_game.to_bytes())
+        self.assertEqual(restored_game.current_team, TeamEnum.white)
+        self.assertEqual(list(restored_game.multiple_capture_possibilities), [CheckersMove([2, 2, 4, 4])])
+        restored_game.make_move(CheckersMove([2, 2, 4, 4]))
+        self.assertEqual(restored_game.end_game(), GameStatusEnum.white_wins)
+
+    def test_malformed_snapshots(self):
+        snapshot = CheckersGame(
+            CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8)).to_bytes()
+        self.assertRaises(SnapshotFormatException, CheckersGame.from_bytes, snapshot[:5])
+        self.assertRaises(SnapshotFormatException, CheckersGame.from_bytes, bytes([9]) + snapshot[1:])
+        self.assertRaises(SnapshotFormatException, CheckersGame.from_bytes, snapshot[:2] + bytes([99]) + snapshot[3:])
+        self.assertRaises(SnapshotFormatException, CheckersGame.from_bytes, snapshot[:-1])
+
+
 class TestRunGame(unittest.TestCase):
     def test_empty_iterator(self):
         test_board = CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8)
@@ -0,0 +1,40 @@
+import os
+import tempfile
+import unittest
+
+from board import CheckerBoardPresets
+from corpus_generator import CorpusSettings, generate_corpus
+from main import validate_game_file
+
+
+class TestCorpusGenerator(unittest.TestCase):
+    def test_corpus_is_reproducible_across_workers(self):
+        with tempfile.TemporaryDirectory() as directory:
+            contents = []
+            for workers in (1, 2):
+                settings = CorpusSettings(CheckerBoardPresets.standard_8_by_8, os.path.join(directory, str(workers)),
+                                          seed=5, black_policy='capture-greedy', illegal_move_rate=0.5)
+                generated_games = sorted(generate_corpus(settings, 6, workers, chunksize=1), key=lambda game: game.index)
+                self.assertEqual([game.index for game in generated_games], list(range(6)))
+                contents.append([open(game.path).read() for game in generated_games])
+            self.assertEqual(contents[0], contents[1])
+
+    def test_games_validate(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for white_policy, black_policy in (('random', 'random'), ('capture-greedy', 'engine')):
+                settings = CorpusSettings(CheckerBoardPresets.standard_8_by_8, directory, seed=1,
+                                          white_policy=white_policy, black_policy=black_policy, engine_depth=1,
+                                          illegal_move_rate=0.5)
+                illegal_games = 0
+                for generated_game in generate_corpus(settings, 8):
+                    result = validate_game_file(generated_game.path)
+                    if generated_game.illegal_move_line is None:
+                        self.assertIn(result.split(' - ')[1], ('first', 'second', 'tie game'))
+                    else:
+                        illegal_games += 1
+                        self.assertIn(f' - line {generated_game.illegal_move_line} illegal move', result)
+                self.assertGreater(illegal_games, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import random
+import tempfile
+import unittest
+from typing import Dict
+
+from board import BoardPresetDataclass, CheckerBoardFactory
+from checkers_enums import GameStatusEnum, TeamEnum
+from checkers_game import CheckersGame
+from endgame_tablebase import EndgameTablebase, TablebaseFormatException, generate_tablebase, write_tablebase
+from search_engine import SearchEngine
+
+WHITE_OUTCOMES = {GameStatusEnum.black_wins: -1, GameStatusEnum.tie_game: 0, GameStatusEnum.white_wins: 1}
+RESULTS = {outcome: result for result, outcome in WHITE_OUTCOMES.items()}
+
+
+def solve_by_search(game: CheckersGame, results: Dict[int, GameStatusEnum]) -> GameStatusEnum:
+    key = SearchEngine.position_key(game)
+    if key not in results:
+        moves = game.legal_moves()
+        if not moves:
+            return game.end_game()
+        choose = max if game.current_team is TeamEnum.white else min
+        outcomes = []
+        for move in moves:
+            game.make_move(move)
+            outcomes.append(WHITE_OUTCOMES[solve_by_search(game, results)])
+            game.unmake_move()
+        results[key] = RESULTS[choose(outcomes)]
+    return results[key]
+
+
+class TestEndgameTablebase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.temporary_directory = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.temporary_directory.name, 'endgame.cktb')
+        write_tablebase(cls.path, 3, generate_tablebase(3))
+        cls.tablebase = EndgameTablebase(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tablebase.close()
+        cls.temporary_directory.cleanup()
+
+    @staticmethod
+    def random_game(rng: random.Random, pieces: int) -> CheckersGame:
+        tiles = rng.sample([(column, row) for column in range(8) for row in range(8) if (column + row) % 2 == 1], pieces)
+        white_count = rng.randint(0, pieces)
+        game = CheckersGame(CheckerBoardFactory.build_board_from_preset(
+            BoardPresetDataclass(8, 8, tiles[:white_count], tiles[white_count:])))
+        if rng.random() < 0.5:
+            game.switch_team_turn()
+        return game
+
+    def test_results_match_search(self):
+        rng = random.Random(11)
+        results = {}
+        for _ in range(300):
+            game = self.random_game(rng, rng.randint(1, 3))
+            self.assertEqual(self.tablebase.probe(game), solve_by_search(game, results))
+
+    def test_multiple_capture_in_progress(self):
+        game = CheckersGame(CheckerBoardFactory.build_board_from_preset(
+            BoardPresetDataclass(8, 8, [(0, 1)], [(1, 2), (3, 4)])))
+        self.assertEqual(self.tablebase.probe(game), GameStatusEnum.white_wins)
+        game.make_move(game.legal_moves()[0])
+        self.assertTrue(game.multiple_capture_possibilities)
+        self.assertEqual(self.tablebase.probe(game), GameStatusEnum.white_wins)
+
+    def test_positions_outside_the_tablebase(self):
+        self.assertIsNone(self.tablebase.probe(self.random_game(random.Random(1), 4)))
+        game = CheckersGame(CheckerBoardFactory.build_board_from_preset(BoardPresetDataclass(8, 8, [(0, 0)], [])))
+        self.assertIsNone(self.tablebase.probe(game))
+        game = CheckersGame(CheckerBoardFactory.build_board_from_preset(BoardPresetDataclass(10, 10, [(0, 1)], [])))
+        self.assertIsNone(self.tablebase.probe(game))
+
+    def test_invalid_file(self):
+        path = os.path.join(self.temporary_directory.name, 'invalid.cktb')
+        with open(path, 'wb') as file:
+            file.write(b'not a tablebase')
+        self.assertRaises(TablebaseFormatException, EndgameTablebase, path)
+
+    def test_search_engine_uses_tablebase(self):
+        rng = random.Random(4)
+        engine = SearchEngine(time_budget=10, max_depth=2, tablebase=self.tablebase)
+        for _ in range(30):
+            game = self.random_game(rng, 3)
+            expected_result = self.tablebase.probe(game)
+            while game.legal_moves():
+                game.make_move(engine.choose_move(game).best_move)
+            self.assertEqual(game.end_game(), expected_result)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,14 @@
+import unittest
+
+from game_files import expand_paths
+
+
+class TestExpandPaths(unittest.TestCase):
+    def test_expand_paths(self):
+        self.assertEqual(list(expand_paths(['games'])), list(expand_paths(['games/*.txt'])))
+        self.assertEqual(len(list(expand_paths(['games']))), 4)
+        self.assertEqual(list(expand_paths(['games/missing.txt'])), ['games/missing.txt'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from binary_move_log import convert_move_file_to_binary_log
+from board import BoardPresetDataclass, CheckerBoardFactory, CheckerBoardPresets
+from checkers_game import CheckersGame
+from game_replay import GameReplay
+from move_iterators import create_move_iterator_from_move_file
+
+
+class TestGameReplay(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        for name in ('white.txt', 'illegal_move.txt'):
+            shutil.copy(os.path.join('games', name), self.temporary_directory.name)
+        self.path = os.path.join(self.temporary_directory.name, 'white.txt')
+        self.moves = list(create_move_iterator_from_move_file(self.path))
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def position_after(self, move_count: int):
+        game = CheckersGame(CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8))
+        for move in self.moves[:move_count]:
+            game.make_move(move)
+        return game.board.active_pieces, game.board.zobrist_key, game.current_team, \
+            list(game.multiple_capture_possibilities)
+
+    @staticmethod
+    def replayed_position(game: CheckersGame):
+        return game.board.active_pieces, game.board.zobrist_key, game.current_team, \
+            list(game.multiple_capture_possibilities)
+
+    def test_seek(self):
+        replay = GameReplay(self.path, interval=8)
+        self.assertEqual(len(replay), len(self.moves))
+        self.assertIsNone(replay.error)
+        positions = list(range(len(self.moves) + 1))
+        random.Random(2).shuffle(positions)
+        for position in positions:
+            self.assertEqual(self.replayed_position(replay.seek(position)), self.position_after(position))
+            self.assertEqual(replay.position, position)
+        self.assertRaises(IndexError, replay.seek, len(self.moves) + 1)
+        self.assertRaises(IndexError, replay.seek, -1)
+
+    def test_stepping(self):
+        replay = GameReplay(self.path, interval=8)
+        replay.seek(20)
+        for position in range(19, 2, -1):
+            self.assertEqual(self.replayed_position(replay.step_back()), self.position_after(position))
+        for position in range(4, 12):
+            self.assertEqual(self.replayed_position(replay.step_forward()), self.position_after(position))
+
+    def test_index_is_reused_until_the_file_changes(self):
+        replay = GameReplay(self.path, interval=8)
+        self.assertFalse(os.path.exists(replay.index_path))
+        replay.seek(30)
+        self.assertTrue(os.path.exists(replay.index_path))
+        reused_replay = GameReplay(self.path, interval=8)
+        self.assertEqual(self.replayed_position(reused_replay.seek(32)), self.position_after(32))
+        self.assertIsNone(reused_replay._moves)
+        self.assertEqual(len(GameReplay(self.path, interval=5)), len(self.moves))
+        with open(self.path, 'w') as file:
+            file.writelines(f'{move.source[0]},{move.source[1]},{move.target[0]},{move.target[1]}\n'
+                            for move in self.moves[:10])
+        self.assertEqual(len(GameReplay(self.path, interval=8)), 10)
+
+    def test_index_is_rebuilt_for_another_preset(self):
+        self.assertEqual(len(GameReplay(self.path)), len(self.moves))
+        preset = BoardPresetDataclass(8, 8, [(3, 2), (0, 1), (7, 0)], [(4, 3), (2, 3), (6, 1)])
+        replay = GameReplay(self.path, preset)
+        self.assertEqual((len(replay), replay.error), (0, 'line 1 illegal move: 1,2,0,3,'))
+        self.assertEqual(replay.seek(0).board.active_pieces,
+                         CheckerBoardFactory.build_board_from_preset(preset).active_pieces)
+        self.assertEqual(len(GameReplay(self.path)), len(self.moves))
+
+    def test_illegal_move(self):
+        replay = GameReplay(os.path.join(self.temporary_directory.name, 'illegal_move.txt'), interval=4)
+        self.assertEqual(len(replay), 14)
+        self.assertTrue(replay.error.startswith('line 15 illegal move'))
+        replay.seek(14)
+        self.assertRaises(IndexError, replay.step_forward)
+        reused_replay = GameReplay(replay.path, interval=4)
+        self.assertEqual((len(reused_replay), reused_replay.error), (14, replay.error))
+
+    def test_errors_match_run_game(self):
+        malformed_path = os.path.join(self.temporary_directory.name, 'malformed_line.txt')
+        with open(malformed_path, 'w') as file:
+            file.write('1,2,2,3\n6,5,7,4\n5,5,4\n')
+        for path in (os.path.join(self.temporary_directory.name, 'illegal_move.txt'), malformed_path):
+            game = CheckersGame(CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8))
+            self.assertEqual(GameReplay(path).error, game.run_game(create_move_iterator_from_move_file(path)))
+        self.assertEqual(GameReplay(malformed_path).error, 'line 3 illegal move: 5,5,4')
+
+    def test_truncated_move_log(self):
+        path = os.path.join(self.temporary_directory.name, 'white.ckml')
+        convert_move_file_to_binary_log(self.path, path)
+        with open(path, 'r+b') as file:
+            file.truncate(os.path.getsize(path) - 1)
+        replay = GameReplay(path)
+        self.assertEqual((len(replay), replay.error), (0, f'could not read file: {path} is truncated'))
+        self.assertEqual(replay.moves, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
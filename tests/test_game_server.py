@@ -0,0 +1,133 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+
+from game_server import GameServer
+
+
+class TestGameServerRequests(unittest.TestCase):
+    def setUp(self):
+        self.server = GameServer(max_sessions=2, idle_timeout=10)
+
+    def test_new_game(self):
+        first_answer, session_id = self.server.handle_request('NEW').split()
+        second_answer, other_session_id = self.server.handle_request('new standard_8_by_8').split()
+        self.assertEqual((first_answer, second_answer), ('OK', 'OK'))
+        self.assertNotEqual(session_id, other_session_id)
+        self.assertEqual(len(session_id), 32)
+        self.assertTrue(self.server.handle_request(f'STATE {session_id}').startswith(
+            'OK game_continues white 12 12 _b_b_b_b/'))
+        self.assertEqual(self.server.handle_request('NEW no_such_preset'), 'ERR unknown preset no_such_preset')
+
+    def test_moves(self):
+        session_id = self.server.handle_request('NEW').split()[1]
+        legal_moves = self.server.handle_request(f'LEGAL {session_id}').split()[1:]
+        self.assertIn('1,2,2,3', legal_moves)
+        self.assertEqual(len(legal_moves), 7)
+        self.assertEqual(self.server.handle_request(f'MOVE {session_id} 1,2,2,3'), 'OK game_continues black')
+        self.assertEqual(self.server.handle_request(f'MOVE {session_id} 3,2,4,3'),
+                         'ERR illegal move: CheckersMove([3, 2, 4, 3]): source is not a piece of the team')
+        self.assertEqual(self.server.handle_request(f'MOVE {session_id} 1,x,2,3'), 'ERR malformed move 1,x,2,3')
+        self.assertTrue(self.server.handle_request(f'STATE {session_id}').startswith('OK game_continues black 12 12'))
+
+    def test_resign(self):
+        session_id = self.server.handle_request('NEW').split()[1]
+        self.assertEqual(self.server.handle_request(f'RESIGN {session_id}'), 'OK black_wins')
+        self.assertEqual(self.server.handle_request(f'STATE {session_id}'), f'ERR no session {session_id}')
+
+    def test_malformed_requests(self):
+        self.assertEqual(self.server.handle_request('JUMP 1'), 'ERR unknown command JUMP')
+        self.assertEqual(self.server.handle_request('MOVE 1'), 'ERR wrong number of arguments for MOVE')
+        self.assertEqual(self.server.handle_request('STATE'), 'ERR wrong number of arguments for STATE')
+        self.assertEqual(self.server.handle_request('LEGAL 7'), 'ERR no session 7')
+
+    def test_sessions_belong_to_their_owner(self):
+        owner, other_owner = object(), object()
+        session_id = self.server.handle_request('NEW', owner).split()[1]
+        for request in (f'MOVE {session_id} 1,2,2,3', f'STATE {session_id}', f'LEGAL {session_id}',
+                        f'RESIGN {session_id}'):
+            self.assertEqual(self.server.handle_request(request, other_owner), f'ERR no session {session_id}')
+            self.assertEqual(self.server.handle_request(request), f'ERR no session {session_id}')
+        self.assertTrue(self.server.handle_request(f'STATE {session_id}', owner).startswith('OK game_continues white'))
+        self.assertEqual(self.server.close_sessions(other_owner), 0)
+        self.assertEqual(self.server.close_sessions(owner), 1)
+        self.assertEqual(self.server.sessions, {})
+
+    def test_session_limit_and_eviction(self):
+        first_session_id = self.server.handle_request('NEW').split()[1]
+        second_session_id = self.server.handle_request('NEW').split()[1]
+        self.assertEqual(self.server.handle_request('NEW'), 'ERR too many sessions')
+        self.server.sessions[first_session_id].last_active -= 20
+        third_session_id = self.server.handle_request('NEW').split()[1]
+        self.assertEqual(sorted(self.server.sessions), sorted([second_session_id, third_session_id]))
+        self.assertEqual(self.server.evict_idle_sessions(time.monotonic() + 20), 2)
+        self.assertEqual(self.server.sessions, {})
+
+
+class TestGameServerConnections(unittest.TestCase):
+    @staticmethod
+    async def exchange(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, request: str) -> str:
+        writer.write(request.encode() + b'\n')
+        await writer.drain()
+        return (await reader.readline()).decode().strip()
+
+    async def play(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        session_id = (await self.exchange(reader, writer, 'NEW')).split()[1]
+        self.assertEqual(await self.exchange(reader, writer, f'MOVE {session_id} 5,2,4,3'), 'OK game_continues black')
+        self.assertEqual(await self.exchange(reader, writer, f'RESIGN {session_id}'), 'OK white_wins')
+        writer.write(b'x' * 2048 + b'\n')
+        self.assertEqual(await reader.readline(), b'ERR line too long\n')
+        self.assertEqual(await reader.readline(), b'')
+        writer.close()
+
+    def test_tcp(self):
+        async def run():
+            server = GameServer()
+            listener = await server.start_tcp('127.0.0.1', 0)
+            reader, writer = await asyncio.open_connection('127.0.0.1', listener.sockets[0].getsockname()[1])
+            await self.play(reader, writer)
+            await server.close()
+        asyncio.run(run())
+
+    def test_other_connections_cannot_use_a_session(self):
+        async def run():
+            server = GameServer()
+            listener = await server.start_tcp('127.0.0.1', 0)
+            port = listener.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            other_reader, other_writer = await asyncio.open_connection('127.0.0.1', port)
+            session_id = (await self.exchange(reader, writer, 'NEW')).split()[1]
+            for request in (f'MOVE {session_id} 5,2,4,3', f'STATE {session_id}', f'LEGAL {session_id}',
+                            f'RESIGN {session_id}'):
+                self.assertEqual(await self.exchange(other_reader, other_writer, request),
+                                 f'ERR no session {session_id}')
+            self.assertEqual(await self.exchange(reader, writer, f'MOVE {session_id} 5,2,4,3'),
+                             'OK game_continues black')
+            self.assertEqual(await self.exchange(reader, writer, 'QUIT'), 'OK')
+            self.assertEqual(await reader.readline(), b'')
+            self.assertEqual(server.sessions, {})
+            for stream_writer in (writer, other_writer):
+                stream_writer.close()
+            await server.close()
+        asyncio.run(run())
+
+    @unittest.skipUnless(hasattr(asyncio, 'start_unix_server'), 'Unix sockets are not available')
+    def test_unix_socket(self):
+        async def run():
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'server.sock')
+                server = GameServer()
+                await server.start_unix(path)
+                reader, writer = await asyncio.open_unix_connection(path)
+                self.assertTrue((await self.exchange(reader, writer, 'NEW')).startswith('OK '))
+                self.assertEqual(await self.exchange(reader, writer, 'QUIT'), 'OK')
+                self.assertEqual(await reader.readline(), b'')
+                writer.close()
+                await server.close()
+        asyncio.run(run())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import json
+import unittest
+
+from board import CheckerBoardFactory, CheckerBoardPresets
+from checkers_game import CheckersGame
+from checkersmove import CheckersMove, IllegalMoveException
+from instrumentation import GameStatistics, InstrumentedCheckersGame
+from move_iterators import create_move_iterator_from_move_file
+
+
+class TestInstrumentation(unittest.TestCase):
+    def test_results_match_uninstrumented_games(self):
+        for path in ['games/white.txt', 'games/black.txt', 'games/incomplete.txt', 'games/illegal_move.txt']:
+            results = []
+            for game_class in (CheckersGame, InstrumentedCheckersGame):
+                test_game = game_class(CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8))
+                results.append(test_game.run_game(create_move_iterator_from_move_file(path)))
+            self.assertEqual(results[0], results[1])
+
+    def test_counters(self):
+        statistics = GameStatistics()
+        test_game = InstrumentedCheckersGame(
+            CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8), statistics)
+        moves = list(create_move_iterator_from_move_file('games/white.txt'))
+        for move in moves:
+            test_game.make_move(move)
+        self.assertRaises(IllegalMoveException, test_game.make_move, CheckersMove([0, 0, 1, 1]))
+        test_game.unmake_move()
+        test_game.end_game()
+        snapshot = statistics.snapshot()
+        self.assertEqual(snapshot['counters']['games'], 1)
+        self.assertEqual(snapshot['counters']['moves_applied'], len(moves))
+        self.assertEqual(snapshot['counters']['moves_unmade'], 1)
+        self.assertEqual(snapshot['counters']['exceptions'], 1)
+        self.assertGreater(snapshot['counters']['validations'], len(moves))
+        self.assertGreater(snapshot['counters']['capture_candidates'], 0)
+        for phase in ('make_move', 'validation', 'board_mutation', 'capture_scan', 'unmake_move', 'end_game'):
+            self.assertGreater(snapshot['timers'][phase], 0.0)
+        self.assertEqual(json.loads(statistics.to_json()), snapshot)
+
+    def test_merge(self):
+        statistics = GameStatistics()
+        statistics.count('games')
+        statistics.add_time('make_move', 0.5)
+        other_statistics = GameStatistics()
+        other_statistics.count('games', 2)
+        other_statistics.count('exceptions')
+        other_statistics.add_time('make_move', 0.25)
+        statistics.merge(other_statistics.snapshot())
+        self.assertEqual(statistics.snapshot(), {'counters': {'exceptions': 1, 'games': 3},
+                                                 'timers': {'make_move': 0.75}})
+        statistics.clear()
+        self.assertEqual(statistics.snapshot(), {'counters': {}, 'timers': {}})
+
+
+if __name__ == '__main__':
+    unittest.main()
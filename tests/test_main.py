@@ -0,0 +1,168 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from binary_move_log import convert_move_file_to_binary_log
+from instrumentation import GameStatistics
+from game_files import expand_paths
+from main import GameValidator, serve, validate_game_files
+from result_cache import ResultCache
+
+
+class TestBatchValidation(unittest.TestCase):
+    expected_results = ['black.txt - second',
+                        'illegal_move.txt - line 15 illegal move: 1,0,0,5,',
+                        'incomplete.txt - incomplete game',
+                        'white.txt - first']
+
+    def test_in_process_validation(self):
+        self.assertEqual(list(validate_game_files(expand_paths(['games']))), self.expected_results)
+
+    def test_ordered_pool_validation(self):
+        self.assertEqual(list(validate_game_files(expand_paths(['games']), workers=2, ordered=True, chunksize=1)),
+                         self.expected_results)
+
+    def test_unordered_pool_validation(self):
+        self.assertEqual(sorted(validate_game_files(expand_paths(['games']), workers=2)), self.expected_results)
+
+    def test_statistics_are_merged_across_workers(self):
+        counters = []
+        for workers in (1, 2):
+            statistics = GameStatistics()
+            self.assertEqual(sorted(validate_game_files(expand_paths(['games']), workers=workers, chunksize=1,
+                                                        statistics=statistics)), self.expected_results)
+            counters.append(statistics.snapshot()['counters'])
+        self.assertEqual(counters[0], counters[1])
+        self.assertEqual(counters[0]['games'], 4)
+        self.assertEqual(counters[0]['exceptions'], 1)
+
+    def test_missing_file(self):
+        self.assertEqual(list(validate_game_files(['games/missing.txt'])),
+                         ['missing.txt - could not read file: No such file or directory'])
+
+    def test_undecodable_file_only_fails_its_own_game(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'undecodable.txt')
+            with open(path, 'wb') as file:
+                file.write(b'1,2,2,3\n5,\xff,4,4\n')
+            expected_results = ['undecodable.txt - line 2 illegal move: 5,\ufffd,4,4', 'white.txt - first']
+            paths = [path, 'games/white.txt']
+            self.assertEqual(list(validate_game_files(paths, workers=2, ordered=True, chunksize=1)), expected_results)
+            with ResultCache(os.path.join(directory, 'cache.sqlite')) as cache:
+                self.assertEqual(list(validate_game_files(paths, ordered=True, cache=cache)), expected_results)
+
+    def test_pool_validation_with_cache(self):
+        paths = list(expand_paths(['games'])) * 3
+        with tempfile.TemporaryDirectory() as directory:
+            with ResultCache(os.path.join(directory, 'cache.sqlite')) as cache:
+                for _ in range(2):
+                    self.assertEqual(list(validate_game_files(paths, workers=2, ordered=True, chunksize=1,
+                                                              cache=cache)), self.expected_results * 3)
+                self.assertEqual((cache.hits, cache.misses), (20, 4))
+                self.assertEqual(sorted(validate_game_files(paths, workers=2, chunksize=1, cache=cache)),
+                                 sorted(self.expected_results * 3))
+
+    def test_cached_jobs_are_built_as_they_are_needed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with ResultCache(os.path.join(directory, 'cache.sqlite')) as cache:
+                paths = iter(expand_paths(['games']))
+                self.assertEqual(next(validate_game_files(paths, cache=cache)), self.expected_results[0])
+                self.assertEqual(len(list(paths)), 3)
+                self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+    def test_malformed_first_line_only_fails_its_own_game(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'malformed.txt')
+            with open(path, 'w') as file:
+                file.write('x\n1,2,2,3\n')
+            expected_results = ['malformed.txt - line 1 illegal move: x', 'white.txt - first']
+            paths = [path, 'games/white.txt']
+            self.assertEqual(list(validate_game_files(paths, workers=2, ordered=True, chunksize=1)), expected_results)
+            with ResultCache(os.path.join(directory, 'cache.sqlite')) as cache:
+                self.assertEqual(list(validate_game_files(paths, workers=2, ordered=True, chunksize=1, cache=cache)),
+                                 expected_results)
+
+    def test_truncated_move_log_only_fails_its_own_game(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'truncated.ckml')
+            convert_move_file_to_binary_log('games/white.txt', path)
+            with open(path, 'r+b') as file:
+                file.truncate(os.path.getsize(path) - 1)
+            expected_results = [f'truncated.ckml - could not read file: {path} is truncated', 'white.txt - first']
+            paths = [path, 'games/white.txt']
+            self.assertEqual(list(validate_game_files(paths, workers=2, ordered=True, chunksize=1)), expected_results)
+            with ResultCache(os.path.join(directory, 'cache.sqlite')) as cache:
+                self.assertEqual(list(validate_game_files(paths, ordered=True, cache=cache)), expected_results)
+            self.assertEqual(GameValidator().validate_file(path), f'could not read file: {path} is truncated')
+
+
+class TestServe(unittest.TestCase):
+    def serve(self, lines, statistics=None):
+        output = io.StringIO()
+        serve(lines, output, GameValidator(statistics=statistics))
+        return [json.loads(line) for line in output.getvalue().splitlines()]
+
+    def test_paths_and_inline_moves(self):
+        with open('games/white.txt') as file:
+            moves = file.read()
+        statistics = GameStatistics()
+        answers = self.serve(['games/white.txt\n', '\n', 'games/illegal_move.txt\n', 'games/missing.txt\n',
+                              json.dumps({'id': 7, 'moves': moves}) + '\n',
+                              json.dumps({'path': 'games/black.txt'}) + '\n',
+                              json.dumps({'moves': ''}) + '\n'], statistics)
+        self.assertEqual(answers, [{'path': 'games/white.txt', 'result': 'first'},
+                                   {'path': 'games/illegal_move.txt', 'result': 'line 15 illegal move: 1,0,0,5,'},
+                                   {'path': 'games/missing.txt', 'result': 'could not read file: No such file or directory'},
+                                   {'id': 7, 'result': 'first'},
+                                   {'path': 'games/black.txt', 'result': 'second'},
+                                   {'result': 'No moves loaded'}])
+        self.assertEqual(statistics.counters['games'], 5)
+
+    def test_the_template_is_not_changed_by_games(self):
+        validator = GameValidator()
+        self.assertEqual([validator.validate_file('games/white.txt') for _ in range(2)], ['first', 'first'])
+        self.assertEqual(validator.new_game().undo_stack, [])
+        self.assertEqual(len(validator.new_game().board.active_pieces), 24)
+
+    def test_bad_requests(self):
+        answers = self.serve(['{"id": 1\n', '{"id": "a", "moves": 3}\n'])
+        self.assertTrue(answers[0]['error'].startswith('invalid JSON'))
+        self.assertEqual(answers[1], {'id': 'a', 'error': 'request needs a "path" or "moves" string'})
+
+    def test_a_failed_request_does_not_stop_the_next_ones(self):
+        with tempfile.TemporaryDirectory() as directory:
+            truncated_path = os.path.join(directory, 'truncated.ckml')
+            convert_move_file_to_binary_log('games/white.txt', truncated_path)
+            with open(truncated_path, 'r+b') as file:
+                file.truncate(os.path.getsize(truncated_path) - 1)
+            undecodable_path = os.path.join(directory, 'undecodable.txt')
+            with open(undecodable_path, 'wb') as file:
+                file.write(b'1,2,2,3\n5,\xff,4,4\n')
+            answers = self.serve([truncated_path + '\n', undecodable_path + '\n',
+                                  json.dumps({'id': 1, 'path': 'games/white.txt\0'}) + '\n', 'games/white.txt\n'])
+        self.assertEqual(answers[0], {'path': truncated_path,
+                                      'result': f'could not read file: {truncated_path} is truncated'})
+        self.assertEqual(answers[1], {'path': undecodable_path, 'result': 'line 2 illegal move: 5,\ufffd,4,4'})
+        self.assertEqual(answers[2], {'id': 1, 'path': 'games/white.txt\0',
+                                      'error': 'could not validate the game: embedded null byte'})
+        self.assertEqual(answers[3], {'path': 'games/white.txt', 'result': 'first'})
+
+    def test_results_are_flushed_per_line(self):
+        main_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'main.py')
+        with subprocess.Popen([sys.executable, main_path, '--serve'], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                              text=True) as process:
+            for path, result in (('games/white.txt', 'first'), ('games/black.txt', 'second')):
+                process.stdin.write(path + '\n')
+                process.stdin.flush()
+                self.assertEqual(json.loads(process.stdout.readline()), {'path': path, 'result': result})
+            process.stdin.close()
+            self.assertEqual(process.stdout.read(), '')
+        self.assertEqual(process.returncode, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,8 @@
+import os
+import tempfile
 import unittest
 
-from checkersmove import CheckersMove
+from checkersmove import CheckersMove, IllegalMoveException
 from move_iterators import create_move_iterator_from_list_of_lists, create_move_iterator_from_move_file
 
 
@@ -23,5 +25,28 @@ class TestMoveIterator(unittest.TestCase):
         self.assertEqual(next(move_iterator), CheckersMove([1, 2, 0, 3]))
         self.assertEqual(next(move_iterator), CheckersMove([4, 5, 3, 4]))
 
+    def test_block_boundaries(self):
+        with open('games/white.txt') as file:
+            expected_moves = [CheckersMove([int(coord) for coord in line.split(',')]) for line in file]
+        for block_size in (1, 3, 7, 64, 1 << 20):
+            self.assertEqual(list(create_move_iterator_from_move_file('games/white.txt', block_size=block_size)),
+                             expected_moves)
+
+    def test_malformed_line_number(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'game.txt')
+            for contents, moves_before_error, line_number in (('1,2,2,3\n5,5,4\n6,5,7,4\n', 1, 2),
+                                                              ('1,2,2,3\n1,2,2,3\n\n', 2, 3),
+                                                              ('1,2,2,3\n6,5,x,4', 1, 2)):
+                with open(path, 'w') as file:
+                    file.write(contents)
+                for block_size in (2, 1 << 20):
+                    move_iterator = create_move_iterator_from_move_file(path, block_size=block_size)
+                    for _ in range(moves_before_error):
+                        next(move_iterator)
+                    with self.assertRaises(IllegalMoveException) as context:
+                        next(move_iterator)
+                    self.assertEqual(context.exception.line_number, line_number)
+
 if __name__ == '__main__':
     unittest.main()
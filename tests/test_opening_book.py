@@ -0,0 +1,78 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from checkers_enums import GameStatusEnum
+from checkersmove import CheckersMove
+from move_iterators import create_move_iterator_from_move_file
+from opening_book import OpeningBook
+
+
+class TestOpeningBook(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.book_path = os.path.join(self.temporary_directory.name, 'book.sqlite')
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def test_start_position(self):
+        with OpeningBook(self.book_path) as book:
+            self.assertEqual(book.add_game_files(['games/white.txt', 'games/black.txt', 'games/illegal_move.txt',
+                                                  'games/incomplete.txt', 'games/missing.txt'], workers=2), 4)
+            statistics = book.lookup([])
+            self.assertEqual(statistics.visits, 4)
+            self.assertEqual(statistics.outcomes, {GameStatusEnum.white_wins: 1, GameStatusEnum.black_wins: 1,
+                                                   GameStatusEnum.tie_game: 0, GameStatusEnum.incomplete_game: 1,
+                                                   GameStatusEnum.illegal_move: 1})
+            self.assertEqual(sum(count for _, count in statistics.continuations), 4)
+
+    def test_move_prefix(self):
+        with OpeningBook(self.book_path) as book:
+            book.add_game_files(['games/white.txt'])
+            moves = list(create_move_iterator_from_move_file('games/white.txt'))
+            for length in (1, 10, len(moves)):
+                statistics = book.lookup(moves[:length])
+                self.assertEqual(statistics.visits, 1)
+                self.assertEqual(statistics.outcomes[GameStatusEnum.white_wins], 1)
+                self.assertEqual(statistics.continuations, [(moves[length], 1)] if length < len(moves) else [])
+            self.assertIsNone(book.lookup([CheckersMove([7, 2, 6, 3])]))
+
+    def test_transposition(self):
+        game_path = os.path.join(self.temporary_directory.name, 'game.txt')
+        with open(game_path, 'w') as file:
+            file.write('1,2,0,3\n0,5,1,4\n7,2,6,3\n')
+        with OpeningBook(self.book_path) as book:
+            book.add_game_files([game_path])
+            statistics = book.lookup([CheckersMove([7, 2, 6, 3]), CheckersMove([0, 5, 1, 4]), CheckersMove([1, 2, 0, 3])])
+            self.assertEqual(statistics.visits, 1)
+            self.assertEqual(statistics.outcomes[GameStatusEnum.incomplete_game], 1)
+
+    def test_incremental_build(self):
+        games_directory = os.path.join(self.temporary_directory.name, 'games')
+        os.makedirs(games_directory)
+        shutil.copy('games/white.txt', os.path.join(games_directory, 'first.txt'))
+        with OpeningBook(self.book_path) as book:
+            self.assertEqual(book.add_game_files([os.path.join(games_directory, 'first.txt')]), 1)
+        shutil.copy('games/white.txt', os.path.join(games_directory, 'second.txt'))
+        with OpeningBook(self.book_path) as book:
+            paths = [os.path.join(games_directory, name) for name in ('first.txt', 'second.txt')]
+            self.assertEqual(book.add_game_files(paths), 1)
+            self.assertEqual(book.add_game_files(paths), 0)
+            self.assertEqual(book.lookup([]).visits, 2)
+
+
+    def test_undecodable_file_only_fails_its_own_game(self):
+        game_path = os.path.join(self.temporary_directory.name, 'undecodable.txt')
+        with open(game_path, 'wb') as file:
+            file.write(b'1,2,2,3\n5,\xff,4,4\n')
+        with OpeningBook(self.book_path) as book:
+            self.assertEqual(book.add_game_files([game_path, 'games/white.txt'], workers=2, chunksize=1), 2)
+            statistics = book.lookup([])
+            self.assertEqual(statistics.visits, 2)
+            self.assertEqual(statistics.outcomes[GameStatusEnum.illegal_move], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+from board import BoardPresetDataclass, CheckerBoardFactory, CheckerBoardPresets
+from checkers_game import CheckersGame
+from parallel_search import ParallelTreeWalker
+from perft import divide, perft
+from search_engine import SearchEngine
+from tests import test_search_engine
+from tests.board_presets_for_tests import CheckerBoardTestPresets
+
+
+class TestParallelTreeWalker(unittest.TestCase):
+    minimax = test_search_engine.TestSearchEngine.minimax
+
+    @classmethod
+    def setUpClass(cls):
+        cls.walker = ParallelTreeWalker(workers=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.walker.close()
+
+    def test_perft_matches_serial_perft(self):
+        for preset, depth in ((CheckerBoardPresets.standard_8_by_8, 5),
+                              (CheckerBoardTestPresets.multi_capture_test_board_8_by_8, 3),
+                              (CheckerBoardTestPresets.test_capture_board, 6),
+                              (CheckerBoardTestPresets.simple_tie_test_board, 2)):
+            test_game = CheckersGame(CheckerBoardFactory.build_board_from_preset(preset))
+            key = test_game.board.zobrist_key
+            for split_depth in (1, 3):
+                walker = ParallelTreeWalker(split_depth=split_depth)
+                self.assertEqual(walker.perft(test_game, depth), perft(test_game, depth))
+            self.assertEqual(self.walker.divide(test_game, depth), divide(test_game, depth))
+            self.assertEqual(test_game.board.zobrist_key, key)
+            self.assertEqual(test_game.undo_stack, [])
+
+    def test_search_matches_plain_minimax(self):
+        for preset in (BoardPresetDataclass(8, 8, [(2, 2), (6, 4), (1, 0)], [(5, 6), (0, 7), (3, 6)]),
+                       CheckerBoardTestPresets.test_capture_board):
+            test_game = CheckersGame(CheckerBoardFactory.build_board_from_preset(preset))
+            result = self.walker.search(test_game, 5)
+            engine = SearchEngine()
+            self.assertEqual(result.score, self.minimax(engine, test_game, 5, 0))
+            team = test_game.current_team
+            test_game.make_move(result.best_move)
+            if test_game.current_team is team:
+                self.assertEqual(self.minimax(engine, test_game, 5, 1), result.score)
+            else:
+                self.assertEqual(-self.minimax(engine, test_game, 4, 1), result.score)
+            test_game.unmake_move()
+            self.assertEqual(test_game.undo_stack, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+
+from board import BitboardCheckerBoard, CheckerBoard, CheckerBoardFactory, CheckerBoardPresets
+from checkers_game import CheckersGame
+from checkersmove import CheckersMove
+from perft import divide, get_presets, perft
+from tests.board_presets_for_tests import CheckerBoardTestPresets
+
+
+class TestPerft(unittest.TestCase):
+    known_counts = [(CheckerBoardPresets.standard_8_by_8, [7, 49, 302, 1469, 7361]),
+                    (CheckerBoardTestPresets.multi_capture_test_board_8_by_8, [1, 1, 0]),
+                    (CheckerBoardTestPresets.simple_tie_test_board, [0]),
+                    (CheckerBoardTestPresets.test_capture_board, [3, 7, 16, 30, 100, 181])]
+
+    def test_known_counts(self):
+        for preset, counts in self.known_counts:
+            for board_class in (CheckerBoard, BitboardCheckerBoard):
+                test_game = CheckersGame(CheckerBoardFactory.build_board_from_preset(preset, board_class))
+                key = test_game.board.zobrist_key
+                self.assertEqual([perft(test_game, depth) for depth in range(1, len(counts) + 1)], counts)
+                self.assertEqual(test_game.board.zobrist_key, key)
+
+    def test_divide(self):
+        test_game = CheckersGame(CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8))
+        move_counts = dict(divide(test_game, 3))
+        self.assertEqual(len(move_counts), 7)
+        self.assertEqual(sum(move_counts.values()), 302)
+        self.assertIn(CheckersMove([1, 2, 0, 3]), move_counts)
+
+
+    def test_get_presets(self):
+        self.assertEqual(get_presets(), {'standard_8_by_8': CheckerBoardPresets.standard_8_by_8})
+        presets = get_presets('tests.board_presets_for_tests:CheckerBoardTestPresets')
+        self.assertEqual(sorted(presets), ['multi_capture_test_board_8_by_8', 'simple_tie_test_board',
+                                           'standard_8_by_8', 'test_capture_board'])
+        self.assertIs(presets['test_capture_board'], CheckerBoardTestPresets.test_capture_board)
+
+
+if __name__ == '__main__':
+    unittest.main()
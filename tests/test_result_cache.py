@@ -0,0 +1,116 @@
+import os
+import tempfile
+import unittest
+
+from binary_move_log import convert_move_file_to_binary_log
+from board import CheckerBoardPresets
+from instrumentation import GameStatistics
+from main import play_game_file, validate_cached_game_file, validate_game_files
+from result_cache import ResultCache, content_hash, validate_game_data
+from tests.board_presets_for_tests import CheckerBoardTestPresets
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.temporary_directory.name, 'cache.sqlite')
+        with open('games/white.txt', 'rb') as file:
+            self.lines = file.read().splitlines(keepends=True)
+
+    def tearDown(self):
+        self.temporary_directory.cleanup()
+
+    def write_game(self, name: str, contents: bytes) -> str:
+        path = os.path.join(self.temporary_directory.name, name)
+        with open(path, 'wb') as file:
+            file.write(contents)
+        return path
+
+    def test_validate_game_data_matches_run_game(self):
+        for name in ('white.txt', 'black.txt', 'incomplete.txt', 'illegal_move.txt'):
+            path = os.path.join('games', name)
+            with open(path, 'rb') as file:
+                result, checkpoint, resumed = validate_game_data(file.read())
+            self.assertEqual(result, play_game_file(path))
+            self.assertFalse(resumed)
+        self.assertEqual(validate_game_data(b'')[0], 'No moves loaded')
+        self.assertIsNone(validate_game_data(b'1,2,2,3\n1,2,2,3\n')[1])
+
+    def test_resume_grown_file(self):
+        data = b''.join(self.lines[:20])
+        result, checkpoint, _ = validate_game_data(data)
+        self.assertEqual(result, 'incomplete game')
+        self.assertEqual((checkpoint.size, checkpoint.line_count), (len(data), 20))
+        grown_data = b''.join(self.lines)
+        result, grown_checkpoint, resumed = validate_game_data(grown_data, checkpoint)
+        self.assertEqual(result, 'first')
+        self.assertTrue(resumed)
+        self.assertEqual(grown_checkpoint.line_count, len(self.lines) - (not grown_data.endswith(b'\n')))
+        result, _, resumed = validate_game_data(b'0,1,1,2\n' + grown_data[8:], checkpoint)
+        self.assertFalse(resumed)
+
+    def test_resume_after_incomplete_last_line(self):
+        partial_line = self.lines[20][:3]
+        result, checkpoint, _ = validate_game_data(b''.join(self.lines[:20]) + partial_line)
+        self.assertEqual(result, f'line 21 illegal move: {partial_line.decode()}')
+        self.assertEqual(checkpoint.line_count, 20)
+        result, _, resumed = validate_game_data(b''.join(self.lines), checkpoint)
+        self.assertEqual((result, resumed), ('first', True))
+        result, _, resumed = validate_game_data(b''.join(self.lines[:30]) + b'9,9,9,9\n', checkpoint)
+        self.assertEqual((result, resumed), ('line 31 illegal move: 9,9,9,9,', True))
+
+    def test_cached_validation(self):
+        path = self.write_game('live.txt', b''.join(self.lines[:20]))
+        statistics = GameStatistics()
+        with ResultCache(self.cache_path) as cache:
+            self.assertEqual(list(validate_game_files([path], cache=cache, statistics=statistics)),
+                             ['live.txt - incomplete game'])
+            self.assertEqual(list(validate_game_files([path], cache=cache)), ['live.txt - incomplete game'])
+            self.write_game('live.txt', b''.join(self.lines))
+            self.assertEqual(list(validate_game_files([path], cache=cache)), ['live.txt - first'])
+            self.assertEqual((cache.hits, cache.misses, cache.resumed), (1, 2, 1))
+        self.assertEqual(statistics.counters['cache_misses'], 1)
+        self.assertEqual(statistics.counters['games'], 1)
+        with ResultCache(self.cache_path) as cache:
+            copy_path = self.write_game('copy.txt', b''.join(self.lines))
+            self.assertEqual(list(validate_game_files([copy_path, os.path.join(self.temporary_directory.name, 'no')],
+                                                      workers=2, ordered=True, cache=cache)),
+                             ['copy.txt - first', 'no - could not read file: No such file or directory'])
+            self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+    def test_games_are_played_from_the_cache_preset(self):
+        path = self.write_game('white.txt', b''.join(self.lines))
+        with ResultCache(self.cache_path, preset=CheckerBoardTestPresets.test_capture_board) as cache:
+            self.assertEqual(list(validate_game_files([path], cache=cache)),
+                             ['white.txt - line 1 illegal move: 1,2,0,3,'])
+        with ResultCache(self.cache_path) as cache:
+            self.assertEqual(list(validate_game_files([path], cache=cache)), ['white.txt - first'])
+            self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+    def test_binary_logs_are_validated_from_the_hashed_contents(self):
+        binary_path = os.path.join(self.temporary_directory.name, 'white.ckml')
+        convert_move_file_to_binary_log('games/white.txt', binary_path)
+        with open(binary_path, 'rb') as file:
+            data = file.read()
+        os.remove(binary_path)
+        job = (binary_path, data, content_hash(data), None, None, CheckerBoardPresets.standard_8_by_8, False)
+        self.assertEqual(validate_cached_game_file(job)[:3], (binary_path, 'first', content_hash(data)))
+
+    def test_least_recently_used_results_are_evicted(self):
+        paths = [self.write_game(f'{count}.txt', b''.join(self.lines[:count])) for count in (5, 6, 7)]
+        with ResultCache(self.cache_path, max_entries=2) as cache:
+            list(validate_game_files(paths[:2], cache=cache))
+            list(validate_game_files(paths[:1], cache=cache))
+            list(validate_game_files(paths[2:], cache=cache))
+            self.assertEqual(cache.evictions, 2)
+        with ResultCache(self.cache_path, max_entries=2) as cache:
+            cached = []
+            for path in paths:
+                with open(path, 'rb') as file:
+                    cached.append(cache.lookup(file.read())[1] is not None)
+            self.assertEqual(cached, [True, False, True])
+            self.assertEqual(cache.connection.execute('SELECT COUNT(*) FROM results').fetchone()[0], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
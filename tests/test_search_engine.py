@@ -0,0 +1,79 @@
+import unittest
+
+from board import CheckerBoardFactory, CheckerBoardPresets, BoardPresetDataclass
+from checkers_game import CheckersGame
+from checkersmove import CheckersMove
+from search_engine import SearchEngine, TranspositionTable
+from tests.board_presets_for_tests import CheckerBoardTestPresets
+
+
+class TestSearchEngine(unittest.TestCase):
+    def test_search_leaves_game_unchanged(self):
+        test_game = CheckersGame(CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8))
+        key = test_game.board.zobrist_key
+        result = SearchEngine(time_budget=10, max_depth=3).choose_move(test_game)
+        self.assertEqual(result.depth, 3)
+        self.assertIn(result.best_move, test_game.legal_moves())
+        self.assertEqual(test_game.board.zobrist_key, key)
+        self.assertEqual(test_game.undo_stack, [])
+        self.assertGreater(result.nodes, 0)
+
+    def test_follows_multi_capture(self):
+        test_game = CheckersGame(
+            CheckerBoardFactory.build_board_from_preset(CheckerBoardTestPresets.multi_capture_test_board_8_by_8))
+        engine = SearchEngine(time_budget=10, max_depth=4)
+        self.assertEqual(engine.choose_move(test_game).best_move, CheckersMove([0, 0, 2, 2]))
+        test_game.make_move(CheckersMove([0, 0, 2, 2]))
+        self.assertEqual(engine.choose_move(test_game).best_move, CheckersMove([2, 2, 4, 4]))
+
+    def test_matches_plain_minimax(self):
+        for preset in (BoardPresetDataclass(8, 8, [(2, 2), (6, 4), (1, 0)], [(5, 6), (0, 7), (3, 6)]),
+                       CheckerBoardTestPresets.test_capture_board):
+            test_game = CheckersGame(CheckerBoardFactory.build_board_from_preset(preset))
+            engine = SearchEngine(time_budget=60, max_depth=5)
+            result = engine.choose_move(test_game)
+            self.assertEqual(result.score, self.minimax(engine, test_game, 5, 0))
+
+    def minimax(self, engine: SearchEngine, game: CheckersGame, depth: int, ply: int) -> int:
+        moves = game.legal_moves()
+        if not moves:
+            return engine._terminal_score(game, ply)
+        if depth <= 0:
+            return engine.evaluate(game)
+        best_score = None
+        for move in moves:
+            team = game.current_team
+            game.make_move(move)
+            if game.current_team is team:
+                score = self.minimax(engine, game, depth, ply + 1)
+            else:
+                score = -self.minimax(engine, game, depth - 1, ply + 1)
+            game.unmake_move()
+            best_score = score if best_score is None else max(best_score, score)
+        return best_score
+
+    def test_respects_time_budget(self):
+        test_game = CheckersGame(CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8))
+        result = SearchEngine(time_budget=0.2).choose_move(test_game)
+        self.assertLess(result.elapsed, 1.0)
+        self.assertIn(result.best_move, test_game.legal_moves())
+
+    def test_no_moves(self):
+        test_game = CheckersGame(CheckerBoardFactory.build_board_from_preset(CheckerBoardTestPresets.simple_tie_test_board))
+        self.assertIsNone(SearchEngine().choose_move(test_game).best_move)
+
+
+class TestTranspositionTable(unittest.TestCase):
+    def test_replacement(self):
+        table = TranspositionTable(4)
+        table.store(1, 5, 10, TranspositionTable.EXACT, None)
+        table.store(5, 2, 20, TranspositionTable.EXACT, None)
+        self.assertEqual(table.get(1)[2], 10)
+        self.assertIsNone(table.get(5))
+        table.store(5, 6, 20, TranspositionTable.EXACT, None)
+        self.assertEqual(table.get(5)[2], 20)
+        self.assertIsNone(table.get(1))
+
+
+if __name__ == '__main__':
+    unittest.main()
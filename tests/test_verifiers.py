@@ -1,9 +1,10 @@
 import unittest
 
 from board import CheckerBoardFactory, BoardPresetDataclass, CheckerBoardPresets
-from checkers_enums import MoveTypeEnum, TeamEnum
+from checkers_enums import MoveTypeEnum, MoveValidationEnum, TeamEnum
 from checkers_game import CheckersGame
-from checkersmove import CheckersMove
+from checkersmove import CheckersMove, IllegalMoveException
+from tests.board_presets_for_tests import CheckerBoardTestPresets
 
 
 class TestVerifiers(unittest.TestCase):
@@ -72,5 +73,29 @@ class TestVerifiers(unittest.TestCase):
         self.assertTrue(test_game.verify_correct_move_direction(CheckersMove([2, 3, 0, 1]), TeamEnum.black))
         self.assertFalse(test_game.verify_correct_move_direction(CheckersMove([2, 3, 0, 1]), TeamEnum.white))
 
+    def test_validate_move_reasons(self):
+        test_game = CheckersGame(CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8))
+        for move, reason in (([1, 2, 0, 3], MoveValidationEnum.valid),
+                             ([1, 2, -1, 3], MoveValidationEnum.off_board),
+                             ([1, 0, 2, 1], MoveValidationEnum.occupied_target),
+                             ([0, 3, 1, 4], MoveValidationEnum.wrong_colour),
+                             ([1, 2, 1, 3], MoveValidationEnum.not_diagonal),
+                             ([1, 2, 0, 1], MoveValidationEnum.occupied_target),
+                             ([3, 2, 6, 5], MoveValidationEnum.occupied_target),
+                             ([1, 2, 4, 5], MoveValidationEnum.occupied_target),
+                             ([1, 2, 3, 4], MoveValidationEnum.no_piece_to_capture)):
+            self.assertIs(test_game.validate_move(CheckersMove(move)), reason)
+            self.assertIs(test_game.verify_legal_move(CheckersMove(move), TeamEnum.white),
+                          reason is MoveValidationEnum.valid)
+        test_game = CheckersGame(CheckerBoardFactory.build_board_from_preset(BoardPresetDataclass(8, 8, [(3, 3)], [])))
+        self.assertIs(test_game.validate_move(CheckersMove([3, 3, 2, 2])), MoveValidationEnum.wrong_direction)
+        self.assertIs(test_game.validate_move(CheckersMove([3, 3, 6, 6])), MoveValidationEnum.too_far)
+
+    def test_rejection_reason_in_exception(self):
+        test_game = CheckersGame(CheckerBoardFactory.build_board_from_preset(CheckerBoardTestPresets.simple_tie_test_board))
+        with self.assertRaises(IllegalMoveException) as context:
+            test_game.make_move(CheckersMove([0, 7, 1, 8]))
+        self.assertIn(MoveValidationEnum.off_board.value, str(context.exception))
+
 if __name__ == '__main__':
     unittest.main()
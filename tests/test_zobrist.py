@@ -0,0 +1,54 @@
+import random
+import unittest
+
+from board import CheckerBoard, CheckerBoardFactory, CheckerBoardPresets, BitboardCheckerBoard
+from checkers_enums import TeamEnum
+from checkers_game import CheckersGame
+from checkersmove import CheckersMove
+from move_iterators import create_move_iterator_from_list_of_lists
+from zobrist import get_zobrist_table
+
+
+class TestZobristKey(unittest.TestCase):
+    def test_key_matches_full_computation(self):
+        rng = random.Random(3)
+        for board_class in (CheckerBoard, BitboardCheckerBoard):
+            test_game = CheckersGame(CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8,
+                                                                                 board_class))
+            while test_game.legal_moves():
+                test_game.make_move(rng.choice(test_game.legal_moves()))
+                self.assertEqual(test_game.board.zobrist_key,
+                                 test_game.board.zobrist_table.compute_key(test_game.board.active_pieces,
+                                                                           test_game.current_team))
+
+    def test_transpositions_share_a_key(self):
+        keys = []
+        for move_list in ([[1, 2, 0, 3], [6, 5, 7, 4], [5, 2, 4, 3], [0, 5, 1, 4]],
+                          [[5, 2, 4, 3], [0, 5, 1, 4], [1, 2, 0, 3], [6, 5, 7, 4]]):
+            test_game = CheckersGame(CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8))
+            for move in create_move_iterator_from_list_of_lists(move_list):
+                test_game.make_move(move)
+            keys.append(test_game.board.zobrist_key)
+        self.assertEqual(keys[0], keys[1])
+
+    def test_side_to_move_changes_key(self):
+        test_game = CheckersGame(CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8))
+        initial_key = test_game.board.zobrist_key
+        test_game.switch_team_turn()
+        self.assertEqual(test_game.board.zobrist_key ^ initial_key, get_zobrist_table(8, 8).side_to_move_key)
+        test_game.make_move(CheckersMove([0, 5, 1, 4]))
+        self.assertNotEqual(test_game.board.zobrist_key, initial_key)
+
+    def test_bitboard_and_list_board_keys_agree(self):
+        list_board = CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8)
+        bit_board = CheckerBoardFactory.build_board_from_preset(CheckerBoardPresets.standard_8_by_8, BitboardCheckerBoard)
+        self.assertEqual(list_board.zobrist_key, bit_board.zobrist_key)
+        for test_board in (list_board, bit_board):
+            test_board.move_piece((1, 2), (2, 3))
+            test_board.remove_piece((0, 5))
+            test_board._create_piece((2, 3), TeamEnum.black)
+        self.assertEqual(list_board.zobrist_key, bit_board.zobrist_key)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+from functools import lru_cache
+from typing import Dict, Tuple
+
+from checkers_enums import TeamEnum, COLUMN_INDEX, ROW_INDEX
+
+MASK_64 = (1 << 64) - 1
+
+
+def splitmix64(value: int) -> int:
+    value = (value + 0x9E3779B97F4A7C15) & MASK_64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK_64
+    return value ^ (value >> 31)
+
+
+class ZobristTable:
+    '''
+    64-bit Zobrist keys for every (tile, team) of a length x height board, plus one for black being the side to move.
+    Keys are derived from the tile index with splitmix64 rather than drawn from a random generator, so they are the
+    same in every process and position keys can be compared across runs. They are computed on first use and cached.
+    '''
+    TEAM_OFFSETS = {TeamEnum.white: 0, TeamEnum.black: 1}
+
+    def __init__(self, length: int, height: int):
+        self.length = length
+        self.height = height
+        self.side_to_move_key = splitmix64(2 * length * height)
+        self._piece_keys: Dict[Tuple[Tuple[int, int], TeamEnum], int] = {}
+
+    def piece_key(self, coordinates: Tuple[int, int], team: TeamEnum) -> int:
+        try:
+            return self._piece_keys[coordinates, team]
+        except KeyError:
+            tile_index = coordinates[COLUMN_INDEX] * self.height + coordinates[ROW_INDEX]
+            key = splitmix64(2 * tile_index + self.TEAM_OFFSETS[team])
+            self._piece_keys[coordinates, team] = key
+            return key
+
+    def compute_key(self, active_pieces: Dict[Tuple[int, int], TeamEnum], side_to_move: TeamEnum) -> int:
+        '''
+        Computes a position's key from scratch, as the board would have maintained it.
+        '''
+        key = 0 if side_to_move is TeamEnum.white else self.side_to_move_key
+        for coordinates, team in active_pieces.items():
+            key ^= self.piece_key(coordinates, team)
+        return key
+
+
+@lru_cache(maxsize=None)
+def get_zobrist_table(length: int, height: int) -> ZobristTable:
+    return ZobristTable(length, height)